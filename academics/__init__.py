@@ -0,0 +1,13 @@
+# Module academics: xử lý dữ liệu học tập đã đồng bộ (môn đã hoàn thành, chương trình đào tạo, ...)
+from academics.completion import COURSE_FAILED, COURSE_IN_PROGRESS, CompletedCourseIndex
+from academics.prerequisites import (
+    DEFAULT_GRADUATION_COURSES,
+    PrerequisiteGraph,
+    clear_prerequisite_graphs,
+    get_prerequisite_graph,
+    program_version,
+)
+from academics.curriculum_cache import CURRICULUM_CACHE_TTL, CurriculumCache
+from academics.performance import RETAKE_COST_PER_CREDIT, STANDARD_PROGRAM_SEMESTERS, analyze_performance
+from academics.summary import build_student_summary, refresh_student_summary, semester_partial
+from academics.cohort import COHORT_GROUP_FIELDS, cohort_statistics, course_pass_pipeline, student_summary_pipeline
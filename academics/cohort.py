@@ -0,0 +1,186 @@
+from academics.completion import COURSE_FAILED, COURSE_IN_PROGRESS
+
+# Khoảng điểm trung bình tích lũy (thang 10) và khoảng số tín chỉ tích lũy
+GPA_BOUNDARIES = [0, 4, 5, 6.5, 8, 9, 10.01]
+CREDIT_BOUNDARIES = [0, 30, 60, 90, 120, 150, 1000]
+# Nhóm theo lớp hoặc ngành (trường trong personal_info của student_collection)
+COHORT_GROUP_FIELDS = {"class": "personal_info.class", "major": "personal_info.major"}
+
+
+def _bucket_labels(boundaries):
+    labels = {lower: f"{lower}-{upper}" for lower, upper in zip(boundaries, boundaries[1:])}
+    labels[boundaries[-2]] = f"{boundaries[-2]}+"
+    return labels
+
+
+def student_summary_pipeline(query=None, group_by=None):
+    """
+    Pipeline aggregation trên student_collection: phân bố điểm trung bình, tín chỉ tích lũy
+    và (nếu có group_by) tổng hợp theo lớp / ngành, trong một lần chạy nhờ $facet
+
+    Dùng summary đã tổng hợp sẵn (accumulated_average, total_credits_taken - không tính
+    môn không đạt) để số liệu khớp với trang của sinh viên.
+
+    Args:
+        query (dict): Điều kiện lọc sinh viên (None = tất cả)
+        group_by (str): "class" hoặc "major"
+    """
+    gpa = "$summary.accumulated_average"
+    credits = "$summary.total_credits_taken"
+
+    facets = {
+        "overview": [
+            {"$group": {
+                "_id": None,
+                "students": {"$sum": 1},
+                "average_gpa": {"$avg": gpa},
+                "min_gpa": {"$min": gpa},
+                "max_gpa": {"$max": gpa},
+                "average_credits": {"$avg": credits},
+            }},
+        ],
+        "gpa_distribution": [
+            {"$bucket": {
+                "groupBy": {"$ifNull": [gpa, -1]},
+                "boundaries": GPA_BOUNDARIES,
+                "default": "unknown",
+                "output": {"count": {"$sum": 1}},
+            }},
+        ],
+        "credit_distribution": [
+            {"$bucket": {
+                "groupBy": {"$ifNull": [credits, -1]},
+                "boundaries": CREDIT_BOUNDARIES,
+                "default": "unknown",
+                "output": {"count": {"$sum": 1}},
+            }},
+        ],
+    }
+
+    if group_by:
+        facets["groups"] = [
+            {"$group": {
+                "_id": f"${COHORT_GROUP_FIELDS[group_by]}",
+                "students": {"$sum": 1},
+                "average_gpa": {"$avg": gpa},
+                "average_credits": {"$avg": credits},
+            }},
+            {"$sort": {"_id": 1}},
+        ]
+
+    pipeline = []
+    if query:
+        pipeline.append({"$match": query})
+    pipeline.append({"$project": {
+        "summary.accumulated_average": 1,
+        "summary.total_credits_taken": 1,
+        **{field: 1 for field in COHORT_GROUP_FIELDS.values()},
+    }})
+    pipeline.append({"$facet": facets})
+    return pipeline
+
+
+def course_pass_pipeline(mssv_list=None, course_limit=50):
+    """
+    Pipeline aggregation trên academic_records: số lượt học và tỉ lệ qua môn theo từng môn
+
+    Args:
+        mssv_list (list): Chỉ tính các sinh viên này (None = tất cả)
+        course_limit (int): Số môn học tối đa trả về (>= 1)
+    """
+    pipeline = []
+    if mssv_list is not None:
+        pipeline.append({"$match": {"mssv": {"$in": mssv_list}}})
+    pipeline += [
+        {"$project": {
+            "academic_records.courses.course_code": 1,
+            "academic_records.courses.course_name": 1,
+            "academic_records.courses.complete": 1,
+        }},
+        {"$unwind": "$academic_records"},
+        {"$unwind": "$academic_records.courses"},
+        # Môn đang học chưa có kết quả
+        {"$match": {"academic_records.courses.complete": {"$ne": COURSE_IN_PROGRESS}}},
+        {"$group": {
+            "_id": "$academic_records.courses.course_code",
+            "course_name": {"$first": "$academic_records.courses.course_name"},
+            "attempts": {"$sum": 1},
+            "failed": {"$sum": {"$cond": [
+                {"$eq": ["$academic_records.courses.complete", COURSE_FAILED]}, 1, 0
+            ]}},
+        }},
+        {"$sort": {"attempts": -1, "_id": 1}},
+        {"$limit": course_limit},
+    ]
+    return pipeline
+
+
+def _round(value):
+    return round(value, 2) if isinstance(value, (int, float)) else value
+
+
+def cohort_statistics(academic_records_collection, student_collection, major=None, class_name=None,
+                      group_by=None, course_limit=50):
+    """
+    Thống kê điểm trung bình, tín chỉ và tỉ lệ qua môn của cả khóa / lớp / ngành
+
+    Returns:
+        dict: overview, gpa_distribution, credit_distribution, courses, groups
+    """
+    query = {}
+    if major:
+        query["personal_info.major"] = major
+    if class_name:
+        query["personal_info.class"] = class_name
+
+    mssv_list = None
+    if query:
+        mssv_list = [s["mssv"] for s in student_collection.find(query, {"mssv": 1, "_id": 0}) if s.get("mssv")]
+
+    result = next(student_collection.aggregate(student_summary_pipeline(query, group_by), allowDiskUse=True), {})
+    result["courses"] = list(academic_records_collection.aggregate(
+        course_pass_pipeline(mssv_list, course_limit), allowDiskUse=True
+    ))
+
+    overview = (result.get("overview") or [{}])[0]
+    overview.pop("_id", None)
+    gpa_labels = _bucket_labels(GPA_BOUNDARIES)
+    credit_labels = _bucket_labels(CREDIT_BOUNDARIES)
+
+    return {
+        "overview": {
+            "students": overview.get("students", 0),
+            "average_gpa": _round(overview.get("average_gpa")),
+            "min_gpa": overview.get("min_gpa"),
+            "max_gpa": overview.get("max_gpa"),
+            "average_credits": _round(overview.get("average_credits")),
+        },
+        "gpa_distribution": [
+            {"range": gpa_labels.get(b["_id"], b["_id"]), "count": b["count"]}
+            for b in result.get("gpa_distribution", [])
+        ],
+        "credit_distribution": [
+            {"range": credit_labels.get(b["_id"], b["_id"]), "count": b["count"]}
+            for b in result.get("credit_distribution", [])
+        ],
+        "courses": [
+            {
+                "course_code": c["_id"],
+                "course_name": c.get("course_name"),
+                "attempts": c["attempts"],
+                "passed": c["attempts"] - c["failed"],
+                "failed": c["failed"],
+                "pass_rate": round((c["attempts"] - c["failed"]) / c["attempts"] * 100, 2) if c["attempts"] else 0,
+            }
+            for c in result.get("courses", [])
+        ],
+        "groups": [
+            {
+                "group": g["_id"],
+                "students": g["students"],
+                "average_gpa": _round(g.get("average_gpa")),
+                "average_credits": _round(g.get("average_credits")),
+            }
+            for g in result.get("groups", [])
+        ],
+    }
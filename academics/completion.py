@@ -0,0 +1,45 @@
+# Trạng thái môn học không đạt, các trạng thái khác đều được tính là đã học
+COURSE_FAILED = "Không hoàn thành"
+# Trạng thái môn học đang học trong học kỳ hiện tại
+COURSE_IN_PROGRESS = "Chưa hoàn thành"
+
+
+class CompletedCourseIndex:
+    """
+    Tập mã môn đã hoàn thành của một sinh viên, dựng một lần từ academic_records
+
+    Thay cho việc quét lại toàn bộ bảng điểm mỗi lần kiểm tra một môn:
+    mỗi lần kiểm tra môn học / môn tiên quyết chỉ còn là một phép tra tập hợp.
+    """
+
+    def __init__(self, course_codes=()):
+        self.course_codes = frozenset(course_codes)
+
+    @classmethod
+    def from_academic_record(cls, academic_record):
+        """
+        Args:
+            academic_record (dict): Tài liệu academic_records của sinh viên (có thể None)
+        """
+        if not academic_record:
+            return cls()
+        return cls(
+            course.get('course_code')
+            for record in academic_record.get('academic_records', [])
+            for course in record.get('courses', [])
+            if course.get('course_code') and course.get('complete') != COURSE_FAILED
+        )
+
+    def __contains__(self, course_code):
+        return course_code in self.course_codes
+
+    def __len__(self):
+        return len(self.course_codes)
+
+    def is_completed(self, course_code):
+        return course_code in self.course_codes
+
+    def prerequisites_met(self, prerequisites):
+        """Tất cả môn tiên quyết đều đã hoàn thành"""
+        return all(code in self.course_codes for code in prerequisites or ())
+
@@ -0,0 +1,114 @@
+import logging
+import os
+import threading
+import time
+
+from pymongo.errors import PyMongoError
+
+import metrics
+from academics.prerequisites import clear_prerequisite_graphs
+
+# Lấy logger
+logger = logging.getLogger(__name__)
+
+# Thời gian giữ chương trình đào tạo trong bộ nhớ (giây)
+CURRICULUM_CACHE_TTL = int(os.getenv("CURRICULUM_CACHE_TTL", "3600"))
+
+
+class CurriculumCache:
+    """
+    Bộ nhớ đệm trong tiến trình cho tài liệu chương trình đào tạo theo ngành
+
+    Chương trình đào tạo gần như không đổi, nên các route của sinh viên đọc
+    từ bộ nhớ thay vì truy vấn subject_collection mỗi request. Tài liệu
+    được tải lại khi hết TTL, khi admin gọi invalidate, hoặc khi change
+    stream báo collection thay đổi (nếu bật watch).
+
+    Mỗi worker có bộ nhớ đệm riêng: invalidate chỉ xóa ở tiến trình gọi nó.
+    Các worker khác chỉ thấy thay đổi ngay khi change stream đang chạy
+    (`watching`), nếu không thì sau tối đa TTL giây.
+
+    Tài liệu trả về được dùng chung giữa các request, không được sửa trực tiếp.
+    """
+
+    def __init__(self, collection, ttl=CURRICULUM_CACHE_TTL):
+        self.collection = collection
+        self.ttl = ttl
+        self._programs = {}
+        self._lock = threading.Lock()
+        self._watch_thread = None
+        self.watching = False
+
+    def get(self, major):
+        """
+        Chương trình đào tạo của ngành, None nếu không tồn tại
+
+        Args:
+            major (str): Tên ngành trong personal_info.major
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._programs.get(major)
+            if cached and now - cached[0] < self.ttl:
+                metrics.incr("curriculum_cache.hits")
+                return cached[1]
+
+        metrics.incr("curriculum_cache.misses")
+        program = self.collection.find_one({"major": major})
+        # Không lưu kết quả rỗng để ngành mới thêm được thấy ngay
+        if program:
+            with self._lock:
+                self._programs[major] = (now, program)
+        return program
+
+    def invalidate(self, major=None):
+        """
+        Xóa chương trình của một ngành (hoặc tất cả) khỏi bộ nhớ đệm, kèm đồ thị tiên quyết đã dựng
+
+        Đồ thị cũng bị xóa để chương trình sửa mà không tăng `version` không tiếp tục dùng đồ thị cũ.
+        """
+        with self._lock:
+            if major is None:
+                count = len(self._programs)
+                self._programs.clear()
+            else:
+                count = 1 if self._programs.pop(major, None) else 0
+        clear_prerequisite_graphs(major)
+        metrics.incr("curriculum_cache.invalidations")
+        return count
+
+    def stats(self):
+        with self._lock:
+            majors = sorted(self._programs)
+        return {
+            "ttl": self.ttl,
+            "watching": self.watching,
+            "majors": majors,
+            "hits": metrics.get_counter("curriculum_cache.hits"),
+            "misses": metrics.get_counter("curriculum_cache.misses"),
+            "invalidations": metrics.get_counter("curriculum_cache.invalidations"),
+        }
+
+    def start_watch(self):
+        """
+        Theo dõi change stream của collection để xóa bộ nhớ đệm khi có thay đổi
+
+        Change stream cần MongoDB chạy replica set; nếu không hỗ trợ thì
+        chỉ ghi log và bộ nhớ đệm vẫn hết hạn theo TTL.
+        """
+        if self._watch_thread:
+            return
+        self._watch_thread = threading.Thread(target=self._watch, name="curriculum-watch", daemon=True)
+        self._watch_thread.start()
+
+    def _watch(self):
+        try:
+            with self.collection.watch() as stream:
+                self.watching = True
+                for _ in stream:
+                    # Số ngành ít, xóa toàn bộ để không sót trường hợp đổi tên ngành
+                    self.invalidate()
+        except PyMongoError as e:
+            logger.warning(f"Không theo dõi được thay đổi chương trình đào tạo, chỉ dùng TTL: {e}")
+        finally:
+            self.watching = False
@@ -0,0 +1,129 @@
+from academics.completion import COURSE_FAILED, COURSE_IN_PROGRESS
+
+# Số học kỳ chuẩn của chương trình đào tạo (giả định)
+STANDARD_PROGRAM_SEMESTERS = 8
+# Học phí mỗi tín chỉ khi học lại
+RETAKE_COST_PER_CREDIT = 980000
+
+
+def _is_exempt(course):
+    return str(course.get('total_score', '0')).lower() == 'miễn'
+
+
+def analyze_performance(academic_records, curriculum):
+    """
+    Đánh giá hiệu suất học tập trong một lần duyệt bảng điểm
+
+    Bảng điểm chỉ được duyệt một lần để vừa tính thống kê từng học kỳ vừa
+    dựng tập mã môn đã qua; sau đó mỗi môn trong chương trình đào tạo chỉ
+    cần tra tập hợp thay vì quét lại toàn bộ các học kỳ.
+
+    Args:
+        academic_records (list): Danh sách học kỳ trong academic_records
+        curriculum (list): Danh sách môn trong chương trình đào tạo
+
+    Returns:
+        dict: semester_performance, overall_performance, progress,
+              graduation_outlook và retake_cost như trả về của /performance_review
+    """
+    semester_performance = []
+    total_failed_courses = 0
+    total_failed_credits = 0
+    total_passed_courses = 0
+    total_taken_credits = 0
+    # Môn đã qua (không tính môn miễn, đang học hoặc không hoàn thành)
+    passed_course_codes = set()
+
+    for record in academic_records:
+        failed_courses_count = 0
+        passed_courses_count = 0
+        failed_credits_semester = 0
+        taken_credits_semester = 0
+
+        for course in record['courses']:
+            complete_status = course.get('complete', "")
+            if complete_status == COURSE_IN_PROGRESS:
+                continue
+
+            credits = course.get('credits', 0)
+            taken_credits_semester += credits
+            if complete_status == COURSE_FAILED:
+                failed_courses_count += 1
+                failed_credits_semester += credits
+            elif not _is_exempt(course):
+                passed_courses_count += 1
+                passed_course_codes.add(course.get('course_code'))
+
+        semester_performance.append({
+            "semester": record['semester'],
+            "failed_courses": failed_courses_count,
+            "passed_courses": passed_courses_count,
+            "failed_credits": failed_credits_semester,
+            "taken_credits": taken_credits_semester
+        })
+        total_failed_courses += failed_courses_count
+        total_failed_credits += failed_credits_semester
+        total_passed_courses += passed_courses_count
+        total_taken_credits += taken_credits_semester
+
+    # Đánh giá tiến độ hoàn thành theo chương trình đào tạo
+    completed_required_credits = 0
+    total_required_credits_in_program = 0
+    remaining_required_courses = []
+    completed_course_codes = set()
+
+    for subject in curriculum:
+        credits = subject.get('credits', 0)
+        if isinstance(credits, (int, float)):
+            total_required_credits_in_program += credits
+        course_code = subject.get('course_code')
+        if course_code:
+            if course_code in passed_course_codes:
+                completed_required_credits += credits
+                completed_course_codes.add(course_code)
+            else:
+                remaining_required_courses.append(subject)
+
+    progress_percentage = (completed_required_credits / total_required_credits_in_program) * 100 if total_required_credits_in_program > 0 else 0
+
+    # Ước tính khả năng tốt nghiệp đúng hạn
+    current_semester = len(academic_records)
+    remaining_semesters = STANDARD_PROGRAM_SEMESTERS - current_semester
+    remaining_required_credits = total_required_credits_in_program - completed_required_credits
+    average_credits_per_semester_needed = remaining_required_credits / remaining_semesters if remaining_semesters > 0 else remaining_required_credits
+
+    # Đánh giá dựa trên số môn Không hoàn thành, tiến độ và khối lượng công việc còn lại
+    graduation_assessment_detail = "Đang tiến triển tốt"
+    if total_failed_courses > 3:
+        graduation_assessment_detail = "Cần chú ý đến các môn học bị Không hoàn thành và có kế hoạch học lại hợp lý."
+    if progress_percentage < 50:
+        graduation_assessment_detail = "Tiến độ đang chậm, cần tăng cường học tập để theo kịp chương trình."
+    if remaining_semesters <= 1 and remaining_required_credits > 15:
+        graduation_assessment_detail = "Có nguy cơ cao không tốt nghiệp đúng hạn do khối lượng môn học còn lại lớn."
+
+    return {
+        "semester_performance": semester_performance,
+        "overall_performance": {
+            "total_failed_courses": total_failed_courses,
+            "total_failed_credits": total_failed_credits,
+            "total_passed_courses": total_passed_courses,
+            "total_taken_credits": total_taken_credits
+        },
+        "progress": {
+            "percentage_completed": round(progress_percentage, 2),
+            "completed_required_credits": completed_required_credits,
+            "total_required_credits": total_required_credits_in_program,
+            "remaining_required_courses": remaining_required_courses,
+            "completed_course_codes": list(completed_course_codes)
+        },
+        "graduation_outlook": {
+            "assessment": graduation_assessment_detail,
+            "current_semester": current_semester,
+            "remaining_semesters": remaining_semesters,
+            "average_credits_per_semester_needed": round(average_credits_per_semester_needed, 2)
+        },
+        "retake_cost": {
+            "total_cost": total_failed_credits * RETAKE_COST_PER_CREDIT,
+            "cost_per_credit": RETAKE_COST_PER_CREDIT
+        }
+    }
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import threading
+
+# Mã các môn tốt nghiệp mặc định khi chương trình đào tạo không khai báo graduation_courses
+DEFAULT_GRADUATION_COURSES = ("NT522", "NT541", "NT533", "NT505")
+
+
+def _credits(subject):
+    credits = subject.get('credits', 0)
+    return credits if isinstance(credits, (int, float)) else 0
+
+
+class PrerequisiteGraph:
+    """
+    Đồ thị môn tiên quyết (DAG) của một chương trình đào tạo
+
+    Được dựng một lần cho mỗi phiên bản chương trình: thứ tự topo, độ dài
+    chuỗi môn dài nhất tính từ mỗi môn và danh sách môn phụ thuộc được tính
+    sẵn, nên các truy vấn theo từng sinh viên chỉ duyệt qua các môn còn lại.
+    """
+
+    def __init__(self, curriculum, graduation_courses=None):
+        # Giữ thứ tự môn như trong chương trình đào tạo để kết quả ổn định
+        self.subjects = {}
+        for subject in curriculum:
+            code = subject.get('course_code')
+            if code and code not in self.subjects:
+                self.subjects[code] = subject
+
+        self.prerequisites = {
+            code: tuple(subject.get('prerequisites') or ())
+            for code, subject in self.subjects.items()
+        }
+        self.dependents = {code: [] for code in self.subjects}
+        for code, prerequisites in self.prerequisites.items():
+            for prereq in prerequisites:
+                if prereq in self.dependents:
+                    self.dependents[prereq].append(code)
+
+        self.graduation_courses = tuple(graduation_courses or DEFAULT_GRADUATION_COURSES)
+        self.topological_order, self.cyclic = self._topological_sort()
+        self.height = self._heights()
+
+    def _topological_sort(self):
+        # Thuật toán Kahn, chỉ tính các cạnh giữa các môn trong chương trình
+        in_degree = {
+            code: sum(1 for prereq in prerequisites if prereq in self.subjects)
+            for code, prerequisites in self.prerequisites.items()
+        }
+        queue = [code for code, degree in in_degree.items() if degree == 0]
+        order = []
+        for code in queue:
+            order.append(code)
+            for dependent in self.dependents[code]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    queue.append(dependent)
+        # Các môn nằm trong vòng lặp tiên quyết (dữ liệu lỗi) không bao giờ được mở
+        cyclic = frozenset(code for code, degree in in_degree.items() if degree > 0)
+        return order, cyclic
+
+    def _heights(self):
+        # Số học kỳ tối thiểu để học xong một môn và mọi môn phụ thuộc vào nó
+        height = {}
+        for code in reversed(self.topological_order):
+            height[code] = 1 + max((height[d] for d in self.dependents[code] if d in height), default=0)
+        return height
+
+    def unlocked(self, completed):
+        """
+        Các môn chưa hoàn thành và đã đủ môn tiên quyết
+
+        Args:
+            completed: Tập mã môn đã hoàn thành (set hoặc CompletedCourseIndex)
+
+        Returns:
+            list: Mã môn theo thứ tự trong chương trình đào tạo
+        """
+        return [
+            code for code, prerequisites in self.prerequisites.items()
+            if code not in completed and all(prereq in completed for prereq in prerequisites)
+        ]
+
+    def critical_path_length(self, completed=()):
+        """Số học kỳ tối thiểu để hoàn thành các môn còn lại (chuỗi tiên quyết dài nhất)"""
+        remaining = {}
+        for code in reversed(self.topological_order):
+            if code in completed:
+                continue
+            remaining[code] = 1 + max(
+                (remaining[d] for d in self.dependents[code] if d in remaining), default=0
+            )
+        return max(remaining.values(), default=0)
+
+    def plan(self, completed, max_credits=None):
+        """
+        Lập kế hoạch học các môn còn lại theo từng học kỳ
+
+        Mỗi học kỳ chọn các môn đã đủ tiên quyết, ưu tiên môn nằm trên chuỗi
+        tiên quyết dài nhất; nếu có max_credits thì không vượt quá số tín chỉ đó.
+
+        Returns:
+            list: Danh sách học kỳ, mỗi học kỳ là danh sách mã môn
+        """
+        done = set(code for code in self.subjects if code in completed)
+        # Môn tiên quyết ngoài chương trình đào tạo chỉ được tính nếu đã hoàn thành
+        external_missing = {
+            code for code, prerequisites in self.prerequisites.items()
+            if any(p not in self.subjects and p not in completed for p in prerequisites)
+        }
+        remaining = [
+            code for code in self.topological_order
+            if code not in done and code not in external_missing
+        ]
+        position = {code: i for i, code in enumerate(remaining)}
+
+        semesters = []
+        while remaining:
+            available = [
+                code for code in remaining
+                if all(p in done or p not in self.subjects for p in self.prerequisites[code])
+            ]
+            available.sort(key=lambda code: (-self.height[code], position[code]))
+
+            semester, credits = [], 0
+            for code in available:
+                subject_credits = _credits(self.subjects[code])
+                if max_credits and semester and credits + subject_credits > max_credits:
+                    continue
+                semester.append(code)
+                credits += subject_credits
+            if not semester:
+                break
+
+            semesters.append(semester)
+            done.update(semester)
+            chosen = set(semester)
+            remaining = [code for code in remaining if code not in chosen]
+        return semesters
+
+    def graduation_subjects(self):
+        """Các môn tốt nghiệp có trong chương trình, theo thứ tự trong chương trình"""
+        return [subject for code, subject in self.subjects.items() if code in self.graduation_courses]
+
+
+def program_version(program):
+    """
+    Phiên bản của tài liệu chương trình đào tạo
+
+    Dùng trường version / updated_at nếu có, ngược lại là hash nội dung curriculum.
+    """
+    version = program.get('version') or program.get('updated_at')
+    if version:
+        return str(version)
+    payload = json.dumps(
+        [program.get('curriculum', []), program.get('graduation_courses')],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+# major -> (phiên bản, PrerequisiteGraph, tài liệu); mỗi ngành chỉ giữ đồ thị của phiên bản mới nhất
+_graphs = {}
+_graphs_lock = threading.Lock()
+
+
+def get_prerequisite_graph(program):
+    """
+    Đồ thị tiên quyết của chương trình đào tạo, được dựng lại khi phiên bản thay đổi
+
+    Args:
+        program (dict): Tài liệu chương trình đào tạo trong subject_collection
+    """
+    major = program.get('major')
+    with _graphs_lock:
+        cached = _graphs.get(major)
+    # Cùng một tài liệu (từ CurriculumCache) thì không cần tính lại phiên bản
+    if cached and cached[2] is program:
+        return cached[1]
+
+    version = program_version(program)
+    if cached and cached[0] == version:
+        graph = cached[1]
+    else:
+        graph = PrerequisiteGraph(program.get('curriculum', []), program.get('graduation_courses'))
+    with _graphs_lock:
+        _graphs[major] = (version, graph, program)
+    return graph
+
+
+def clear_prerequisite_graphs(major=None):
+    with _graphs_lock:
+        if major is None:
+            _graphs.clear()
+        else:
+            _graphs.pop(major, None)
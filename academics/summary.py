@@ -0,0 +1,111 @@
+from datetime import datetime
+
+from academics.completion import COURSE_FAILED, COURSE_IN_PROGRESS
+
+
+def _score(total_score):
+    try:
+        return float(total_score)
+    except (TypeError, ValueError):
+        return 0
+
+
+def semester_partial(record):
+    """
+    Tổng tín chỉ / điểm của một học kỳ, dùng để cộng dồn ra tổng kết
+
+    Quy tắc giống update_student_summary: môn đang học không được tính,
+    môn không hoàn thành không được tích lũy, môn miễn không tính vào điểm trung bình.
+    """
+    credits_taken = 0
+    credits_accumulated = 0
+    failed_credits = 0
+    gpa_credits = 0
+    weighted_score = 0
+
+    for course in record.get('courses', []):
+        credits = course.get('credits', 0)
+        complete_status = course.get('complete', "")
+        credits_taken += credits
+
+        if complete_status == COURSE_IN_PROGRESS:
+            continue
+        if complete_status == COURSE_FAILED:
+            failed_credits += credits
+            continue
+        credits_accumulated += credits
+        if str(course.get('total_score', "0")).lower() != "miễn":
+            weighted_score += _score(course.get('total_score', "0")) * credits
+            gpa_credits += credits
+
+    return {
+        "semester": record.get('semester'),
+        "credits_taken": credits_taken,
+        "credits_accumulated": credits_accumulated,
+        "failed_credits": failed_credits,
+        "gpa_credits": gpa_credits,
+        "weighted_score": weighted_score,
+        "semester_average": round(weighted_score / gpa_credits, 2) if gpa_credits > 0 else 0,
+    }
+
+
+def combine_partials(semesters):
+    """Tổng kết của sinh viên từ danh sách tổng từng học kỳ"""
+    gpa_credits = sum(s["gpa_credits"] for s in semesters)
+    weighted_score = sum(s["weighted_score"] for s in semesters)
+    return {
+        "total_credits_taken": sum(s["credits_accumulated"] for s in semesters),
+        "accumulated_average": round(weighted_score / gpa_credits, 2) if gpa_credits > 0 else 0,
+        "failed_credits": sum(s["failed_credits"] for s in semesters),
+        "semesters": semesters,
+        "updated_at": datetime.now(),
+    }
+
+
+def build_student_summary(academic_records, stored_summary=None, changed_semesters=None):
+    """
+    Dựng tài liệu summary cho student_collection
+
+    Args:
+        academic_records (list): Danh sách học kỳ mới nhất
+        stored_summary (dict): summary đang lưu (có thể None)
+        changed_semesters (set): Tên các học kỳ thay đổi; None để tính lại tất cả
+
+    Returns:
+        dict: summary với tổng tín chỉ, điểm trung bình tích lũy, tín chỉ
+              không hoàn thành và tổng từng học kỳ
+    """
+    previous = {}
+    if stored_summary and changed_semesters is not None:
+        previous = {s["semester"]: s for s in stored_summary.get("semesters", [])}
+
+    semesters = []
+    for record in academic_records:
+        name = record.get('semester')
+        if name in previous and name not in changed_semesters:
+            semesters.append(previous[name])
+        else:
+            semesters.append(semester_partial(record))
+    return combine_partials(semesters)
+
+
+def refresh_student_summary(student_collection, mssv, academic_data, changes=None):
+    """
+    Cập nhật summary của sinh viên sau khi ghi academic_records
+
+    Chỉ các học kỳ có trong changes (kết quả write_academic_delta) được tính
+    lại, các học kỳ khác dùng lại tổng đã lưu.
+
+    Returns:
+        dict: summary đã ghi
+    """
+    changed_semesters = None
+    stored_summary = None
+    if changes and not changes.get("full_rewrite"):
+        changed_semesters = set(changes.get("semesters_added", [])) | set(changes.get("semesters_changed", []))
+        student = student_collection.find_one({"mssv": mssv}, {"summary": 1})
+        stored_summary = (student or {}).get("summary")
+
+    summary = build_student_summary(academic_data.get('academic_records', []), stored_summary, changed_semesters)
+    student_collection.update_one({"mssv": mssv}, {"$set": {"summary": summary}})
+    return summary
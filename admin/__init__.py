@@ -1,5 +1,9 @@
+import logging
 from admin.routes import admin_bp
 
+# Lấy logger
+logger = logging.getLogger(__name__)
+
 def init_admin(app):
     """
     Khởi tạo và đăng ký blueprint admin với ứng dụng Flask
@@ -9,4 +13,4 @@ def init_admin(app):
     """
     app.register_blueprint(admin_bp)
     
-    print("Admin module initialized successfully")
\ No newline at end of file
+    logger.info("Admin module initialized successfully")
\ No newline at end of file
@@ -1,34 +1,34 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, Response, stream_with_context, current_app
 from bson import ObjectId
 import datetime
+import logging
+import re
+import metrics
+from academics import COHORT_GROUP_FIELDS, cohort_statistics
+from instructor_module.grading import grade_summary_expression
+from instructor_module.student_lookup import STUDENT_LOOKUP_PROJECTION, resolve_students, roster_student_ids, to_object_id
+
+# Lấy logger
+logger = logging.getLogger(__name__)
 
 # Tạo Blueprint cho admin
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
 # Route đăng nhập admin
-@admin_bp.route('/login', methods=['POST', 'OPTIONS'])
+@admin_bp.route('/login', methods=['POST'])
 def admin_login():
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'success'})
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
-        
     data = request.get_json()
-    print(f"Received admin login data: {data}")
     username = data.get('username') or data.get('email')  # Hỗ trợ cả username và email
     password = data.get('password')
     
-    print(f"Admin login attempt - Username/Email: {username}, Password: {password}")
+    logger.info("Admin login attempt: %s", username)
     
     # Kiểm tra thông tin đăng nhập admin
     # Ở đây bạn có thể thay đổi thông tin đăng nhập admin theo ý muốn
     if (username == 'admin' or username == 'admin@uit.edu.vn') and password == 'admin':
         session['admin_id'] = 'admin'
         session['role'] = 'admin'
-        response = jsonify({
+        return jsonify({
             "status": "success", 
             "message": "Đăng nhập thành công",
             "admin": {
@@ -36,218 +36,196 @@ def admin_login():
                 "role": "admin"
             }
         })
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     else:
-        response = jsonify({
+        return jsonify({
             "status": "error", 
             "message": "Thông tin đăng nhập không chính xác"
         }), 401
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
 
 # Route đăng xuất admin
-@admin_bp.route('/logout', methods=['POST', 'OPTIONS'])
+@admin_bp.route('/logout', methods=['POST'])
 def admin_logout():
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'success'})
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
-        
     # Xóa session
     session.pop('admin_id', None)
     session.pop('role', None)
     
-    response = jsonify({
+    return jsonify({
         "status": "success", 
         "message": "Đăng xuất thành công"
     })
-    response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-    response.headers.add('Access-Control-Allow-Credentials', 'true')
-    return response
 
 # Route kiểm tra phiên đăng nhập admin
-@admin_bp.route('/check-session', methods=['GET', 'OPTIONS'])
+@admin_bp.route('/check-session', methods=['GET'])
 def admin_check_session():
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'success'})
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
-        
-    print(f"Admin check session: {dict(session)}")
+    logger.debug("Admin check session: %s", dict(session))
     
     if 'admin_id' in session and session.get('role') == 'admin':
-        response = jsonify({
+        return jsonify({
             "status": "success",
             "admin": {
                 "username": session["admin_id"],
                 "role": "admin"
             }
         })
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     else:
-        response = jsonify({
+        return jsonify({
             "status": "error",
             "message": "Không có phiên đăng nhập admin hợp lệ"
         }), 401
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
+
+# Số sinh viên mỗi trang của /admin/students
+STUDENT_PAGE_SIZE = 50
+STUDENT_PAGE_SIZE_MAX = 200
+
+# Các trường cần cho danh sách sinh viên
+STUDENT_LIST_PROJECTION = {
+    "mssv": 1,
+    "personal_info.full_name": 1,
+    "personal_info.gender": 1,
+    "personal_info.birth_date": 1,
+    "personal_info.class": 1,
+    "personal_info.email.school": 1,
+    "personal_info.faculty": 1,
+    "personal_info.major": 1,
+}
+
+# Bộ lọc của /admin/students: tham số -> trường trong student_collection
+STUDENT_LIST_FILTERS = {
+    "faculty": "personal_info.faculty",
+    "major": "personal_info.major",
+    "class": "personal_info.class",
+}
+
+
+def student_list_query(args):
+    """
+    Tạo điều kiện truy vấn từ tham số faculty / major / class / search
+
+    search tìm theo tiền tố của mssv hoặc họ tên để dùng được chỉ mục.
+    """
+    query = {}
+    for param, field in STUDENT_LIST_FILTERS.items():
+        if args.get(param):
+            query[field] = args.get(param)
+    
+    search = (args.get('search') or '').strip()
+    if search:
+        prefix = {'$regex': '^' + re.escape(search)}
+        query['$or'] = [{'mssv': prefix}, {'personal_info.full_name': prefix}]
+    return query
+
+
+def student_list_item(student):
+    personal_info = student.get('personal_info', {})
+    return {
+        "id": str(student['_id']),
+        "mssv": student.get('mssv', ''),
+        "name": personal_info.get('full_name', ''),
+        "gender": personal_info.get('gender', ''),
+        "birth_date": personal_info.get('birth_date', ''),
+        "class": personal_info.get('class', ''),
+        "email": personal_info.get('email', {}).get('school', ''),
+        "faculty": personal_info.get('faculty', ''),
+        "major": personal_info.get('major', '')
+    }
+
 
 # Route lấy danh sách sinh viên
-@admin_bp.route('/students', methods=['GET', 'OPTIONS'])
+# Tham số: limit, after (con trỏ trang tiếp theo), faculty, major, class, search
+@admin_bp.route('/students', methods=['GET'])
 def admin_get_students():
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'success'})
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
-    
     # Kiểm tra quyền admin
     if 'admin_id' not in session or session.get('role') != 'admin':
-        response = jsonify({
+        return jsonify({
             "status": "error",
             "message": "Không có quyền truy cập"
         }), 403
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
+    
+    # Con trỏ phân trang là _id của sinh viên cuối cùng ở trang trước
+    after = request.args.get('after')
+    if after and not ObjectId.is_valid(after):
+        return jsonify({
+            "status": "error",
+            "message": "Tham số after không hợp lệ"
+        }), 400
     
     try:
-        from main import mongo, student_collection
+        student_collection = current_app.extensions['mongo'].db.student
         
-        # Lấy danh sách sinh viên từ collection với tất cả thông tin
-        students = list(student_collection.find({}))
+        limit = min(max(request.args.get('limit', STUDENT_PAGE_SIZE, type=int), 1), STUDENT_PAGE_SIZE_MAX)
+        query = student_list_query(request.args)
         
-        # Chuyển đổi ObjectId thành string và tổ chức lại dữ liệu
-        for student in students:
-            if '_id' in student and isinstance(student['_id'], ObjectId):
-                student['_id'] = str(student['_id'])
-            
-            # Thêm trường email, faculty và full_name ở cấp cao nhất để dễ truy cập
-            if 'personal_info' in student:
-                # Xử lý họ tên
-                student['full_name'] = student['personal_info'].get('full_name', '')
-                
-                # Xử lý email
-                if 'email' in student['personal_info']:
-                    student['email'] = student['personal_info']['email'].get('school', '')
-                
-                # Xử lý khoa và ngành
-                student['faculty'] = student['personal_info'].get('faculty', '')
-                student['major'] = student['personal_info'].get('major', '')
-        
-        # Tạo danh sách sinh viên với thông tin đã được xử lý
-        processed_students = []
-        for student in students:
-            student_data = {
-                "id": student['_id'],
-                "mssv": student.get('mssv', ''),
-                "name": student.get('full_name', ''),  # Sử dụng full_name đã được xử lý ở trên
-                "gender": student.get('personal_info', {}).get('gender', ''),
-                "birth_date": student.get('personal_info', {}).get('birth_date', ''),
-                "class": student.get('personal_info', {}).get('class', ''),
-                "email": student.get('email', ''),  # Email đã được xử lý ở trên
-                "faculty": student.get('faculty', ''),  # Khoa đã được xử lý ở trên
-                "major": student.get('major', '')  # Ngành đã được xử lý ở trên
-            }
-            processed_students.append(student_data)
+        page_query = dict(query)
+        if after:
+            page_query['_id'] = {'$gt': ObjectId(after)}
+        
+        # Chỉ lấy các trường trả về, không tải chat_history và dữ liệu khác
+        cursor = student_collection.find(page_query, STUDENT_LIST_PROJECTION).sort('_id', 1).limit(limit + 1)
+        students = [student_list_item(student) for student in cursor]
+        
+        next_cursor = None
+        if len(students) > limit:
+            students = students[:limit]
+            next_cursor = students[-1]['id']
         
-        response = jsonify({
+        result = {
             "status": "success",
-            "data": processed_students,
-            "students": processed_students,  # Thêm trường này để tương thích với frontend
-            "count": len(processed_students)
-        })
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
+            "students": students,
+            "count": len(students),
+            "next_cursor": next_cursor
+        }
+        # Tổng số chỉ tính ở trang đầu tiên
+        if not after:
+            result["total"] = student_collection.count_documents(query)
+        
+        return jsonify(result)
     
     except Exception as e:
-        print(f"Lỗi khi lấy danh sách sinh viên: {e}")
-        response = jsonify({
+        logger.error("Lỗi khi lấy danh sách sinh viên: %s", e)
+        return jsonify({
             "status": "error",
             "message": f"Lỗi khi lấy danh sách sinh viên: {str(e)}"
         }), 500
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
 
 # Route lấy thông tin học tập của sinh viên theo ID
-@admin_bp.route('/students/<student_id>/academic_records', methods=['GET', 'OPTIONS'])
+@admin_bp.route('/students/<student_id>/academic_records', methods=['GET'])
 def admin_get_student_academic_records(student_id):
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'success'})
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
-    
     # Kiểm tra quyền admin
     if 'admin_id' not in session or session.get('role') != 'admin':
-        response = jsonify({
+        return jsonify({
             "status": "error",
             "message": "Không có quyền truy cập"
         }), 403
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     
     try:
-        from main import mongo
+        mongo = current_app.extensions['mongo']
         
         # Tìm sinh viên theo ID
         student_collection = mongo.db.student
         student = student_collection.find_one({"_id": ObjectId(student_id)})
         
         if not student:
-            response = jsonify({
+            return jsonify({
                 "status": "error",
                 "message": "Không tìm thấy sinh viên"
             }), 404
-            response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-            response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-            return response
         
         # Lấy MSSV của sinh viên
         mssv = student.get('mssv')
         
         if not mssv:
-            response = jsonify({
+            return jsonify({
                 "status": "error",
                 "message": "Sinh viên không có MSSV"
             }), 404
-            response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-            response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-            return response
         
         # Tìm bản ghi học tập của sinh viên theo MSSV
         academic_records_collection = mongo.db.academic_records
         academic_record = academic_records_collection.find_one({"mssv": mssv})
         
         if academic_record:
-            # Chuyển đổi ObjectId thành string
-            if '_id' in academic_record and isinstance(academic_record['_id'], ObjectId):
-                academic_record['_id'] = str(academic_record['_id'])
-            
             # Sắp xếp semester_averages theo thứ tự thời gian
             if 'summary' in academic_record and 'semester_averages' in academic_record['summary']:
-                # In ra các giá trị để debug
-                print("Semester averages before sorting:", [item['semester'] for item in academic_record['summary']['semester_averages']])
-                
                 def semester_sort_key(item):
                     semester = item['semester']
                     # Trích xuất năm học và học kỳ
@@ -264,56 +242,33 @@ def admin_get_student_academic_records(student_id):
                 
                 # Sắp xếp tăng dần theo thời gian
                 academic_record['summary']['semester_averages'].sort(key=semester_sort_key)
-                
-                # In ra các giá trị sau khi sắp xếp để debug
-                print("Semester averages after sorting:", [item['semester'] for item in academic_record['summary']['semester_averages']])
             
             response = jsonify({
                 "status": "success",
                 "data": academic_record
             })
         
-        if isinstance(response, tuple):
-            response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-            response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        else:
-            response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-            response.headers.add('Access-Control-Allow-Credentials', 'true')
         return response
     
     except Exception as e:
-        print(f"Lỗi khi lấy thông tin học tập của sinh viên: {e}")
-        response = jsonify({
+        logger.error("Lỗi khi lấy thông tin học tập của sinh viên: %s", e)
+        return jsonify({
             "status": "error",
             "message": f"Lỗi khi lấy thông tin học tập của sinh viên: {str(e)}"
         }), 500
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
 
 # Route lấy danh sách giảng viên
-@admin_bp.route('/instructors', methods=['GET', 'OPTIONS'])
+@admin_bp.route('/instructors', methods=['GET'])
 def admin_get_instructors():
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'success'})
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
-    
     # Kiểm tra quyền admin
     if 'admin_id' not in session or session.get('role') != 'admin':
-        response = jsonify({
+        return jsonify({
             "status": "error",
             "message": "Không có quyền truy cập"
         }), 403
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     
     try:
-        from main import mongo
+        mongo = current_app.extensions['mongo']
         
         # Lấy danh sách giảng viên từ collection
         instructor_collection = mongo.db.instructors
@@ -326,14 +281,6 @@ def admin_get_instructors():
         # Xử lý và định dạng dữ liệu giảng viên
         processed_instructors = []
         for instructor in instructors:
-            # Chuyển đổi ObjectId thành string
-            if '_id' in instructor and isinstance(instructor['_id'], ObjectId):
-                instructor['_id'] = str(instructor['_id'])
-            if 'user_id' in instructor and isinstance(instructor['user_id'], ObjectId):
-                instructor['user_id'] = str(instructor['user_id'])
-            if 'faculty_id' in instructor and isinstance(instructor['faculty_id'], ObjectId):
-                instructor['faculty_id'] = str(instructor['faculty_id'])
-            
             # Lấy thông tin cá nhân
             full_name = instructor.get('personal_info', {}).get('full_name', 'Chưa cập nhật')
             
@@ -354,7 +301,7 @@ def admin_get_instructors():
                     position = 'Giảng viên chính'
             
             # Lấy tên khoa từ faculty_id
-            faculty_name = faculties.get(instructor.get('faculty_id', ''), 'Chưa xác định')
+            faculty_name = faculties.get(str(instructor.get('faculty_id', '')), 'Chưa xác định')
             
             # Tạo đối tượng giảng viên đã xử lý
             processed_instructor = {
@@ -373,80 +320,49 @@ def admin_get_instructors():
             
             processed_instructors.append(processed_instructor)
         
-        response = jsonify({
+        return jsonify({
             "status": "success",
             "data": processed_instructors,
             "instructors": processed_instructors,  # Thêm trường này để tương thích với frontend
             "count": len(processed_instructors)
         })
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     
     except Exception as e:
-        print(f"Lỗi khi lấy danh sách giảng viên: {e}")
-        response = jsonify({
+        logger.error("Lỗi khi lấy danh sách giảng viên: %s", e)
+        return jsonify({
             "status": "error",
             "message": f"Lỗi khi lấy danh sách giảng viên: {str(e)}"
         }), 500
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
 
 # Route lấy thông tin chi tiết giảng viên và khóa học
-@admin_bp.route('/instructors/<instructor_id>', methods=['GET', 'OPTIONS'])
+@admin_bp.route('/instructors/<instructor_id>', methods=['GET'])
 def admin_get_instructor_detail(instructor_id):
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'success'})
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
-    
     # Kiểm tra quyền admin
     if 'admin_id' not in session or session.get('role') != 'admin':
-        response = jsonify({
+        return jsonify({
             "status": "error",
             "message": "Không có quyền truy cập"
         }), 403
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     
     try:
-        from main import mongo
+        mongo = current_app.extensions['mongo']
         
         # Lấy thông tin giảng viên
         instructor_collection = mongo.db.instructors
         try:
             instructor = instructor_collection.find_one({"_id": ObjectId(instructor_id)})
         except Exception as e:
-            print(f"Lỗi khi tìm giảng viên: {e}")
-            response = jsonify({
+            logger.error("Lỗi khi tìm giảng viên: %s", e)
+            return jsonify({
                 "status": "error",
                 "message": f"ID giảng viên không hợp lệ: {str(e)}"
             }), 400
-            response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-            response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-            return response
             
         if not instructor:
-            response = jsonify({
+            return jsonify({
                 "status": "error",
                 "message": "Không tìm thấy giảng viên"
             }), 404
-            response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-            response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-            return response
-        
-        # Chuyển đổi ObjectId thành string
-        if '_id' in instructor and isinstance(instructor['_id'], ObjectId):
-            instructor['_id'] = str(instructor['_id'])
-        if 'user_id' in instructor and isinstance(instructor['user_id'], ObjectId):
-            instructor['user_id'] = str(instructor['user_id'])
-        if 'faculty_id' in instructor and isinstance(instructor['faculty_id'], ObjectId):
-            instructor['faculty_id'] = str(instructor['faculty_id'])
         
         # Lấy thông tin khoa
         faculty_collection = mongo.db.faculties
@@ -454,31 +370,24 @@ def admin_get_instructor_detail(instructor_id):
         if 'faculty_id' in instructor:
             try:
                 faculty = faculty_collection.find_one({"_id": ObjectId(instructor['faculty_id'])})
-                if faculty and '_id' in faculty:
-                    faculty['_id'] = str(faculty['_id'])
             except Exception as e:
-                print(f"Lỗi khi tìm khoa: {e}")
+                logger.error("Lỗi khi tìm khoa: %s", e)
         
         # Lấy danh sách khóa học của giảng viên
         offered_courses_collection = mongo.db.offered_courses
         try:
             courses = list(offered_courses_collection.find({"instructor_id": ObjectId(instructor_id)}))
-            print(f"Tìm thấy {len(courses)} khóa học cho giảng viên {instructor_id}")
+            logger.debug("Tìm thấy %d khóa học cho giảng viên %s", len(courses), instructor_id)
         except Exception as e:
-            print(f"Lỗi khi tìm khóa học: {e}")
+            logger.error("Lỗi khi tìm khóa học: %s", e)
             courses = []
         
+        # Lấy thông tin sinh viên của tất cả các lớp bằng một truy vấn
+        students_by_id = resolve_students(mongo.db.student, roster_student_ids(courses))
+        
         # Xử lý thông tin khóa học
         processed_courses = []
         for course in courses:
-            # Chuyển đổi ObjectId thành string
-            if '_id' in course and isinstance(course['_id'], ObjectId):
-                course['_id'] = str(course['_id'])
-            if 'course_id' in course and isinstance(course['course_id'], ObjectId):
-                course['course_id'] = str(course['course_id'])
-            if 'instructor_id' in course and isinstance(course['instructor_id'], ObjectId):
-                course['instructor_id'] = str(course['instructor_id'])
-            
             # Đếm số sinh viên
             student_count = len(course.get('students', []))
             
@@ -487,17 +396,9 @@ def admin_get_instructor_detail(instructor_id):
             if 'students' in course:
                 for student_info in course['students']:
                     student_id = student_info.get('student_id')
-                    if isinstance(student_id, ObjectId):
-                        student_id = str(student_id)
                     
-                    # Lấy thông tin sinh viên từ collection
-                    student = None
-                    if student_id:
-                        try:
-                            student = mongo.db.student.find_one({"_id": ObjectId(student_id)})
-                        except Exception as e:
-                            print(f"Lỗi khi tìm sinh viên {student_id}: {e}")
-                            pass
+                    # Thông tin sinh viên đã lấy sẵn
+                    student = students_by_id.get(to_object_id(student_id)) if student_id else None
                     
                     # Tạo dữ liệu sinh viên
                     student_data = {
@@ -536,107 +437,267 @@ def admin_get_instructor_detail(instructor_id):
             "specialization": instructor.get('academic_info', {}).get('specialization', 'N/A')
         }
         
-        response = jsonify({
+        return jsonify({
             "status": "success",
             "instructor": instructor_data,
             "classes": processed_courses
         })
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     
     except Exception as e:
-        print(f"Lỗi khi lấy thông tin giảng viên: {e}")
-        response = jsonify({
+        logger.error("Lỗi khi lấy thông tin giảng viên: %s", e)
+        return jsonify({
             "status": "error",
             "message": f"Lỗi khi lấy thông tin giảng viên: {str(e)}"
         }), 500
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
+
+# Số lớp mỗi trang của /admin/classes
+CLASS_PAGE_SIZE = 50
+CLASS_PAGE_SIZE_MAX = 200
+
+# Các trường thông tin lớp trả về trong danh sách (không gồm danh sách sinh viên)
+CLASS_LIST_FIELDS = (
+    "class_code", "course_code", "course_name", "semester", "academic_year",
+    "location", "instructor_id", "max_enrollment", "status",
+)
+
+
+def class_list_query(args):
+    """Điều kiện truy vấn từ tham số semester / instructor_id / search (tiền tố mã lớp, mã môn, tên môn)"""
+    query = {}
+    if args.get('semester'):
+        query['semester'] = args.get('semester')
+    if args.get('instructor_id') and ObjectId.is_valid(args.get('instructor_id')):
+        query['instructor_id'] = ObjectId(args.get('instructor_id'))
+    
+    search = (args.get('search') or '').strip()
+    if search:
+        prefix = {'$regex': '^' + re.escape(search)}
+        query['$or'] = [{'class_code': prefix}, {'course_code': prefix}, {'course_name': prefix}]
+    return query
+
+
+def class_summary_pipeline(query, limit):
+    """
+    Pipeline lấy một trang lớp học kèm sĩ số và tổng hợp điểm
+
+    Sĩ số được tính trên MongoDB, danh sách sinh viên không được gửi về
+    ứng dụng. Điểm tổng kết dùng grade_summary đã lưu sẵn khi giảng viên
+    cập nhật điểm, chỉ tính trên MongoDB với lớp chưa có.
+    """
+    project = {field: 1 for field in CLASS_LIST_FIELDS}
+    project.update({
+        "student_count": {"$size": {"$ifNull": ["$students", []]}},
+        "grade_summary": {"$ifNull": ["$grade_summary", grade_summary_expression(computed_at=None)]},
+    })
+    return [
+        {"$match": query},
+        {"$sort": {"_id": 1}},
+        {"$limit": limit},
+        {"$project": project},
+    ]
+
+
+def class_list_item(course, instructors):
+    item = {field: course.get(field) for field in CLASS_LIST_FIELDS}
+    instructor = instructors.get(course.get('instructor_id'))
+    item.update({
+        "_id": str(course['_id']),
+        "instructor_id": str(course['instructor_id']) if course.get('instructor_id') else None,
+        "instructor_name": instructor.get('personal_info', {}).get('full_name') if instructor else None,
+        "student_count": course.get('student_count', 0),
+        "grade_summary": course.get('grade_summary', {}),
+    })
+    summary = item['grade_summary']
+    if isinstance(summary.get('average_total'), float):
+        summary['average_total'] = round(summary['average_total'], 2)
+    return item
+
+
+def instructors_by_id(mongo, instructor_ids):
+    """Tên giảng viên của nhiều lớp bằng một truy vấn $in"""
+    ids = {to_object_id(i) for i in instructor_ids if i}
+    ids.discard(None)
+    if not ids:
+        return {}
+    cursor = mongo.db.instructors.find({"_id": {"$in": list(ids)}}, {"personal_info.full_name": 1, "contact.email": 1, "academic_info.specialization": 1})
+    return {instructor['_id']: instructor for instructor in cursor}
 
 # Route lấy danh sách lớp học
-@admin_bp.route('/classes', methods=['GET', 'OPTIONS'])
+# Tham số: limit, after (con trỏ trang tiếp theo), semester, instructor_id, search
+@admin_bp.route('/classes', methods=['GET'])
 def admin_get_classes():
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'success'})
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
-    
     # Kiểm tra quyền admin
     if 'admin_id' not in session or session.get('role') != 'admin':
-        response = jsonify({
+        return jsonify({
             "status": "error",
             "message": "Không có quyền truy cập"
         }), 403
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
+    
+    # Con trỏ phân trang là _id của lớp cuối cùng ở trang trước
+    after = request.args.get('after')
+    if after and not ObjectId.is_valid(after):
+        return jsonify({
+            "status": "error",
+            "message": "Tham số after không hợp lệ"
+        }), 400
     
     try:
-        from main import mongo
+        mongo = current_app.extensions['mongo']
         
-        # Lấy danh sách lớp học từ collection
         offered_courses_collection = mongo.db.offered_courses
-        classes = list(offered_courses_collection.find({}))
-        
-        # Chuyển đổi ObjectId thành string
-        for course in classes:
-            if '_id' in course and isinstance(course['_id'], ObjectId):
-                course['_id'] = str(course['_id'])
-            if 'course_id' in course and isinstance(course['course_id'], ObjectId):
-                course['course_id'] = str(course['course_id'])
-            if 'instructor_id' in course and isinstance(course['instructor_id'], ObjectId):
-                course['instructor_id'] = str(course['instructor_id'])
-            
-            # Xử lý danh sách sinh viên nếu có
-            if 'students' in course:
-                for student in course['students']:
-                    if 'student_id' in student and isinstance(student['student_id'], ObjectId):
-                        student['student_id'] = str(student['student_id'])
+        limit = min(max(request.args.get('limit', CLASS_PAGE_SIZE, type=int), 1), CLASS_PAGE_SIZE_MAX)
+        query = class_list_query(request.args)
         
-        response = jsonify({
+        page_query = dict(query)
+        if after:
+            page_query['_id'] = {'$gt': ObjectId(after)}
+        
+        courses = list(offered_courses_collection.aggregate(class_summary_pipeline(page_query, limit + 1)))
+        next_cursor = None
+        if len(courses) > limit:
+            courses = courses[:limit]
+            next_cursor = str(courses[-1]['_id'])
+        
+        instructors = instructors_by_id(mongo, [course.get('instructor_id') for course in courses])
+        classes = [class_list_item(course, instructors) for course in courses]
+        
+        result = {
             "status": "success",
-            "data": classes,
-            "classes": classes,  # Thêm trường này để tương thích với frontend
-            "count": len(classes)
-        })
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
+            "classes": classes,
+            "count": len(classes),
+            "next_cursor": next_cursor
+        }
+        # Tổng số chỉ tính ở trang đầu tiên
+        if not after:
+            result["total"] = offered_courses_collection.count_documents(query)
+        
+        return jsonify(result)
     
     except Exception as e:
-        print(f"Lỗi khi lấy danh sách lớp học: {e}")
-        response = jsonify({
+        logger.error("Lỗi khi lấy danh sách lớp học: %s", e)
+        return jsonify({
             "status": "error",
             "message": f"Lỗi khi lấy danh sách lớp học: {str(e)}"
         }), 500
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
+
+# Route xuất toàn bộ lớp học (kèm danh sách sinh viên và điểm) dạng NDJSON, mỗi dòng một lớp
+@admin_bp.route('/classes/export', methods=['GET'])
+def admin_export_classes():
+    # Kiểm tra quyền admin
+    if 'admin_id' not in session or session.get('role') != 'admin':
+        return jsonify({
+            "status": "error",
+            "message": "Không có quyền truy cập"
+        }), 403
+    
+    mongo = current_app.extensions['mongo']
+    
+    query = class_list_query(request.args)
+    cursor = mongo.db.offered_courses.find(query).sort('_id', 1).batch_size(100)
+    
+    json_provider = current_app.json
+    
+    # Ghi từng lớp ngay khi đọc được, không giữ toàn bộ dữ liệu trong bộ nhớ
+    def generate():
+        try:
+            for course in cursor:
+                yield json_provider.dumps_bytes(course) + b"\n"
+        finally:
+            cursor.close()
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['Content-Disposition'] = 'attachment; filename=classes.ndjson'
+    return response
+
+# Route lấy chi tiết một lớp học: thông tin lớp, giảng viên và danh sách sinh viên
+@admin_bp.route('/classes/<class_id>', methods=['GET'])
+def admin_get_class_detail(class_id):
+    # Kiểm tra quyền admin
+    if 'admin_id' not in session or session.get('role') != 'admin':
+        return jsonify({
+            "status": "error",
+            "message": "Không có quyền truy cập"
+        }), 403
+    
+    if not ObjectId.is_valid(class_id):
+        return jsonify({
+            "status": "error",
+            "message": "ID lớp học không hợp lệ"
+        }), 400
+    
+    try:
+        mongo = current_app.extensions['mongo']
+        
+        course = mongo.db.offered_courses.find_one({"_id": ObjectId(class_id)})
+        if not course:
+            return jsonify({
+                "status": "error",
+                "message": "Không tìm thấy lớp học"
+            }), 404
+        
+        roster = course.get('students') or []
+        students_by_id = resolve_students(
+            mongo.db.student,
+            roster_student_ids([course]),
+            dict(STUDENT_LOOKUP_PROJECTION, **{"personal_info.faculty": 1})
+        )
+        students = []
+        for student_info in roster:
+            student_id = student_info.get('student_id')
+            student = students_by_id.get(to_object_id(student_id)) if student_id else None
+            personal_info = student.get('personal_info', {}) if student else {}
+            students.append({
+                "_id": str(student_id) if student_id else None,
+                "student_id": str(student_id) if student_id else None,
+                "mssv": student_info.get('mssv') or (student.get('mssv') if student else None),
+                "personal_info": {"full_name": student_info.get('full_name') or personal_info.get('full_name')},
+                "email": student_info.get('email') or personal_info.get('email', {}).get('school'),
+                "faculty": personal_info.get('faculty'),
+                "class": personal_info.get('class'),
+                "grades": student_info.get('grades', {}),
+                "letter_grade": student_info.get('letter_grade')
+            })
+        
+        instructor = instructors_by_id(mongo, [course.get('instructor_id')]).get(to_object_id(course.get('instructor_id')))
+        class_data = {field: course.get(field) for field in CLASS_LIST_FIELDS}
+        class_data.update({
+            "_id": str(course['_id']),
+            "instructor_id": str(course['instructor_id']) if course.get('instructor_id') else None,
+            "credits": course.get('credits'),
+            "room": course.get('room') or course.get('location'),
+            "schedule": course.get('schedule'),
+            "student_count": len(roster),
+            "grade_summary": course.get('grade_summary')
+        })
+        
+        return jsonify({
+            "status": "success",
+            "class": class_data,
+            "instructor": {
+                "_id": str(instructor['_id']),
+                "name": instructor.get('personal_info', {}).get('full_name'),
+                "email": instructor.get('contact', {}).get('email'),
+                "department": instructor.get('academic_info', {}).get('specialization')
+            } if instructor else None,
+            "students": students
+        })
+    
+    except Exception as e:
+        logger.error("Lỗi khi lấy thông tin lớp học: %s", e)
+        return jsonify({
+            "status": "error",
+            "message": f"Lỗi khi lấy thông tin lớp học: {str(e)}"
+        }), 500
+
 # Route lấy danh sách thông báo
-@admin_bp.route('/notifications', methods=['GET', 'OPTIONS'])
+@admin_bp.route('/notifications', methods=['GET'])
 def admin_get_notifications():
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'success'})
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
-    
     # Kiểm tra quyền admin
     if 'admin_id' not in session or session.get('role') != 'admin':
-        response = jsonify({
+        return jsonify({
             "status": "error",
             "message": "Không có quyền truy cập"
         }), 403
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     
     try:
         # Tạo dữ liệu thông báo mẫu (vì có vẻ như chưa có collection notifications)
@@ -667,22 +728,117 @@ def admin_get_notifications():
             }
         ]
         
-        response = jsonify({
+        return jsonify({
             "status": "success",
             "data": notifications,
             "notifications": notifications,  # Thêm trường này để tương thích với frontend
             "count": len(notifications)
         })
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     
     except Exception as e:
-        print(f"Lỗi khi lấy danh sách thông báo: {e}")
-        response = jsonify({
+        logger.error("Lỗi khi lấy danh sách thông báo: %s", e)
+        return jsonify({
             "status": "error",
             "message": f"Lỗi khi lấy danh sách thông báo: {str(e)}"
         }), 500
-        response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
\ No newline at end of file
+
+# Route xem các bộ đếm / thống kê hiệu năng của server
+@admin_bp.route('/metrics', methods=['GET'])
+def admin_get_metrics():
+    # Kiểm tra quyền admin
+    if 'admin_id' not in session or session.get('role') != 'admin':
+        return jsonify({
+            "status": "error",
+            "message": "Không có quyền truy cập"
+        }), 403
+    
+    return jsonify({
+        "status": "success",
+        "metrics": metrics.snapshot()
+    })
+
+# Route xem / xóa bộ nhớ đệm chương trình đào tạo (gọi sau khi cập nhật chương trình)
+@admin_bp.route('/curriculum/cache', methods=['GET', 'DELETE'])
+def admin_curriculum_cache():
+    """
+    Xem hoặc xóa bộ nhớ đệm chương trình đào tạo
+
+    DELETE chỉ xóa bộ nhớ đệm của worker nhận request. Khi change stream
+    đang chạy (cache.watching) các worker khác đã tự xóa lúc chương trình
+    thay đổi; nếu không, chúng dùng bản cũ tối đa cache.ttl giây.
+    """
+    # Kiểm tra quyền admin
+    if 'admin_id' not in session or session.get('role') != 'admin':
+        return jsonify({
+            "status": "error",
+            "message": "Không có quyền truy cập"
+        }), 403
+    
+    curriculum_cache = current_app.extensions['curriculum_cache']
+    
+    if request.method == 'DELETE':
+        # ?major=... để chỉ xóa một ngành, bỏ trống để xóa tất cả
+        removed = curriculum_cache.invalidate(request.args.get('major') or None)
+        message = f"Đã xóa {removed} chương trình đào tạo khỏi bộ nhớ đệm của worker này"
+        if not curriculum_cache.watching:
+            message += f"; các worker khác tải lại sau tối đa {curriculum_cache.ttl} giây"
+        return jsonify({
+            "status": "success",
+            "message": message,
+            "scope": "all_workers" if curriculum_cache.watching else "local_worker",
+            "cache": curriculum_cache.stats()
+        })
+    else:
+        return jsonify({
+            "status": "success",
+            "cache": curriculum_cache.stats()
+        })
+
+# Route thống kê điểm trung bình, tín chỉ và tỉ lệ qua môn của cả khóa / lớp / ngành
+@admin_bp.route('/analytics/cohort', methods=['GET'])
+def admin_cohort_analytics():
+    # Kiểm tra quyền admin
+    if 'admin_id' not in session or session.get('role') != 'admin':
+        return jsonify({
+            "status": "error",
+            "message": "Không có quyền truy cập"
+        }), 403
+    
+    group_by = request.args.get('group_by') or None
+    if group_by and group_by not in COHORT_GROUP_FIELDS:
+        return jsonify({
+            "status": "error",
+            "message": "group_by chỉ nhận giá trị class hoặc major"
+        }), 400
+    
+    course_limit = request.args.get('course_limit', '50')
+    if not course_limit.isdigit() or int(course_limit) < 1:
+        return jsonify({
+            "status": "error",
+            "message": "course_limit phải là số nguyên lớn hơn 0"
+        }), 400
+    
+    try:
+        mongo = current_app.extensions['mongo']
+        student_collection = mongo.db.student
+        academic_records_collection = mongo.db.academic_records
+        
+        statistics = cohort_statistics(
+            academic_records_collection,
+            student_collection,
+            major=request.args.get('major'),
+            class_name=request.args.get('class'),
+            group_by=group_by,
+            course_limit=int(course_limit)
+        )
+        return jsonify({
+            "status": "success",
+            "statistics": statistics
+        })
+    
+    except Exception as e:
+        logger.error("Lỗi khi thống kê dữ liệu học tập: %s", e)
+        return jsonify({
+            "status": "error",
+            "message": f"Lỗi khi thống kê dữ liệu học tập: {str(e)}"
+        }), 500
@@ -0,0 +1,175 @@
+# Ghi log không chặn request: route chỉ đưa bản ghi vào hàng đợi, một luồng nền định dạng và ghi ra stdout
+#
+# LOG_LEVEL         mức log chung (mặc định INFO)
+# LOG_LEVELS        mức riêng từng logger, ví dụ "instructor_module=DEBUG,werkzeug=WARNING"
+# LOG_SAMPLE_RATES  tỉ lệ giữ log dưới WARNING theo endpoint, ví dụ "check_session=0.01,get_course_detail=0.1"
+# LOG_FORMAT        json (mặc định, mỗi dòng một đối tượng JSON) hoặc text
+# LOG_QUEUE_SIZE    số bản ghi tối đa đang chờ ghi, vượt quá thì bỏ bớt (mặc định 10000)
+# LOG_FAST_RECORDS  1 thì bỏ tên file / dòng / tiến trình / luồng khỏi mọi bản ghi trong tiến trình (mặc định 0)
+import atexit
+from datetime import datetime
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
+import queue
+import random
+import sys
+
+from flask import has_request_context, request
+
+import metrics
+from json_provider import bson_default
+
+try:
+    import orjson
+except ImportError:  # orjson là tùy chọn, không có thì dùng thư viện json chuẩn
+    orjson = None
+
+
+def _parse_pairs(value, convert):
+    """Đọc chuỗi "a=1,b=2" thành {"a": convert("1"), "b": convert("2")}"""
+    pairs = {}
+    for item in value.split(","):
+        name, sep, setting = item.partition("=")
+        if sep and name.strip():
+            pairs[name.strip()] = convert(setting.strip())
+    return pairs
+
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = _parse_pairs(os.getenv("LOG_LEVELS", ""), str.upper)
+LOG_SAMPLE_RATES = _parse_pairs(os.getenv("LOG_SAMPLE_RATES", ""), float)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_FAST_RECORDS = os.getenv("LOG_FAST_RECORDS", "0") == "1"
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(route)s] %(message)s"
+
+# Thuộc tính sẵn có của LogRecord; thuộc tính khác (truyền qua extra=) được ghi thành trường riêng
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "route"}
+
+
+class RouteSampler(logging.Filter):
+    """
+    Gắn endpoint của request vào bản ghi và chỉ giữ một phần log dưới WARNING
+    của các endpoint có trong LOG_SAMPLE_RATES
+
+    Chạy ở luồng xử lý request (trước khi vào hàng đợi) nên đọc được flask.request.
+    WARNING trở lên luôn được giữ.
+    """
+
+    def __init__(self, rates=None, default_rate=1.0):
+        super().__init__()
+        self.rates = LOG_SAMPLE_RATES if rates is None else rates
+        self.default_rate = default_rate
+
+    def filter(self, record):
+        record.route = request.endpoint if has_request_context() else None
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.route, self.default_rate)
+        if rate >= 1 or random.random() < rate:
+            return True
+        metrics.incr("logging.sampled_out")
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler không bao giờ chờ: hàng đợi đủ LOG_QUEUE_SIZE bản ghi thì bỏ bản ghi mới và đếm lại
+
+    Luồng gọi chỉ ghép message với args (args có thể bị sửa ngay sau lời gọi log);
+    không copy bản ghi và không định dạng như QueueHandler gốc, việc đó để luồng nền làm.
+    """
+
+    def __init__(self, log_queue, max_size=LOG_QUEUE_SIZE):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self._exception_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.max_size:
+            metrics.incr("logging.dropped")
+            return
+        self.queue.put_nowait(record)
+
+
+class JSONFormatter(logging.Formatter):
+    """Mỗi bản ghi là một dòng JSON: ts, level, logger, route, msg và các trường truyền qua extra="""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "route": getattr(record, "route", None),
+            "msg": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if orjson is not None:
+            return orjson.dumps(entry, default=bson_default).decode("utf-8")
+        return json.dumps(entry, default=bson_default, ensure_ascii=False)
+
+
+def make_formatter(log_format=LOG_FORMAT):
+    if log_format == "text":
+        return logging.Formatter(TEXT_FORMAT)
+    return JSONFormatter()
+
+
+_listener = None
+
+
+def setup_logging(stream=None):
+    """
+    Gắn hàng đợi log vào root logger và chạy luồng nền ghi log (gọi một lần khi khởi động)
+
+    Args:
+        stream: Nơi ghi log, mặc định sys.stdout
+
+    Returns:
+        QueueListener: Luồng nền đang chạy (dừng tự động khi thoát tiến trình)
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(make_formatter())
+
+    if LOG_FAST_RECORDS:
+        # Định dạng log không dùng tên file / dòng / tiến trình / luồng mà LogRecord tốn thêm
+        # vài µs cho mỗi lần gọi. Cờ này áp dụng cho cả thư viện khác trong tiến trình nên chỉ bật khi được yêu cầu
+        logging._srcfile = None
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+        logging.logThreads = False
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RouteSampler())
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(queue_handler)
+    for name, level in LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    # Ghi nốt các bản ghi còn trong hàng đợi trước khi thoát
+    atexit.register(_listener.stop)
+    return _listener
@@ -0,0 +1 @@
+# Benchmark: chạy từng file bằng `python -m benchmarks.<tên>` ở thư mục gốc
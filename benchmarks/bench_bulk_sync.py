@@ -0,0 +1,85 @@
+# Thông lượng của scraper.bulk_sync trên cổng thông tin giả lập
+#
+# Cách dùng:
+#     python -m benchmarks.bench_bulk_sync --students 500 --concurrency 16 --rate 200 --delay 0.05
+#     python -m benchmarks.bench_bulk_sync --mongo-uri mongodb://localhost:27017/bench
+#
+# Không có --mongo-uri thì các lô bulk_write được giữ trong bộ nhớ, chỉ đo phần tải và phân tích.
+import argparse
+import json
+import os
+import tempfile
+
+from pymongo import MongoClient
+
+import scraper.fetch
+from benchmarks.bench_fetch import start_stub_portal
+from benchmarks.bench_transcript_parser import synthetic_transcript
+from scraper.bulk_sync import BulkResync
+
+REGISTRATION_PAGE_HTML = (
+    '<div class="title_thongtindangky">HỌC KỲ 2 NĂM 2023 - 2024</div>'
+    '<table><tr><th>STT</th></tr><tr><td>1</td><td>IT101</td><td>x</td><td>Lập trình</td><td>4</td></tr></table>'
+)
+
+
+class MemoryCollection:
+    """Collection giữ tài liệu trong dict, chỉ đủ cho bulk_write của BulkResync"""
+
+    def __init__(self):
+        self.documents = {}
+        self.bulk_writes = 0
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_writes += 1
+        for operation in operations:
+            document = getattr(operation, "_doc")
+            self.documents[getattr(operation, "_filter")["mssv"]] = document
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo thông lượng đồng bộ hàng loạt trên cổng thông tin giả lập")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--courses", type=int, default=60, help="Số môn trong bảng điểm mỗi sinh viên")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=200, help="Số request/giây tối đa tới cổng thông tin")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.05, help="Độ trễ mỗi trang của cổng giả lập (giây)")
+    parser.add_argument("--mongo-uri", help="Ghi vào MongoDB thật thay vì bộ nhớ")
+    args = parser.parse_args(argv)
+
+    transcript = synthetic_transcript(args.courses).encode("utf-8")
+    registration = REGISTRATION_PAGE_HTML.encode("utf-8")
+    server, base_url = start_stub_portal(
+        args.delay, lambda path: transcript if "kqhoctap" in path else registration
+    )
+    scraper.fetch.PORTAL_BASE_URL = base_url
+
+    if args.mongo_uri:
+        database = MongoClient(args.mongo_uri).get_default_database()
+        records, students = database.academic_records, database.student
+    else:
+        records, students = MemoryCollection(), MemoryCollection()
+
+    checkpoint = os.path.join(tempfile.mkdtemp(), "bulk_sync.checkpoint.jsonl")
+    try:
+        resync = BulkResync(
+            records,
+            student_collection=students,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            batch_size=args.batch_size,
+            checkpoint_path=checkpoint,
+            log=lambda *a: None,
+        )
+        pairs = ((f"2152{i:04d}", "benchmark") for i in range(args.students))
+        report = resync.run(pairs)
+    finally:
+        server.shutdown()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
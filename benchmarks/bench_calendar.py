@@ -0,0 +1,105 @@
+# Số truy vấn MongoDB và thời gian chọn môn gợi ý của /calendar cho cả chương trình đào tạo:
+# check_course_completion cũ (một find_one cho mỗi môn và mỗi môn tiên quyết) so với
+# CompletedCourseIndex + PrerequisiteGraph (một find_one cho cả request)
+#
+# Cách dùng:
+#     python -m benchmarks.bench_calendar --subjects 150 --round-trip-ms 1
+#
+# MongoDB được thay bằng collection trong bộ nhớ, mỗi find_one chờ thêm --round-trip-ms
+# để mô phỏng độ trễ mạng tới máy chủ.
+import argparse
+import copy
+import random
+import time
+
+from academics import CompletedCourseIndex, PrerequisiteGraph
+from academics.completion import COURSE_FAILED
+
+MSSV = "21520001"
+
+
+class CountingCollection:
+    """Collection một tài liệu, đếm số lần find_one"""
+
+    def __init__(self, document, round_trip):
+        self.document = document
+        self.round_trip = round_trip
+        self.queries = 0
+
+    def find_one(self, query):
+        self.queries += 1
+        if self.round_trip:
+            time.sleep(self.round_trip)
+        return copy.deepcopy(self.document) if query.get("mssv") == self.document["mssv"] else None
+
+
+def synthetic_program(subjects, seed=0):
+    """Chương trình đào tạo `subjects` môn (mỗi môn tối đa 2 môn tiên quyết) và bảng điểm đã học khoảng 60%"""
+    rng = random.Random(seed)
+    curriculum = []
+    for i in range(subjects):
+        prerequisites = rng.sample([f"IT{j:03d}" for j in range(i)], k=min(i, rng.choice([0, 1, 2])))
+        curriculum.append({"course_code": f"IT{i:03d}", "credits": 4, "category": "Cơ sở ngành",
+                           "prerequisites": prerequisites})
+    taken = [subject["course_code"] for subject in curriculum[:int(subjects * 0.6)]]
+    semesters = [
+        {"semester": f"HK{k}", "courses": [
+            {"course_code": code, "complete": rng.choice(["Qua môn", "Qua môn", "Qua môn", COURSE_FAILED])}
+            for code in taken[k::8]
+        ]}
+        for k in range(8)
+    ]
+    return curriculum, {"mssv": MSSV, "academic_records": semesters}
+
+
+def unlocked_n_plus_one(collection, curriculum, mssv):
+    """Vòng lặp cũ của /calendar"""
+
+    def check_course_completion(course_code):
+        academic_record = collection.find_one({"mssv": mssv})
+        if not academic_record or 'academic_records' not in academic_record:
+            return False
+        for record in academic_record['academic_records']:
+            for course in record['courses']:
+                if course.get('course_code') == course_code and course.get('complete') != COURSE_FAILED:
+                    return True
+        return False
+
+    unlocked = []
+    for subject in curriculum:
+        course_code = subject.get('course_code')
+        if course_code and not check_course_completion(course_code):
+            if all(check_course_completion(prereq) for prereq in subject.get('prerequisites', [])):
+                unlocked.append(course_code)
+    return unlocked
+
+
+def unlocked_indexed(collection, curriculum, mssv):
+    """Cách hiện tại của /calendar"""
+    completed = CompletedCourseIndex.from_academic_record(collection.find_one({"mssv": mssv}))
+    return PrerequisiteGraph(curriculum).unlocked(completed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So sánh số truy vấn và thời gian chọn môn gợi ý của /calendar")
+    parser.add_argument("--subjects", type=int, nargs="+", default=[50, 150])
+    parser.add_argument("--round-trip-ms", type=float, default=0.5, help="Độ trễ giả lập của mỗi truy vấn")
+    args = parser.parse_args(argv)
+
+    print(f"{'môn':>5} {'cách':<10} {'truy vấn':>9} {'ms':>9}")
+    for subjects in args.subjects:
+        curriculum, academic_record = synthetic_program(subjects, seed=subjects)
+        results = []
+        for name, fn in (("N+1", unlocked_n_plus_one), ("chỉ mục", unlocked_indexed)):
+            collection = CountingCollection(academic_record, args.round_trip_ms / 1000)
+            start = time.perf_counter()
+            results.append(fn(collection, curriculum, MSSV))
+            elapsed = time.perf_counter() - start
+            print(f"{subjects:>5} {name:<10} {collection.queries:>9} {elapsed * 1000:>9.1f}")
+        if results[0] != results[1]:
+            raise SystemExit(f"Danh sách môn gợi ý khác nhau với {subjects} môn")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+# Số request và thời gian xử lý của một phiên dashboard giảng viên từ frontend (origin khác):
+# trước (mỗi route tự trả lời OPTIONS, không có Access-Control-Max-Age) và sau cors.init_cors
+#
+# Cách dùng:
+#     python -m benchmarks.bench_cors_preflight --visits 3 --edits 10 --interval 10
+#
+# Trình duyệt được mô phỏng: mọi request có JSON header nên cần preflight, kết quả preflight
+# được giữ theo (URL, method) trong Max-Age giây (Chrome: mặc định 5, tối đa 7200).
+import argparse
+import time
+
+from flask import Flask, jsonify, request
+from flask_cors import CORS
+
+from cors import CORS_ALLOW_HEADERS, CORS_EXPOSE_HEADERS, CORS_METHODS, CORS_ORIGINS, init_cors
+
+ORIGIN = "http://localhost:5173"
+BROWSER_DEFAULT_MAX_AGE = 5
+BROWSER_MAX_AGE_CAP = 7200
+
+# Các API mà dashboard gọi: (method, URL)
+DASHBOARD_ROUTES = [
+    ("GET", "/api/instructor/profile"),
+    ("GET", "/api/instructor/courses"),
+    ("GET", "/api/instructor/courses/<course_id>"),
+    ("PUT", "/api/instructor/courses/<course_id>/students/<student_id>/grades"),
+]
+
+
+def manual_preflight():
+    """Nhánh OPTIONS mà từng route trước đây tự viết"""
+    response = jsonify({'status': 'ok'})
+    response.headers['Access-Control-Allow-Origin'] = request.headers.get('Origin', ORIGIN)
+    response.headers['Access-Control-Allow-Methods'] = 'GET, PUT, OPTIONS'
+    response.headers['Access-Control-Allow-Headers'] = ', '.join(CORS_ALLOW_HEADERS)
+    response.headers['Access-Control-Allow-Credentials'] = 'true'
+    return response
+
+
+def build_app(centralized):
+    app = Flask(__name__)
+    if centralized:
+        init_cors(app)
+    else:
+        CORS(app, origins=CORS_ORIGINS, supports_credentials=True, allow_headers=CORS_ALLOW_HEADERS,
+             methods=CORS_METHODS, expose_headers=CORS_EXPOSE_HEADERS)
+
+    for method, rule in DASHBOARD_ROUTES:
+        def view(**kwargs):
+            if request.method == 'OPTIONS':
+                return manual_preflight()
+            return jsonify({"status": "success", "data": list(range(50))})
+
+        methods = [method] if centralized else [method, 'OPTIONS']
+        app.add_url_rule(rule, endpoint=f"{method} {rule}", view_func=view, methods=methods)
+    return app
+
+
+class BrowserSession:
+    """Gửi request như trình duyệt: preflight khi chưa có kết quả còn hạn trong bộ nhớ đệm"""
+
+    def __init__(self, app, interval):
+        self.client = app.test_client()
+        self.interval = interval
+        self.clock = 0
+        self.preflight_cache = {}
+        self.requests = 0
+        self.preflights = 0
+        self.seconds = 0.0
+
+    def _send(self, method, url, headers):
+        start = time.perf_counter()
+        response = self.client.open(url, method=method, headers=headers)
+        self.seconds += time.perf_counter() - start
+        self.requests += 1
+        return response
+
+    def call(self, method, url):
+        self.clock += self.interval
+        key = (method, url)
+        if self.preflight_cache.get(key, -1) < self.clock:
+            response = self._send("OPTIONS", url, {
+                "Origin": ORIGIN,
+                "Access-Control-Request-Method": method,
+                "Access-Control-Request-Headers": "content-type",
+            })
+            self.preflights += 1
+            if response.status_code >= 300 or response.headers.get("Access-Control-Allow-Origin") not in (ORIGIN, "*"):
+                raise SystemExit(f"Preflight {method} {url} bị từ chối ({response.status_code})")
+            max_age = int(response.headers.get("Access-Control-Max-Age", BROWSER_DEFAULT_MAX_AGE))
+            self.preflight_cache[key] = self.clock + min(max_age, BROWSER_MAX_AGE_CAP)
+        self._send(method, url, {"Origin": ORIGIN, "Content-Type": "application/json"})
+
+
+def run_session(app, visits, edits, interval):
+    browser = BrowserSession(app, interval)
+    for _ in range(visits):
+        browser.call("GET", "/api/instructor/profile")
+        browser.call("GET", "/api/instructor/courses")
+        browser.call("GET", "/api/instructor/courses/c1")
+        for student in range(edits):
+            browser.call("PUT", f"/api/instructor/courses/c1/students/s{student}/grades")
+    return browser
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So sánh số preflight của một phiên dashboard")
+    parser.add_argument("--visits", type=int, default=3, help="Số lần mở lại trang lớp học")
+    parser.add_argument("--edits", type=int, default=10, help="Số sinh viên được sửa điểm mỗi lần")
+    parser.add_argument("--interval", type=float, default=10, help="Số giây giữa hai thao tác")
+    args = parser.parse_args(argv)
+
+    print(f"{'':<8} {'request':>8} {'preflight':>10} {'ms':>8}")
+    for name, centralized in (("trước", False), ("sau", True)):
+        browser = run_session(build_app(centralized), args.visits, args.edits, args.interval)
+        print(f"{name:<8} {browser.requests:>8} {browser.preflights:>10} {browser.seconds * 1000:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
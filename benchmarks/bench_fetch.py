@@ -0,0 +1,94 @@
+# Thời gian tải các trang cổng thông tin cho một sinh viên: tuần tự trên kết nối mới
+# (cách cũ, mỗi trang một requests.get) so với fetch_portal_pages (đồng thời, session dùng chung)
+#
+# Cách dùng:
+#     python -m benchmarks.bench_fetch --delay 0.2 --syncs 20
+#
+# Cổng thông tin được thay bằng một HTTP server cục bộ trả mỗi trang sau `delay` giây.
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import threading
+import time
+
+import requests
+
+import scraper.fetch
+from scraper.bulk_sync import percentile
+from scraper.fetch import PAGE_TIMEOUTS, PORTAL_COOKIE_NAME, build_portal_urls, fetch_portal_pages
+
+PAGE_BODY = ("<html><body>" + "<tr><td>x</td></tr>" * 2000 + "</body></html>").encode("utf-8")
+
+
+def start_stub_portal(delay, page_body=None):
+    """
+    Chạy server giả lập cổng thông tin ở luồng nền
+
+    Args:
+        delay (float): Độ trễ mỗi trang (giây)
+        page_body: Hàm nhận path, trả về nội dung trang (bytes); mặc định PAGE_BODY
+
+    Returns:
+        tuple: (server, base_url)
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = page_body(self.path) if page_body else PAGE_BODY
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/sinhvien"
+
+
+def fetch_sequential(cookies, mssv):
+    """Cách tải cũ: từng trang một, mỗi lần một kết nối mới"""
+    return {
+        page: requests.get(url, cookies=cookies, timeout=PAGE_TIMEOUTS[page])
+        for page, url in build_portal_urls(mssv).items()
+    }
+
+
+def measure(fn, syncs):
+    cookies = {PORTAL_COOKIE_NAME: "benchmark"}
+    latencies = []
+    for i in range(syncs):
+        start = time.perf_counter()
+        pages = fn(cookies, f"2152{i:04d}")
+        latencies.append(time.perf_counter() - start)
+        assert all(response.status_code == 200 for response in pages.values())
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So sánh thời gian tải trang cổng thông tin")
+    parser.add_argument("--delay", type=float, default=0.2, help="Độ trễ mỗi trang của server giả lập (giây)")
+    parser.add_argument("--syncs", type=int, default=20, help="Số lần tải đủ các trang")
+    args = parser.parse_args(argv)
+
+    server, base_url = start_stub_portal(args.delay)
+    scraper.fetch.PORTAL_BASE_URL = base_url
+    try:
+        print(f"{'cách tải':<12} {'p50 ms':>8} {'p95 ms':>8} {'tổng s':>8}")
+        for name, fn in (("tuần tự", fetch_sequential), ("đồng thời", fetch_portal_pages)):
+            latencies = measure(fn, args.syncs)
+            print(f"{name:<12} {percentile(latencies, 0.50) * 1000:>8.1f} "
+                  f"{percentile(latencies, 0.95) * 1000:>8.1f} {sum(latencies):>8.2f}")
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+# Nhập điểm cả lớp (mặc định 500 sinh viên): một lần import_grades so với gọi lần lượt
+# PUT /courses/<course_id>/students/<student_id>/grades cho từng sinh viên
+#
+# Cách dùng:
+#     python -m benchmarks.bench_grade_import --students 500 --round-trip-ms 1
+#
+# MongoDB được thay bằng collection trong bộ nhớ đếm số lệnh gửi đi; mỗi lệnh chờ thêm
+# --round-trip-ms để mô phỏng độ trễ mạng tới máy chủ.
+import argparse
+import random
+import time
+
+from bson import ObjectId
+from pymongo.results import UpdateResult
+
+from instructor_module.grade_import import import_grades, read_csv_rows
+from instructor_module.grades import set_student_grades
+from instructor_module.grading import refresh_grade_summary, student_grade
+from instructor_module.student_schema import DEFAULT_GRADES_SCHEMA
+
+
+class RoundTripCollection:
+    """Collection giả: trả tài liệu cho sẵn, đếm số lệnh và chờ round_trip giây mỗi lệnh"""
+
+    def __init__(self, documents, round_trip):
+        self.documents = documents
+        self.round_trip = round_trip
+        self.commands = 0
+
+    def _round_trip(self):
+        self.commands += 1
+        if self.round_trip:
+            time.sleep(self.round_trip)
+
+    def find_one(self, query, projection=None):
+        self._round_trip()
+        return self.documents[0]
+
+    def find(self, query, projection=None):
+        self._round_trip()
+        return list(self.documents)
+
+    def find_one_and_update(self, query, update, **kwargs):
+        self._round_trip()
+        return {"grade_summary": {}}
+
+    def update_one(self, query, update):
+        self._round_trip()
+        return UpdateResult({"n": 1, "nModified": 1}, acknowledged=True)
+
+    def bulk_write(self, operations, ordered=True):
+        self._round_trip()
+
+
+def synthetic_class(students, seed=0):
+    """Lớp học, danh sách sinh viên và file CSV điểm (khoảng 2% dòng lỗi)"""
+    rng = random.Random(seed)
+    roster = [{"_id": ObjectId(), "mssv": f"2152{i:04d}"} for i in range(students)]
+    course = {"_id": ObjectId(), "grading_schema": {},
+              "students": [{"student_id": student["_id"], "grades": dict(DEFAULT_GRADES_SCHEMA)} for student in roster]}
+    lines = ["mssv,midterm,final,assignments,attendance"]
+    for student in roster:
+        final = rng.choice(["8", "7,5", "9.25", "11", "abc"] if rng.random() < 0.02 else ["8", "7,5", "9.25", "6"])
+        lines.append(f"{student['mssv']},{rng.randint(4, 10)},{final},{rng.randint(5, 10)},10")
+    return course, roster, "\n".join(lines).encode("utf-8")
+
+
+def import_per_student(course_collection, course, rows, roster):
+    """Mỗi dòng một lần PUT: đọc grading_schema, ghi điểm, làm mới grade_summary"""
+    by_mssv = {student["mssv"]: student["_id"] for student in roster}
+    for row in rows:
+        grades = {field: row.get(field) for field in DEFAULT_GRADES_SCHEMA}
+        schema = course_collection.find_one({"_id": course["_id"]}, {"grading_schema": 1}).get("grading_schema")
+        _, letter_grade = student_grade(grades, schema)
+        set_student_grades(course_collection, course["_id"], by_mssv[row["mssv"]], grades, None, letter_grade)
+        refresh_grade_summary(course_collection, course["_id"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So sánh nhập điểm cả lớp với ghi điểm từng sinh viên")
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--round-trip-ms", type=float, default=0.5, help="Độ trễ giả lập của mỗi lệnh MongoDB")
+    args = parser.parse_args(argv)
+
+    course, roster, csv_data = synthetic_class(args.students, seed=args.students)
+    round_trip = args.round_trip_ms / 1000
+
+    print(f"{'cách':<14} {'lệnh MongoDB':>13} {'ms':>9}")
+
+    course_collection = RoundTripCollection([course], round_trip)
+    start = time.perf_counter()
+    import_per_student(course_collection, course, read_csv_rows(csv_data), roster)
+    print(f"{'từng sinh viên':<14} {course_collection.commands:>13} {(time.perf_counter() - start) * 1000:>9.1f}")
+
+    course_collection = RoundTripCollection([course], round_trip)
+    student_collection = RoundTripCollection(roster, round_trip)
+    start = time.perf_counter()
+    result = import_grades(course_collection, student_collection, course["_id"], read_csv_rows(csv_data))
+    elapsed = time.perf_counter() - start
+    commands = course_collection.commands + student_collection.commands
+    print(f"{'import_grades':<14} {commands:>13} {elapsed * 1000:>9.1f}")
+    print(f"đã ghi {result['updated']} dòng, {result['failed']} dòng lỗi")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+# Serialize response lớn (danh sách lớp kèm roster): MongoJSONProvider so với cách cũ
+# (duyệt tài liệu đổi ObjectId / datetime / Decimal128 bằng tay rồi dùng JSON provider mặc định của Flask)
+#
+# Cách dùng:
+#     python -m benchmarks.bench_json_provider --courses 200 --students 60
+import argparse
+import copy
+from datetime import datetime
+import json
+import time
+
+from bson import Decimal128, ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+from json_provider import MongoJSONProvider
+
+
+def synthetic_courses(courses, students):
+    """Tài liệu offered_courses như đọc từ MongoDB"""
+    return [
+        {
+            "_id": ObjectId(),
+            "course_id": ObjectId(),
+            "instructor_id": ObjectId(),
+            "course_name": f"Môn học {i}",
+            "credits": 4,
+            "created_at": datetime.now(),
+            "updated_at": datetime.now(),
+            "grading_schema": {"midterm_weight": 0.3, "final_weight": 0.5},
+            "students": [
+                {
+                    "student_id": ObjectId(),
+                    "mssv": f"2152{j:04d}",
+                    "full_name": "Nguyễn Văn A",
+                    "grades": {"midterm": 7.5, "final": 8.0, "total": Decimal128("7.85"),
+                               "assignments": None, "attendance": 10},
+                }
+                for j in range(students)
+            ],
+        }
+        for i in range(courses)
+    ]
+
+
+def convert_by_hand(courses):
+    """Cách cũ của các route: đổi từng trường trước khi jsonify"""
+    for course in courses:
+        for field in ("_id", "course_id", "instructor_id"):
+            course[field] = str(course[field])
+        for field in ("created_at", "updated_at"):
+            course[field] = course[field].isoformat()
+        for student in course["students"]:
+            student["student_id"] = str(student["student_id"])
+            student["grades"]["total"] = float(student["grades"]["total"].to_decimal())
+    return courses
+
+
+def measure(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So sánh tốc độ serialize response lớn")
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--students", type=int, default=60, help="Số sinh viên mỗi lớp")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    mongo_provider = MongoJSONProvider(app)
+    courses = synthetic_courses(args.courses, args.students)
+
+    with app.app_context():
+        copy_seconds = measure(lambda: copy.deepcopy(courses), args.repeat)
+        old_seconds = measure(
+            lambda: default_provider.response({"courses": convert_by_hand(copy.deepcopy(courses))}).get_data(),
+            args.repeat,
+        ) - copy_seconds
+        new_body = mongo_provider.response({"courses": courses}).get_data()
+        new_seconds = measure(lambda: mongo_provider.response({"courses": courses}).get_data(), args.repeat)
+
+        orjson_module, json_provider.orjson = json_provider.orjson, None
+        try:
+            stdlib_seconds = measure(lambda: mongo_provider.response({"courses": courses}).get_data(), args.repeat)
+        finally:
+            json_provider.orjson = orjson_module
+
+        old_body = default_provider.response({"courses": convert_by_hand(copy.deepcopy(courses))}).get_data()
+        if json.loads(old_body) != json.loads(new_body):
+            raise SystemExit("Nội dung response khác với cách cũ")
+
+    print(f"response {len(new_body) / 1024:.0f} KiB ({args.courses} lớp x {args.students} sinh viên)")
+    print(f"{'đổi tay + DefaultJSONProvider':<32} {old_seconds * 1000:>8.1f} ms")
+    print(f"{'MongoJSONProvider (json chuẩn)':<32} {stdlib_seconds * 1000:>8.1f} ms")
+    if json_provider.orjson is not None:
+        print(f"{'MongoJSONProvider (orjson)':<32} {new_seconds * 1000:>8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+# Microbenchmark của analyze_performance (/performance_review) trên bảng điểm giả lập 8-12 học kỳ,
+# so với cách cũ duyệt lại toàn bộ bảng điểm cho từng môn trong chương trình đào tạo
+#
+# Cách dùng:
+#     python -m benchmarks.bench_performance_review --students 200 --subjects 55
+import argparse
+import random
+import time
+
+from academics import analyze_performance
+from academics.completion import COURSE_FAILED, COURSE_IN_PROGRESS
+
+
+def synthetic_student(curriculum, rng):
+    """Bảng điểm 8-12 học kỳ, mỗi học kỳ 6-8 môn lấy từ chương trình đào tạo và môn tự chọn ngoài chương trình"""
+    codes = [subject["course_code"] for subject in curriculum] + [f"EL{i:03d}" for i in range(20)]
+    return [
+        {"semester": f"HK{k}", "courses": [
+            {
+                "course_code": rng.choice(codes),
+                "credits": rng.choice([2, 3, 4]),
+                "complete": rng.choice(["Qua môn", "Qua môn", "Qua môn", COURSE_FAILED, COURSE_IN_PROGRESS]),
+                "total_score": rng.choice(["8.5", "7", "Miễn", "3.5"]),
+            }
+            for _ in range(rng.randint(6, 8))
+        ]}
+        for k in range(rng.randint(8, 12))
+    ]
+
+
+def progress_multipass(academic_records, curriculum):
+    """Phần tiến độ của /performance_review cũ: quét mọi học kỳ cho từng môn, rồi quét thêm lần nữa tìm môn trượt"""
+    completed_required_credits = 0
+    completed_course_codes = set()
+    remaining_required_courses = []
+    for subject in curriculum:
+        course_code = subject.get('course_code')
+        if course_code:
+            is_completed = False
+            for record in academic_records:
+                for course in record['courses']:
+                    if (course.get('course_code') == course_code
+                            and course.get('complete') != COURSE_FAILED
+                            and course.get('complete') != COURSE_IN_PROGRESS
+                            and str(course.get('total_score', '0')).lower() != 'miễn'):
+                        completed_required_credits += subject.get('credits', 0)
+                        completed_course_codes.add(course_code)
+                        is_completed = True
+                        break
+                if is_completed:
+                    break
+            if not is_completed:
+                remaining_required_courses.append(subject)
+    failed_course_codes = set()
+    for record in academic_records:
+        for course in record['courses']:
+            if course.get('complete') == COURSE_FAILED:
+                failed_course_codes.add(course.get('course_code'))
+    return completed_required_credits, completed_course_codes, remaining_required_courses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo thời gian phân tích hiệu suất học tập")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--subjects", type=int, default=55, help="Số môn trong chương trình đào tạo")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.subjects)
+    curriculum = [
+        {"course_code": f"IT{i:03d}", "credits": rng.choice([2, 3, 4]), "category": "Cơ sở ngành"}
+        for i in range(args.subjects)
+    ]
+    students = [synthetic_student(curriculum, rng) for _ in range(args.students)]
+
+    for records in students:
+        result = analyze_performance(records, curriculum)["progress"]
+        credits, codes, remaining = progress_multipass(records, curriculum)
+        if (result["completed_required_credits"], set(result["completed_course_codes"]),
+                result["remaining_required_courses"]) != (credits, codes, remaining):
+            raise SystemExit("Kết quả tiến độ khác với cách tính cũ")
+
+    for name, fn in (("cũ (chỉ phần tiến độ)", progress_multipass), ("analyze_performance", analyze_performance)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for records in students:
+                fn(records, curriculum)
+        per_student = (time.perf_counter() - start) / (args.repeat * len(students))
+        print(f"{name:<24} {per_student * 1e6:>9.1f} µs/sinh viên")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
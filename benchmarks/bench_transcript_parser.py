@@ -0,0 +1,89 @@
+# Thông lượng đọc bảng điểm: TranscriptStreamParser so với vòng BeautifulSoup cũ
+#
+# Cách dùng:
+#     python -m benchmarks.bench_transcript_parser --courses 10 50 100 200 --repeat 50
+#
+# Bảng điểm giả lập có 8 môn mỗi học kỳ, kèm các trường hợp khó của trang thật
+# (script chứa <tr>, bảng lồng, &nbsp;, ô "Miễn", thẻ không đóng).
+import argparse
+import random
+import time
+
+from scraper.transcript_parser import TranscriptStreamParser
+from tests.bs4_transcript import student_info_bs4, transcript_records_bs4
+
+COURSES_PER_SEMESTER = 8
+
+
+def synthetic_transcript(courses, seed=0):
+    """HTML trang kqhoctap giả lập với `courses` môn học"""
+    rng = random.Random(seed)
+    parts = [
+        '<html><body><h1>BẢNG ĐIỂM SINH VIÊN</h1><strong> 21520001 </strong>',
+        '<table class="info"><tr><td>Họ tên</td><td>Nguyễn &amp; Văn A</td><td>Ngày sinh</td>'
+        '<td>01/01/2003</td><td>Giới tính</td><td>Nam</td></tr>',
+        '<tr><td>Mã SV</td><td>21520001</td><td>Lớp</td><td>ATTT2021</td><td>Khoa</td><td>MMT<br/>TT</td></tr>',
+        '<tr><td>Bậc</td><td>Đại học</td><td>Hệ</td><td>Chính quy</td></tr></table>',
+        '<script>var row = "<tr><td>không phải dòng điểm</td></tr>";</script>',
+        '<table><tr><th>STT</th><th>Mã HP</th><th>Tên HP</th><th>TC</th></tr>',
+    ]
+    for i in range(courses):
+        if i % COURSES_PER_SEMESTER == 0:
+            semester = i // COURSES_PER_SEMESTER
+            parts.append(
+                f'<tr><td colspan=10> <b>Học kỳ {semester % 3 + 1}</b> - '
+                f'Năm học {2021 + semester // 3}-{2022 + semester // 3} </td></tr>'
+            )
+        total = rng.choice(['8.5', 'Miễn', '', '3.0', '7', '9,5'])
+        parts.append(
+            f'<tr><td>{i + 1}</td><td>IT{i:03d}</td><td>Môn &lt;{i}&gt; <i>lý thuyết</i></td>'
+            f'<td>{rng.choice(["4", "3", "2"])}</td><td>{rng.choice(["", "7.5"])}</td><td>8</td>'
+            f'<td>&nbsp;</td><td>9.0</td><td> {total} </td><td><!-- ghi chú -->{rng.choice(["", "Học lại"])}</td></tr>'
+        )
+    parts.append(
+        '<tr><td>Trung bình</td><td>8</td></tr></table>'
+        '<table><tr><td>lồng<table><tr><td>Học kỳ hè</td></tr></table></td></tr></table>'
+        '<p>Chưa đóng thẻ</body></html>'
+    )
+    return ''.join(parts)
+
+
+def parse_stream(html):
+    parser = TranscriptStreamParser()
+    records = list(parser.iter_records(html))
+    info = [["".join(cell).strip() for cell in row] for row in parser.student_info_rows]
+    return records, info, parser.first_strong_text
+
+
+def parse_bs4(html):
+    info, strong = student_info_bs4(html)
+    return transcript_records_bs4(html), info, strong
+
+
+def measure(fn, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="So sánh tốc độ đọc bảng điểm")
+    parser.add_argument("--courses", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"{'môn':>5} {'bs4 ms':>9} {'stream ms':>10} {'tăng tốc':>9} {'môn/giây (stream)':>18}")
+    for courses in args.courses:
+        html = synthetic_transcript(courses, seed=courses)
+        if parse_stream(html) != parse_bs4(html):
+            raise SystemExit(f"Kết quả khác nhau với {courses} môn")
+        bs4_seconds = measure(parse_bs4, html, args.repeat)
+        stream_seconds = measure(parse_stream, html, args.repeat)
+        print(f"{courses:>5} {bs4_seconds * 1000:>9.2f} {stream_seconds * 1000:>10.2f} "
+              f"{bs4_seconds / stream_seconds:>8.1f}x {courses / stream_seconds:>18.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+# Cấu hình CORS dùng chung: trả lời preflight trước khi vào route và cho trình duyệt lưu kết quả preflight
+import os
+
+from flask import request
+from flask_cors import CORS
+
+CORS_ORIGINS = ["http://localhost:5173", "http://127.0.0.1:5173", "*"]
+CORS_ALLOW_HEADERS = [
+    "Content-Type", "Authorization", "X-Requested-With",
+    "Access-Control-Allow-Origin", "Access-Control-Allow-Methods", "Access-Control-Allow-Headers",
+]
+CORS_METHODS = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+CORS_EXPOSE_HEADERS = ["Content-Type", "Authorization"]
+
+# Thời gian trình duyệt được dùng lại kết quả preflight (giây); Chrome giới hạn ở 7200, Firefox ở 86400
+CORS_MAX_AGE = int(os.getenv("CORS_MAX_AGE", "86400"))
+
+
+def answer_preflight():
+    """
+    Trả lời mọi request OPTIONS tới một route có thật bằng response rỗng
+
+    Route, kiểm tra đăng nhập và rate limit không chạy cho preflight;
+    flask_cors thêm các header Access-Control-* (kể cả Max-Age) ở after_request.
+    """
+    if request.method == "OPTIONS" and request.url_rule is not None:
+        return "", 204
+
+
+def init_cors(app):
+    """
+    Đăng ký CORS cho toàn bộ ứng dụng
+
+    Phải gọi trước khi tạo Limiter để preflight được trả lời trước bước kiểm
+    tra rate limit (before_request chạy theo thứ tự đăng ký).
+    """
+    app.before_request(answer_preflight)
+    CORS(
+        app,
+        origins=CORS_ORIGINS,
+        supports_credentials=True,
+        allow_headers=CORS_ALLOW_HEADERS,
+        methods=CORS_METHODS,
+        expose_headers=CORS_EXPOSE_HEADERS,
+        max_age=CORS_MAX_AGE,
+    )
@@ -5,6 +5,7 @@ import axios from 'axios';
 import { useMutation } from '@tanstack/react-query';
 import { AuthContext } from '/src/components/AuthContext';
 import UITLogo from "/src/assets/logouit.png";
+import { waitForJob } from "/src/utils/jobs.js";
 
 export const ThemeContext = createContext();
 
@@ -74,7 +75,7 @@ function Login() {
             if (response.data?.status !== 'success') {
                 throw new Error(response.data.message);
             }
-            return response.data;
+            return waitForJob(`${import.meta.env.VITE_API_BASE_URL}/register/${response.data.job_id}`);
         },
         onSuccess: (data) => {
             setMessage("Đăng ký thành công!");
@@ -5,6 +5,7 @@ import axios from "axios";
 import { MoonIcon, SunIcon } from '@heroicons/react/24/solid';
 import { useMutation } from "@tanstack/react-query";
 import { Accordion } from "/src/components/Accordion.jsx";
+import { waitForJob } from "/src/utils/jobs.js";
 
 function Settings() {
     const [oldPassword, setOldPassword] = useState("");
@@ -65,7 +66,7 @@ function Settings() {
             if (response.data?.status !== "success") {
                 throw new Error(response.data.message);
             }
-            return response.data;
+            return waitForJob(`${import.meta.env.VITE_API_BASE_URL}/sync_data/${response.data.job_id}`);
         },
         retry: 0,
         onSuccess: (data) => {
@@ -101,7 +102,7 @@ function Settings() {
             if (response.data?.status !== "success") {
                 throw new Error(response.data.message);
             }
-            return response.data;
+            return waitForJob(`${import.meta.env.VITE_API_BASE_URL}/sync_data/${response.data.job_id}`);
         },
         retry: 0,
         onSuccess: (data) => {
@@ -13,18 +13,19 @@ function AdminHome() {
     });
 
     // Fetch students
-    const { data: students = [], isLoading: isLoadingStudents, isError: isStudentsError } = useQuery({
-        queryKey: ['admin-students'],
+    // Trang chủ chỉ cần 5 sinh viên đầu tiên và tổng số sinh viên
+    const { data: studentPage = { students: [], total: 0 }, isLoading: isLoadingStudents, isError: isStudentsError } = useQuery({
+        queryKey: ['admin-students-overview'],
         queryFn: async () => {
             try {
-                const response = await axios.get(`${import.meta.env.VITE_API_BASE_URL}/admin/students`, { withCredentials: true });
+                const response = await axios.get(`${import.meta.env.VITE_API_BASE_URL}/admin/students`, { params: { limit: 5 }, withCredentials: true });
                 console.log("API response for students:", response.data);
                 if (response.data.status !== 'success') {
                     throw new Error(response.data.message || "Không thể tải danh sách sinh viên");
                 }
                 const studentsData = response.data.students || [];
                 console.log("Students data length:", studentsData.length);
-                return studentsData;
+                return { students: studentsData, total: response.data.total ?? studentsData.length };
             } catch (error) {
                 if (error.response && (error.response.status === 401 || error.response.status === 403)) {
                     console.log("Authentication error when fetching students");
@@ -35,9 +36,9 @@ function AdminHome() {
         onSuccess: (data) => {
             // Update the student count in stats
             console.log("onSuccess students data:", data);
-            console.log("onSuccess students length:", data.length);
+            console.log("onSuccess students total:", data.total);
             setStats(prev => {
-                const newStats = { ...prev, studentCount: data.length };
+                const newStats = { ...prev, studentCount: data.total };
                 console.log("New stats after student update:", newStats);
                 return newStats;
             });
@@ -47,6 +48,7 @@ function AdminHome() {
         },
         retry: false // Don't retry on error
     });
+    const students = studentPage.students;
 
     // Fetch instructors
     const { data: instructors = [], isLoading: isLoadingInstructors, isError: isInstructorsError } = useQuery({
@@ -76,15 +78,17 @@ function AdminHome() {
     });
 
     // Fetch classes
-    const { data: classes = [], isLoading: isLoadingClasses, isError: isClassesError } = useQuery({
-        queryKey: ['admin-classes'],
+    // Trang chủ chỉ cần 5 lớp đầu tiên và tổng số lớp
+    const { data: classPage = { classes: [], total: 0 }, isLoading: isLoadingClasses, isError: isClassesError } = useQuery({
+        queryKey: ['admin-classes-overview'],
         queryFn: async () => {
             try {
-                const response = await axios.get(`${import.meta.env.VITE_API_BASE_URL}/admin/classes`, { withCredentials: true });
+                const response = await axios.get(`${import.meta.env.VITE_API_BASE_URL}/admin/classes`, { params: { limit: 5 }, withCredentials: true });
                 if (response.data.status !== 'success') {
                     throw new Error(response.data.message || "Không thể tải danh sách lớp học");
                 }
-                return response.data.classes || [];
+                const classesData = response.data.classes || [];
+                return { classes: classesData, total: response.data.total ?? classesData.length };
             } catch (error) {
                 if (error.response && (error.response.status === 401 || error.response.status === 403)) {
                     console.log("Authentication error when fetching classes");
@@ -94,13 +98,14 @@ function AdminHome() {
         },
         onSuccess: (data) => {
             // Update the class count in stats
-            setStats(prev => ({ ...prev, classCount: data.length }));
+            setStats(prev => ({ ...prev, classCount: data.total }));
         },
         onError: (error) => {
             console.error("Error fetching classes:", error);
         },
         retry: false // Don't retry on error
     });
+    const classes = classPage.classes;
 
     // Fetch notifications
     const { data: notifications = [], isLoading: isLoadingNotifications, isError: isNotificationsError } = useQuery({
@@ -138,7 +143,7 @@ function AdminHome() {
     // Log stats for debugging
     console.log("Current stats:", stats);
     console.log("Students array:", students);
-    console.log("Students length:", students.length);
+    console.log("Students total:", studentPage.total);
 
     return (
         <div className="container mx-auto px-4 py-8">
@@ -176,7 +181,7 @@ function AdminHome() {
                         <div className="flex items-center justify-between">
                             <div>
                                 <p className="text-lg font-semibold">Sinh viên</p>
-                                <h3 className="text-3xl font-bold mt-2">{isLoading ? '...' : students.length}</h3>
+                                <h3 className="text-3xl font-bold mt-2">{isLoading ? '...' : studentPage.total}</h3>
                             </div>
                             <FaUserGraduate className="text-4xl opacity-80" />
                         </div>
@@ -202,7 +207,7 @@ function AdminHome() {
                         <div className="flex items-center justify-between">
                             <div>
                                 <p className="text-lg font-semibold">Lớp học</p>
-                                <h3 className="text-3xl font-bold mt-2">{isLoading ? '...' : classes.length}</h3>
+                                <h3 className="text-3xl font-bold mt-2">{isLoading ? '...' : classPage.total}</h3>
                             </div>
                             <FaBook className="text-4xl opacity-80" />
                         </div>
@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useQuery, useInfiniteQuery } from '@tanstack/react-query';
 import axios from 'axios';
 import { FaBook, FaSearch, FaUserGraduate, FaChalkboardTeacher } from 'react-icons/fa';
 
@@ -8,20 +8,32 @@ function ClassManagement() {
     const [selectedClass, setSelectedClass] = useState(null);
     const [isModalOpen, setIsModalOpen] = useState(false);
 
-    // Fetch classes
-    const { data: classes = [], isLoading } = useQuery({
-        queryKey: ['admin-classes'],
-        queryFn: async () => {
-            const response = await axios.get(`${import.meta.env.VITE_API_BASE_URL}/admin/classes`, { withCredentials: true });
+    // Fetch classes: phân trang bằng con trỏ, tìm kiếm theo tiền tố mã lớp / mã môn / tên môn trên server
+    const {
+        data: classPages,
+        isLoading,
+        fetchNextPage,
+        hasNextPage,
+        isFetchingNextPage
+    } = useInfiniteQuery({
+        queryKey: ['admin-classes', searchTerm.trim()],
+        queryFn: async ({ pageParam }) => {
+            const params = { limit: 50 };
+            if (pageParam) params.after = pageParam;
+            if (searchTerm.trim()) params.search = searchTerm.trim();
+            const response = await axios.get(`${import.meta.env.VITE_API_BASE_URL}/admin/classes`, { params, withCredentials: true });
             if (response.data.status !== 'success') {
                 throw new Error(response.data.message || "Không thể tải danh sách lớp học");
             }
-            return response.data.classes;
+            return response.data;
         },
+        initialPageParam: null,
+        getNextPageParam: (lastPage) => lastPage.next_cursor || undefined,
         onError: (error) => {
             console.error("Error fetching classes:", error);
         }
     });
+    const classes = classPages ? classPages.pages.flatMap(page => page.classes) : [];
 
     // Fetch class details
     const { data: classDetails, isLoading: isLoadingDetails } = useQuery({
@@ -40,11 +52,7 @@ function ClassManagement() {
         }
     });
 
-    const filteredClasses = classes.filter(classItem =>
-        (classItem.class_code && classItem.class_code.toLowerCase().includes(searchTerm.toLowerCase())) ||
-        (classItem.course_name && classItem.course_name.toLowerCase().includes(searchTerm.toLowerCase())) ||
-        (classItem.semester && classItem.semester.toLowerCase().includes(searchTerm.toLowerCase()))
-    );
+    const filteredClasses = classes;
 
     const handleViewDetails = (classItem) => {
         setSelectedClass(classItem);
@@ -120,6 +128,17 @@ function ClassManagement() {
                             </tbody>
                         </table>
                     </div>
+                    {hasNextPage && (
+                        <div className="flex justify-center p-4">
+                            <button
+                                onClick={() => fetchNextPage()}
+                                disabled={isFetchingNextPage}
+                                className="px-4 py-2 text-sm font-medium text-purple-600 border border-purple-600 rounded-lg hover:bg-purple-50 dark:text-purple-400 dark:border-purple-400 dark:hover:bg-gray-700 disabled:opacity-50"
+                            >
+                                {isFetchingNextPage ? 'Đang tải...' : 'Tải thêm lớp học'}
+                            </button>
+                        </div>
+                    )}
                 </div>
             )}
 
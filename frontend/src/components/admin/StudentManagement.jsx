@@ -1,5 +1,5 @@
 import React, { useState } from 'react';
-import { useQuery } from '@tanstack/react-query';
+import { useQuery, useInfiniteQuery } from '@tanstack/react-query';
 import axios from 'axios';
 import { FaUserGraduate, FaSearch, FaChartBar, FaGraduationCap } from 'react-icons/fa';
 import { Bar, Line, Pie, Doughnut } from 'react-chartjs-2';
@@ -38,20 +38,32 @@ function StudentManagement() {
     const [showOverallBarChart, setShowOverallBarChart] = useState(false);
     const isDarkMode = document.documentElement.classList.contains('dark');
 
-    // Fetch students
-    const { data: students = [], isLoading } = useQuery({
-        queryKey: ['admin-students'],
-        queryFn: async () => {
-            const response = await axios.get(`${import.meta.env.VITE_API_BASE_URL}/admin/students`, { withCredentials: true });
+    // Fetch students: phân trang bằng con trỏ, tìm kiếm theo tiền tố MSSV / họ tên trên server
+    const {
+        data: studentPages,
+        isLoading,
+        fetchNextPage,
+        hasNextPage,
+        isFetchingNextPage
+    } = useInfiniteQuery({
+        queryKey: ['admin-students', searchTerm.trim()],
+        queryFn: async ({ pageParam }) => {
+            const params = { limit: 50 };
+            if (pageParam) params.after = pageParam;
+            if (searchTerm.trim()) params.search = searchTerm.trim();
+            const response = await axios.get(`${import.meta.env.VITE_API_BASE_URL}/admin/students`, { params, withCredentials: true });
             if (response.data.status !== 'success') {
                 throw new Error(response.data.message || "Không thể tải danh sách sinh viên");
             }
-            return response.data.students;
+            return response.data;
         },
+        initialPageParam: null,
+        getNextPageParam: (lastPage) => lastPage.next_cursor || undefined,
         onError: (error) => {
             console.error("Error fetching students:", error);
         }
     });
+    const students = studentPages ? studentPages.pages.flatMap(page => page.students) : [];
 
     // Fetch academic records for selected student
     const { data: academicRecords, isLoading: isLoadingAcademicRecords } = useQuery({
@@ -75,10 +87,7 @@ function StudentManagement() {
         }
     });
 
-    const filteredStudents = students.filter(student =>
-        (student.mssv && student.mssv.toLowerCase().includes(searchTerm.toLowerCase())) ||
-        (student.name && student.name.toLowerCase().includes(searchTerm.toLowerCase()))
-    );
+    const filteredStudents = students;
 
     const handleViewDetails = (student) => {
         setSelectedStudent(student);
@@ -319,6 +328,17 @@ function StudentManagement() {
                             </tbody>
                         </table>
                     </div>
+                    {hasNextPage && (
+                        <div className="flex justify-center p-4">
+                            <button
+                                onClick={() => fetchNextPage()}
+                                disabled={isFetchingNextPage}
+                                className="px-4 py-2 text-sm font-medium text-purple-600 border border-purple-600 rounded-lg hover:bg-purple-50 dark:text-purple-400 dark:border-purple-400 dark:hover:bg-gray-700 disabled:opacity-50"
+                            >
+                                {isFetchingNextPage ? 'Đang tải...' : 'Tải thêm sinh viên'}
+                            </button>
+                        </div>
+                    )}
                 </div>
             )}
 
@@ -0,0 +1,29 @@
+import axios from 'axios';
+
+const POLL_INTERVAL_MS = 1500;
+const MAX_WAIT_MS = 5 * 60 * 1000;
+
+/**
+ * Chờ job đồng bộ/đăng ký chạy nền trên server hoàn thành
+ * @param {string} statusUrl - URL trạng thái job, ví dụ `${API}/sync_data/${jobId}`
+ * @returns {Object} - Kết quả của job khi thành công
+ */
+export const waitForJob = async (statusUrl) => {
+    const startedAt = Date.now();
+
+    while (Date.now() - startedAt < MAX_WAIT_MS) {
+        const response = await axios.get(statusUrl, { withCredentials: true });
+        const job = response.data?.job;
+
+        if (job?.status === 'succeeded') {
+            return job.result || {};
+        }
+        if (job?.status === 'failed') {
+            throw new Error(job.error || 'Xử lý thất bại, vui lòng thử lại!');
+        }
+
+        await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+    }
+
+    throw new Error('Quá thời gian chờ xử lý, vui lòng thử lại!');
+};
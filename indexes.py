@@ -0,0 +1,216 @@
+# Khai báo chỉ mục cho từng collection, tạo khi khởi động / bằng CLI và kiểm tra truy vấn quét toàn bộ collection
+#
+# Cách dùng:
+#     python indexes.py              # tạo các chỉ mục còn thiếu
+#     python indexes.py --check      # chỉ chạy explain() các truy vấn chính
+#
+# Khi khởi động, main.py gọi bootstrap_indexes (tắt bằng MONGO_INDEX_BOOTSTRAP=0).
+import argparse
+import json
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient
+from pymongo.errors import PyMongoError
+
+# Lấy logger
+logger = logging.getLogger(__name__)
+
+# Chỉ áp dụng chỉ mục unique cho tài liệu có trường này (tài khoản giảng viên trong users không có mssv)
+HAS_MSSV = {"mssv": {"$exists": True}}
+
+# Chỉ mục cần có của từng collection: {collection: [(keys, options)]}
+INDEXES = {
+    "users": [
+        ([("mssv", ASCENDING)], {"name": "mssv_unique", "unique": True, "partialFilterExpression": HAS_MSSV}),
+        ([("email", ASCENDING), ("role", ASCENDING)], {"name": "email_role"}),
+    ],
+    "student": [
+        ([("mssv", ASCENDING)], {"name": "mssv_unique", "unique": True, "partialFilterExpression": HAS_MSSV}),
+        ([("personal_info.full_name", ASCENDING)], {"name": "full_name"}),
+        ([("personal_info.faculty", ASCENDING), ("_id", ASCENDING)], {"name": "faculty_id_page"}),
+        ([("personal_info.major", ASCENDING), ("_id", ASCENDING)], {"name": "major_id_page"}),
+        ([("personal_info.class", ASCENDING), ("_id", ASCENDING)], {"name": "class_id_page"}),
+    ],
+    "academic_records": [
+        ([("mssv", ASCENDING)], {"name": "mssv_unique", "unique": True, "partialFilterExpression": HAS_MSSV}),
+    ],
+    "sync_state": [
+        ([("mssv", ASCENDING)], {"name": "mssv_unique", "unique": True, "partialFilterExpression": HAS_MSSV}),
+    ],
+    "subject": [
+        ([("major", ASCENDING)], {"name": "major"}),
+    ],
+    "instructors": [
+        ([("user_id", ASCENDING)], {"name": "user_id"}),
+        ([("contact.email", ASCENDING)], {"name": "contact_email"}),
+    ],
+    "offered_courses": [
+        ([("instructor_id", ASCENDING)], {"name": "instructor_id"}),
+        ([("semester", ASCENDING), ("_id", ASCENDING)], {"name": "semester_id_page"}),
+        ([("class_code", ASCENDING)], {"name": "class_code"}),
+    ],
+    "sync_jobs": [
+        # Mỗi sinh viên chỉ có một job cùng loại chưa xong (scraper.jobs.MongoJobBackend.claim)
+        ([("kind", ASCENDING), ("owner", ASCENDING)], {"name": "active_job_unique", "unique": True, "partialFilterExpression": {"_active": True}}),
+        ([("_expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+    ],
+    "notifications": [
+        ([("created_at", DESCENDING)], {"name": "created_at_desc"}),
+    ],
+    "scholarships_events": [
+        ([("created_at", DESCENDING)], {"name": "created_at_desc"}),
+    ],
+}
+
+# Các truy vấn chính cần dùng chỉ mục: (tên, collection, filter, sort)
+HOT_QUERIES = [
+    ("login", "users", {"mssv": "", "password": ""}, None),
+    ("register", "users", {"mssv": ""}, None),
+    ("instructor_login", "users", {"email": "", "password": "", "role": "instructor"}, None),
+    ("user", "student", {"mssv": ""}, None),
+    ("academic_records", "academic_records", {"mssv": ""}, None),
+    ("page_state", "sync_state", {"mssv": ""}, None),
+    ("curriculum", "subject", {"major": ""}, None),
+    ("instructor_by_user", "instructors", {"user_id": ""}, None),
+    ("instructor_by_email", "instructors", {"contact.email": ""}, None),
+    ("instructor_courses", "offered_courses", {"instructor_id": ""}, None),
+    ("grade_import_mssv", "student", {"mssv": {"$in": [""]}}, None),
+    ("sync_job_active", "sync_jobs", {"kind": "", "owner": "", "_active": True}, None),
+    ("notifications", "notifications", {}, [("created_at", DESCENDING)]),
+    ("scholarships", "scholarships_events", {}, [("created_at", DESCENDING)]),
+]
+
+
+def _key_pattern(keys):
+    return tuple((field, int(direction) if isinstance(direction, float) else direction) for field, direction in keys)
+
+
+def ensure_indexes(db, registry=None):
+    """
+    Tạo các chỉ mục còn thiếu (bỏ qua chỉ mục đã có cùng tên hoặc cùng khóa)
+
+    Lỗi của một chỉ mục (dữ liệu trùng với chỉ mục unique, trùng khóa với
+    chỉ mục khác tên, ...) được ghi vào báo cáo, không làm dừng các chỉ mục còn lại.
+
+    Returns:
+        list: [{"collection", "index", "status": "created" | "exists" | "error", "error"}]
+    """
+    report = []
+    for collection_name, specs in (registry or INDEXES).items():
+        collection = db[collection_name]
+        try:
+            existing = collection.index_information()
+        except PyMongoError:
+            existing = {}
+        # Chỉ mục đã tạo trước đây với tên tự sinh (mssv_1, ...) được nhận theo khóa
+        existing_by_keys = {_key_pattern(info["key"]): info for info in existing.values()}
+        for keys, options in specs:
+            entry = {"collection": collection_name, "index": options["name"]}
+            current = existing.get(options["name"]) or existing_by_keys.get(_key_pattern(keys))
+            if current is not None:
+                if bool(current.get("unique")) == bool(options.get("unique")):
+                    entry["status"] = "exists"
+                else:
+                    entry.update(status="error", error="Đã có chỉ mục cùng khóa nhưng khác tùy chọn unique, cần xóa chỉ mục cũ")
+            else:
+                try:
+                    collection.create_indexes([IndexModel(keys, **options)])
+                    entry["status"] = "created"
+                except PyMongoError as e:
+                    entry.update(status="error", error=str(e))
+            report.append(entry)
+    return report
+
+
+def _plan_stages(plan):
+    """Tên các stage trong một query plan (duyệt cả inputStage / inputStages / queryPlan)"""
+    if not isinstance(plan, dict):
+        return []
+    stages = [plan["stage"]] if plan.get("stage") else []
+    for key in ("inputStage", "queryPlan"):
+        stages += _plan_stages(plan.get(key))
+    for child in plan.get("inputStages") or []:
+        stages += _plan_stages(child)
+    return stages
+
+
+def explain_query(db, collection_name, query, sort=None):
+    """
+    explain() một truy vấn find, trả về các stage của winning plan
+
+    Returns:
+        list: Tên các stage, ví dụ ["FETCH", "IXSCAN"] hoặc ["COLLSCAN"]
+    """
+    command = {"find": collection_name, "filter": query, "limit": 1}
+    if sort:
+        command["sort"] = dict(sort)
+    result = db.command("explain", command, verbosity="queryPlanner")
+    return _plan_stages(result.get("queryPlanner", {}).get("winningPlan"))
+
+
+def check_hot_queries(db, queries=None):
+    """
+    Chạy explain() các truy vấn chính và đánh dấu truy vấn quét toàn bộ collection
+
+    Returns:
+        list: [{"query", "collection", "stages", "collscan": bool, "error"}]
+    """
+    report = []
+    for name, collection_name, query, sort in queries or HOT_QUERIES:
+        entry = {"query": name, "collection": collection_name}
+        try:
+            entry["stages"] = explain_query(db, collection_name, query, sort)
+            entry["collscan"] = "COLLSCAN" in entry["stages"]
+        except Exception as e:
+            # Máy chủ không hỗ trợ explain (mongomock, quyền hạn chế, ...)
+            entry.update(stages=[], collscan=None, error=str(e))
+        report.append(entry)
+    return report
+
+
+def bootstrap_indexes(db):
+    """
+    Tạo chỉ mục và ghi log các truy vấn chính vẫn quét toàn bộ collection (gọi khi khởi động)
+
+    Returns:
+        dict: {"indexes": báo cáo ensure_indexes, "queries": báo cáo check_hot_queries}
+    """
+    indexes = ensure_indexes(db)
+    for entry in indexes:
+        if entry["status"] == "created":
+            logger.info("Đã tạo chỉ mục %s.%s", entry["collection"], entry["index"])
+        elif entry["status"] == "error":
+            logger.warning("Không tạo được chỉ mục %s.%s: %s", entry["collection"], entry["index"], entry["error"])
+
+    queries = check_hot_queries(db)
+    for entry in queries:
+        if entry["collscan"]:
+            logger.warning("Truy vấn %s (%s) đang quét toàn bộ collection (COLLSCAN)", entry["query"], entry["collection"])
+        elif entry.get("error"):
+            logger.warning("Không explain được truy vấn %s: %s", entry["query"], entry["error"])
+    return {"indexes": indexes, "queries": queries}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tạo chỉ mục MongoDB và kiểm tra truy vấn quét toàn bộ collection")
+    parser.add_argument("--check", action="store_true", help="Chỉ chạy explain(), không tạo chỉ mục")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    load_dotenv()
+    client = MongoClient(os.getenv("MONGO_URI"))
+    database = client.get_default_database()
+
+    report = {"queries": check_hot_queries(database)} if args.check else bootstrap_indexes(database)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    failed = [e for e in report.get("indexes", []) if e["status"] == "error"]
+    collscans = [e for e in report["queries"] if e["collscan"]]
+    return 1 if failed or collscans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
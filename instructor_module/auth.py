@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, session
 from bson.objectid import ObjectId
 from datetime import datetime
 import logging
+from .identity import InstructorIdentityCache, resolve_instructor
 
 # Lấy logger
 logger = logging.getLogger(__name__)
@@ -15,44 +16,15 @@ users_collection = None
 instructors_collection = None
 faculties_collection = None
 
-# Hàm chuyển đổi ObjectId thành string
-def convert_objectid_to_str(data):
-    if isinstance(data, dict):
-        for key, value in data.items():
-            if isinstance(value, ObjectId):
-                data[key] = str(value)
-            elif isinstance(value, dict):
-                data[key] = convert_objectid_to_str(value)
-            elif isinstance(value, list):
-                data[key] = [convert_objectid_to_str(item) if isinstance(item, dict) else 
-                            str(item) if isinstance(item, ObjectId) else item 
-                            for item in value]
-    return data
+# Thông tin giảng viên theo tài khoản users, dùng khi đăng nhập
+identity_cache = InstructorIdentityCache()
 
 # Đăng nhập giảng viên
-@instructor_auth_bp.route('/login', methods=['POST', 'OPTIONS'])
+@instructor_auth_bp.route('/login', methods=['POST'])
 def instructor_login():
-    # Xử lý yêu cầu OPTIONS (CORS preflight)
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'ok'})
-        origin = request.headers.get('Origin', 'http://localhost:5173')
-        response.headers['Access-Control-Allow-Origin'] = origin
-        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Access-Control-Allow-Origin, Access-Control-Allow-Methods, Access-Control-Allow-Headers'
-        response.headers['Access-Control-Allow-Credentials'] = 'true'
-        print(f"OPTIONS response headers: {response.headers}")
-        return response
-    
-    # Debug: In ra thông tin request
-    print("=== INSTRUCTOR LOGIN REQUEST ===")
-    print(f"Method: {request.method}")
-    print(f"Headers: {request.headers}")
-    print(f"Data: {request.get_json()}")
-    
     try:
         # Lấy dữ liệu đăng nhập từ request
         data = request.get_json()
-        print(f"Dữ liệu đăng nhập: {data}")
         
         if not data or 'email' not in data or 'password' not in data:
             logger.warning("Thiếu thông tin đăng nhập")
@@ -73,69 +45,20 @@ def instructor_login():
         
         logger.info(f"Đang xử lý đăng nhập cho giảng viên với email: {email}")
         
-        # Tìm giảng viên trong collection users
-        user = users_collection.find_one({"email": email, "password": password, "role": "instructor"})
+        # Tìm tài khoản giảng viên và cập nhật thời gian đăng nhập trong cùng một lệnh
+        user = users_collection.find_one_and_update(
+            {"email": email, "password": password, "role": "instructor"},
+            {"$set": {"last_login": datetime.now()}},
+            projection={"_id": 1}
+        )
         
         if user:
             logger.info(f"Tìm thấy user giảng viên với ID: {user.get('_id')}")
             
-            # Tìm thông tin chi tiết của giảng viên - thử nhiều cách khác nhau
-            instructor = None
-            
-            # Cách 1: Tìm theo user_id là ObjectId
-            try:
-                instructor = instructors_collection.find_one({"user_id": user.get('_id')})
-                if instructor:
-                    logger.info(f"Tìm thấy giảng viên theo user_id ObjectId: {instructor.get('_id')}")
-            except Exception as e:
-                logger.warning(f"Lỗi khi tìm giảng viên theo ObjectId: {e}")
-            
-            # Cách 2: Tìm theo user_id là string của ObjectId
-            if not instructor:
-                try:
-                    instructor = instructors_collection.find_one({"user_id": str(user.get('_id'))})
-                    if instructor:
-                        logger.info(f"Tìm thấy giảng viên theo user_id string: {instructor.get('_id')}")
-                except Exception as e:
-                    logger.warning(f"Lỗi khi tìm giảng viên theo string ObjectId: {e}")
-            
-            # Cách 3: Tìm theo email
-            if not instructor:
-                try:
-                    instructor = instructors_collection.find_one({"contact.email": email})
-                    if instructor:
-                        logger.info(f"Tìm thấy giảng viên theo contact.email: {instructor.get('_id')}")
-                except Exception as e:
-                    logger.warning(f"Lỗi khi tìm giảng viên theo email: {e}")
-            
-            # Nếu vẫn không tìm thấy, tạo một giảng viên mới
-            if not instructor:
-                logger.info("Không tìm thấy giảng viên, đang tạo mới giảng viên")
-                instructor_count = instructors_collection.count_documents({})
-                instructor_id = f"GV{instructor_count + 1:04d}"
-                new_instructor = {
-                    "instructor_id": instructor_id,
-                    "user_id": str(user.get('_id')),
-                    "personal_info": {
-                        "full_name": "Giảng Viên",
-                        "faculty": "Công nghệ Thông tin"
-                    },
-                    "contact": {
-                        "email": email,
-                        "phone": ""
-                    },
-                    "academic_info": {
-                        "degree": "Thạc sĩ",
-                        "specialization": "Công nghệ phần mềm",
-                        "research_interests": []
-                    },
-                    "faculty_id": "60d5ec9af682fbd12a8952c1",
-                    "courses_taught": [],
-                    "created_at": datetime.now(),
-                    "updated_at": datetime.now()
-                }
-                result = instructors_collection.insert_one(new_instructor)
-                instructor = instructors_collection.find_one({"_id": result.inserted_id})
+            # Thông tin giảng viên: bộ nhớ đệm hoặc một truy vấn $or theo user_id / contact.email,
+            # tạo hồ sơ mặc định nếu chưa có
+            instructor, created = resolve_instructor(instructors_collection, identity_cache, user.get('_id'), email)
+            if created:
                 logger.info(f"Đã tạo giảng viên mới với ID: {instructor.get('_id')}")
             
             if instructor:
@@ -149,42 +72,16 @@ def instructor_login():
                 session['role'] = 'instructor'
                 session['email'] = email
                 
-                print(f"Session đã được thiết lập: {dict(session)}")
-                
                 logger.info(f"Session đã được thiết lập cho giảng viên: {email}")
-                logger.debug(f"Session data: {dict(session)}")
+                logger.debug("Session data: %s", dict(session))
                 
-                # Cập nhật thời gian đăng nhập
-                try:
-                    users_collection.update_one(
-                        {"_id": user.get('_id')},
-                        {"$set": {"last_login": datetime.now()}}
-                    )
-                except Exception as e:
-                    logger.warning(f"Không thể cập nhật thời gian đăng nhập: {e}")
-                    # Không ảnh hưởng đến việc đăng nhập, chỉ ghi log
-                
-                # Chuyển đổi ObjectId thành string trong dữ liệu instructor
-                instructor = convert_objectid_to_str(instructor)
-                
-                response = jsonify({
+                return jsonify({
                     "status": "success", 
                     "message": "Đăng nhập giảng viên thành công", 
                     "instructor_id": instructor.get('instructor_id'),
                     "name": instructor.get('personal_info', {}).get('full_name'),
                     "role": "instructor"
                 })
-                
-                # Đảm bảo cookie session được gửi về client
-                origin = request.headers.get('Origin', 'http://localhost:5173')
-                response.headers['Access-Control-Allow-Origin'] = origin
-                response.headers['Access-Control-Allow-Credentials'] = 'true'
-                response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
-                response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With'
-                print(f"Đã thiết lập CORS headers cho response: {response.headers}")
-                
-                print(f"Đang trả về response thành công: {response.data}")
-                return response
             else:
                 logger.warning(f"Không tìm thấy thông tin giảng viên cho user: {user.get('_id')}")
                 return jsonify({
@@ -220,19 +117,10 @@ def instructor_profile():
     if not instructor:
         return jsonify({"status": "error", "message": "Không tìm thấy thông tin giảng viên"}), 404
     
-    # Chuyển đổi ObjectId thành string
-    instructor['_id'] = str(instructor['_id'])
-    if 'user_id' in instructor:
-        instructor['user_id'] = str(instructor['user_id'])
-    if 'faculty_id' in instructor:
-        instructor['faculty_id'] = str(instructor['faculty_id'])
-    
-    # Lấy thông tin khoa
+    # Lấy thông tin khoa (ObjectId, datetime do MongoJSONProvider chuyển khi trả về)
     faculty = None
     if 'faculty_id' in instructor:
         faculty = faculties_collection.find_one({"_id": ObjectId(instructor['faculty_id'])})
-        if faculty:
-            faculty['_id'] = str(faculty['_id'])
     
     return jsonify({
         "status": "success",
@@ -313,6 +201,9 @@ def update_instructor_profile():
     if result.modified_count == 0:
         return jsonify({"status": "error", "message": "Không có thông tin nào được cập nhật"}), 400
     
+    # Thông tin giảng viên lưu trong bộ nhớ đệm đăng nhập đã cũ
+    identity_cache.invalidate(session.get('user_id'))
+    
     return jsonify({
         "status": "success",
         "message": "Cập nhật thông tin thành công"
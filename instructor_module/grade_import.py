@@ -0,0 +1,226 @@
+# Nhập điểm cả lớp từ JSON / CSV / XLSX và ghi bằng một lần bulk_write
+import csv
+import io
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .grades import now_millis, student_id_values
+from .student_lookup import to_object_id
+from .student_schema import DEFAULT_GRADES_SCHEMA
+
+# Điểm hợp lệ theo thang 10
+MIN_GRADE = 0
+MAX_GRADE = 10
+
+# Cột định danh sinh viên: student_id (ObjectId) hoặc mssv
+ID_COLUMNS = ("student_id", "mssv")
+
+
+class GradeImportError(ValueError):
+    """Dữ liệu nhập không đọc được (sai định dạng file, thiếu cột định danh, ...)"""
+
+
+def _normalize_header(name):
+    return str(name or '').strip().lower()
+
+
+def read_csv_rows(data):
+    text = data.decode('utf-8-sig') if isinstance(data, bytes) else data
+    reader = csv.DictReader(io.StringIO(text))
+    return [{_normalize_header(k): v for k, v in row.items() if k is not None} for row in reader]
+
+
+def read_xlsx_rows(data):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise GradeImportError("Máy chủ chưa hỗ trợ file Excel (thiếu thư viện openpyxl), vui lòng dùng CSV")
+
+    sheet = load_workbook(io.BytesIO(data), read_only=True, data_only=True).active
+    rows = sheet.iter_rows(values_only=True)
+    header = [_normalize_header(name) for name in next(rows, [])]
+    return [
+        dict(zip(header, values)) for values in rows
+        if any(value not in (None, '') for value in values)
+    ]
+
+
+def read_grade_rows(file_storage=None, payload=None):
+    """
+    Đọc các dòng điểm từ file tải lên (.csv / .xlsx) hoặc JSON
+
+    JSON có thể là danh sách dòng hoặc {"rows": [...]}, mỗi dòng gồm
+    student_id hoặc mssv và các cột điểm trong DEFAULT_GRADES_SCHEMA.
+    """
+    if file_storage is not None:
+        filename = (file_storage.filename or '').lower()
+        data = file_storage.read()
+        if filename.endswith('.xlsx'):
+            rows = read_xlsx_rows(data)
+        elif filename.endswith('.csv') or not filename:
+            rows = read_csv_rows(data)
+        else:
+            raise GradeImportError("Chỉ hỗ trợ file .csv hoặc .xlsx")
+    else:
+        rows = payload.get('rows') if isinstance(payload, dict) else payload
+        if not isinstance(rows, list):
+            raise GradeImportError("Dữ liệu phải là danh sách các dòng điểm")
+        rows = [
+            {_normalize_header(k): v for k, v in row.items()} if isinstance(row, dict) else row
+            for row in rows
+        ]
+
+    if not rows:
+        raise GradeImportError("Không có dòng điểm nào")
+    return rows
+
+
+def _parse_grade(value):
+    """Trả về (giá trị, có cập nhật, lỗi); ô trống nghĩa là giữ nguyên điểm cũ"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None, False, None
+    if isinstance(value, str) and value.strip().lower() in ('null', 'none', '-'):
+        return None, True, None
+    try:
+        number = float(str(value).strip().replace(',', '.'))
+    except (TypeError, ValueError):
+        return None, False, f"không phải số: {value!r}"
+    if not MIN_GRADE <= number <= MAX_GRADE:
+        return None, False, f"ngoài khoảng {MIN_GRADE}-{MAX_GRADE}: {value!r}"
+    return number, True, None
+
+
+def validate_grade_rows(rows):
+    """
+    Kiểm tra dữ liệu theo từng cột điểm của DEFAULT_GRADES_SCHEMA
+
+    Mỗi cột được đọc và kiểm tra một lượt cho cả lớp, lỗi được gom theo dòng
+    (số dòng tính từ 1, không tính dòng tiêu đề).
+
+    Returns:
+        tuple: (valid, errors) - valid là danh sách (row, định danh, {cột: điểm});
+               errors là danh sách {"row", "errors"}
+    """
+    errors = {}
+    non_dict = {i for i, row in enumerate(rows) if not isinstance(row, dict)}
+    for i in non_dict:
+        errors[i] = ["dòng không hợp lệ"]
+    rows = [row if i not in non_dict else {} for i, row in enumerate(rows)]
+
+    columns = [field for field in DEFAULT_GRADES_SCHEMA if any(field in row for row in rows)]
+    if not columns:
+        raise GradeImportError("Không có cột điểm nào (" + ", ".join(DEFAULT_GRADES_SCHEMA) + ")")
+    if not any(column in row for row in rows for column in ID_COLUMNS):
+        raise GradeImportError("Thiếu cột student_id hoặc mssv")
+
+    # Định danh sinh viên
+    identities = []
+    for i, row in enumerate(rows):
+        student_id = str(row.get('student_id') or '').strip()
+        mssv = str(row.get('mssv') or '').strip()
+        if student_id and to_object_id(student_id) is None:
+            errors.setdefault(i, []).append(f"student_id không hợp lệ: {student_id!r}")
+        elif not student_id and not mssv and i not in non_dict:
+            errors.setdefault(i, []).append("thiếu student_id hoặc mssv")
+        identities.append(('student_id', student_id) if student_id else ('mssv', mssv))
+
+    # Điểm: kiểm tra theo từng cột
+    updates = [{} for _ in rows]
+    for column in columns:
+        for i, value in enumerate(row.get(column) for row in rows):
+            number, present, error = _parse_grade(value)
+            if error:
+                errors.setdefault(i, []).append(f"{column} {error}")
+            elif present:
+                updates[i][column] = number
+
+    # Một sinh viên xuất hiện nhiều lần: chỉ nhận dòng đầu tiên
+    seen = {}
+    for i, identity in enumerate(identities):
+        if i in errors or not identity[1]:
+            continue
+        if identity in seen:
+            errors.setdefault(i, []).append(f"trùng với dòng {seen[identity] + 1}")
+        else:
+            seen[identity] = i
+
+    valid = [
+        (i, identities[i], updates[i]) for i in range(len(rows))
+        if i not in errors and updates[i]
+    ]
+    return valid, [{"row": i + 1, "errors": messages} for i, messages in sorted(errors.items())]
+
+
+def import_grades(offered_courses_collection, students_collection, course_id, rows):
+    """
+    Kiểm tra và ghi điểm cho nhiều sinh viên của một lớp bằng một bulk_write
+
+    Returns:
+        dict: Số dòng, số dòng đã ghi và lỗi theo từng dòng; None nếu không có lớp
+    """
+    course = offered_courses_collection.find_one({'_id': course_id}, {'students.student_id': 1})
+    if not course:
+        return None
+
+    valid, errors = validate_grade_rows(rows)
+
+    # student_id trong lớp (ObjectId hoặc chuỗi) -> giá trị dùng để khớp
+    roster = {}
+    for student in course.get('students') or []:
+        student_id = student.get('student_id')
+        if student_id is not None:
+            roster[str(student_id)] = student_id
+
+    # Đổi mssv thành _id bằng một truy vấn
+    mssv_list = [identity[1] for _, identity, _ in valid if identity[0] == 'mssv']
+    mssv_to_id = {}
+    if mssv_list:
+        for student in students_collection.find({'mssv': {'$in': mssv_list}}, {'mssv': 1}):
+            mssv_to_id[student['mssv']] = str(student['_id'])
+
+    updated_at = now_millis()
+    operations = []
+    # operations[k] được tạo từ dòng operation_rows[k]
+    operation_rows = []
+    # Một sinh viên ghi theo student_id ở dòng này và theo mssv ở dòng khác: chỉ nhận dòng đầu tiên
+    seen = {}
+    for i, (kind, value), grades in valid:
+        student_id = mssv_to_id.get(value) if kind == 'mssv' else value
+        if not student_id or student_id not in roster:
+            errors.append({"row": i + 1, "errors": [f"không tìm thấy sinh viên {value} trong lớp"]})
+            continue
+        if student_id in seen:
+            errors.append({"row": i + 1, "errors": [f"trùng sinh viên với dòng {seen[student_id] + 1}"]})
+            continue
+        seen[student_id] = i
+        update = {f'students.$.grades.{field}': grade for field, grade in grades.items()}
+        update['updated_at'] = updated_at
+        operations.append(UpdateOne(
+            {'_id': course_id, 'students.student_id': {'$in': student_id_values(student_id)}},
+            {'$set': update}
+        ))
+        operation_rows.append(i)
+
+    failed_writes = 0
+    if operations:
+        try:
+            offered_courses_collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # ordered=False: các lệnh khác vẫn được ghi, chỉ báo lỗi cho các dòng bị từ chối
+            write_errors = e.details.get('writeErrors', [])
+            failed_writes = len(write_errors)
+            for write_error in write_errors:
+                errors.append({
+                    "row": operation_rows[write_error['index']] + 1,
+                    "errors": [f"không ghi được điểm: {write_error.get('errmsg')}"]
+                })
+
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "total_rows": len(rows),
+        "updated": len(operations) - failed_writes,
+        "failed": len(errors),
+        "errors": errors,
+        "updated_at": updated_at.isoformat() if len(operations) > failed_writes else None,
+    }
@@ -0,0 +1,81 @@
+# Ghi điểm của sinh viên trong offered_courses bằng cập nhật nguyên tử trên phần tử mảng students
+from datetime import datetime
+
+from .student_lookup import to_object_id
+
+# Kết quả của set_student_grades
+GRADES_UPDATED = "updated"
+GRADES_CONFLICT = "conflict"
+COURSE_NOT_FOUND = "course_not_found"
+STUDENT_NOT_FOUND = "student_not_found"
+
+
+def now_millis():
+    """Thời điểm hiện tại làm tròn tới mili giây (độ chính xác của datetime trong MongoDB)"""
+    now = datetime.now()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def parse_updated_at(value):
+    """Đọc updated_at client gửi lên (chuỗi ISO), None nếu không có hoặc không hợp lệ"""
+    if isinstance(value, datetime):
+        return value
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', ''))
+    except ValueError:
+        return None
+
+
+def student_id_values(student_id):
+    """student_id trong roster có thể lưu dạng ObjectId hoặc chuỗi, khớp cả hai"""
+    values = [str(student_id)]
+    object_id = to_object_id(student_id)
+    if object_id is not None:
+        values.insert(0, object_id)
+    return values
+
+
+def grades_update(course_id, student_id, grades, updated_at, expected_updated_at=None, letter_grade=None):
+    """
+    Điều kiện và nội dung cập nhật để ghi điểm một sinh viên
+
+    Dùng toán tử vị trí $: MongoDB chỉ sửa phần tử students khớp student_id,
+    các phần tử khác (do giảng viên khác sửa cùng lúc) không bị ghi đè.
+
+    Returns:
+        tuple: (filter, update)
+    """
+    query = {'_id': course_id, 'students.student_id': {'$in': student_id_values(student_id)}}
+    if expected_updated_at is not None:
+        query['updated_at'] = expected_updated_at
+    update = {'$set': {'students.$.grades': grades, 'students.$.letter_grade': letter_grade, 'updated_at': updated_at}}
+    return query, update
+
+
+def set_student_grades(collection, course_id, student_id, grades, expected_updated_at=None, letter_grade=None):
+    """
+    Ghi điểm (kèm điểm chữ) của một sinh viên mà không đọc toàn bộ tài liệu lớp học
+
+    Nếu có expected_updated_at thì chỉ ghi khi updated_at của lớp chưa bị
+    người khác thay đổi (optimistic concurrency).
+
+    Returns:
+        tuple: (kết quả, updated_at mới hoặc hiện tại)
+    """
+    updated_at = now_millis()
+    query, update = grades_update(course_id, student_id, grades, updated_at, expected_updated_at, letter_grade)
+    result = collection.update_one(query, update)
+
+    # updated_at luôn đổi nên lệnh đã khớp thì tài liệu luôn được sửa
+    if result.matched_count:
+        return GRADES_UPDATED, updated_at
+
+    # Không khớp: chỉ đọc vài trường để biết lý do
+    course = collection.find_one({'_id': course_id}, {'_id': 1, 'updated_at': 1})
+    if not course:
+        return COURSE_NOT_FOUND, None
+    if not collection.count_documents({'_id': course_id, 'students.student_id': {'$in': student_id_values(student_id)}}, limit=1):
+        return STUDENT_NOT_FOUND, course.get('updated_at')
+    return GRADES_CONFLICT, course.get('updated_at')
@@ -0,0 +1,286 @@
+# Tính điểm tổng kết và điểm chữ cho cả lớp theo grading_schema, lưu sẵn trên tài liệu offered_courses
+from bisect import bisect_right
+from datetime import datetime
+
+from pymongo import ReturnDocument
+
+# Trọng số mặc định (giống calculateTotalGrade ở frontend) khi lớp chưa có grading_schema
+DEFAULT_WEIGHTS = {
+    "midterm": 0.3,
+    "final": 0.5,
+    "assignments": 0.15,
+    "attendance": 0.05,
+}
+
+# Thành phần điểm bắt buộc phải có mới tính được điểm tổng kết
+REQUIRED_COMPONENTS = ("midterm", "final")
+
+# Thang điểm chữ mặc định (thang 10)
+DEFAULT_GRADING_SCALE = [
+    {"letter": "A", "min_score": 8.5},
+    {"letter": "B+", "min_score": 8.0},
+    {"letter": "B", "min_score": 7.0},
+    {"letter": "C+", "min_score": 6.5},
+    {"letter": "C", "min_score": 5.5},
+    {"letter": "D+", "min_score": 5.0},
+    {"letter": "D", "min_score": 4.0},
+    {"letter": "F", "min_score": 0.0},
+]
+
+# Số lần thử lại khi lớp bị sửa trong lúc đang tính điểm
+MAX_RECOMPUTE_ATTEMPTS = 3
+
+
+class GradingSchemaError(ValueError):
+    """grading_schema gửi lên không hợp lệ"""
+
+
+def to_number(value):
+    """Điểm lưu dạng số, chuỗi ("7.5") hoặc Extended JSON; None nếu trống / không đọc được"""
+    if isinstance(value, dict):
+        value = value.get('$numberDouble', value.get('$numberInt'))
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def schema_weights(grading_schema):
+    """Trọng số từng thành phần điểm, thiếu thì dùng DEFAULT_WEIGHTS"""
+    grading_schema = grading_schema or {}
+    weights = {}
+    for component, default in DEFAULT_WEIGHTS.items():
+        weight = to_number(grading_schema.get(f"{component}_weight"))
+        weights[component] = default if weight is None else weight
+    return weights
+
+
+def scale_letter(entry):
+    return entry.get('letter') or entry.get('grade')
+
+
+class GradingScale:
+    """Thang điểm chữ đã sắp xếp, tra điểm chữ bằng tìm kiếm nhị phân"""
+
+    def __init__(self, grading_scale=None):
+        entries = [
+            (to_number(entry.get('min_score')), scale_letter(entry))
+            for entry in (grading_scale or DEFAULT_GRADING_SCALE)
+            if isinstance(entry, dict)
+        ]
+        entries = sorted((score, letter) for score, letter in entries if score is not None and letter)
+        self.min_scores = [score for score, _ in entries]
+        self.letters = [letter for _, letter in entries]
+
+    def letter(self, total):
+        if total is None:
+            return None
+        i = bisect_right(self.min_scores, total)
+        return self.letters[i - 1] if i else None
+
+
+def compute_totals(students, grading_schema=None):
+    """
+    Tính điểm tổng kết và điểm chữ cho toàn bộ danh sách sinh viên
+
+    Điểm được đọc theo từng cột thành phần một lần, rồi mỗi sinh viên là
+    tổng có trọng số chia cho tổng trọng số các thành phần đã có điểm
+    (cùng công thức với frontend). Thiếu điểm giữa kỳ hoặc cuối kỳ thì giữ
+    nguyên điểm tổng kết đang lưu (có thể do giảng viên nhập tay).
+
+    Args:
+        students (list): Mảng students của lớp
+        grading_schema (dict): grading_schema của lớp
+
+    Returns:
+        list: [(total, letter)] theo thứ tự của students
+    """
+    weights = schema_weights(grading_schema)
+    scale = GradingScale((grading_schema or {}).get('grading_scale'))
+    grades = [student.get('grades') or {} for student in students]
+
+    columns = {component: [to_number(g.get(component)) for g in grades] for component in weights}
+    stored_totals = [to_number(g.get('total')) for g in grades]
+
+    results = []
+    for i, stored_total in enumerate(stored_totals):
+        if any(columns[component][i] is None for component in REQUIRED_COMPONENTS):
+            total = stored_total
+        else:
+            weighted = weight_sum = 0
+            for component, weight in weights.items():
+                score = columns[component][i]
+                if score is not None:
+                    weighted += score * weight
+                    weight_sum += weight
+            total = round(weighted / weight_sum, 2) if weight_sum > 0 else stored_total
+        results.append((total, scale.letter(total)))
+    return results
+
+
+def student_grade(grades, grading_schema=None):
+    """
+    Điểm tổng kết và điểm chữ của một sinh viên, cùng công thức với compute_totals
+
+    Returns:
+        tuple: (total, letter)
+    """
+    return compute_totals([{'grades': grades or {}}], grading_schema)[0]
+
+
+def grade_summary(results):
+    """Tổng hợp điểm của lớp (lưu kèm tài liệu để trang danh sách không phải tính lại)"""
+    totals = [total for total, _ in results if total is not None]
+    distribution = {}
+    for _, letter in results:
+        if letter:
+            distribution[letter] = distribution.get(letter, 0) + 1
+    return {
+        "graded": len(totals),
+        "average_total": round(sum(totals) / len(totals), 2) if totals else None,
+        "min_total": min(totals) if totals else None,
+        "max_total": max(totals) if totals else None,
+        "letter_distribution": distribution,
+    }
+
+
+def grade_summary_expression(computed_at="$$NOW"):
+    """
+    Biểu thức aggregation tính grade_summary trên MongoDB từ mảng students,
+    cùng các khóa với grade_summary (kèm computed_at)
+
+    Dùng để làm mới grade_summary sau khi sửa điểm một sinh viên mà không
+    phải tải danh sách lớp về ứng dụng.
+    """
+    students = {"$ifNull": ["$students", []]}
+    totals = {"$filter": {
+        "input": {"$map": {"input": students, "as": "student", "in": "$$student.grades.total"}},
+        "as": "total",
+        "cond": {"$isNumber": "$$total"},
+    }}
+    letters = {"$filter": {
+        "input": {"$map": {"input": students, "as": "student", "in": "$$student.letter_grade"}},
+        "as": "letter",
+        "cond": {"$and": [{"$eq": [{"$type": "$$letter"}, "string"]}, {"$ne": ["$$letter", ""]}]},
+    }}
+    distribution = {"$arrayToObject": {"$map": {
+        "input": {"$setUnion": ["$$letters", []]},
+        "as": "letter",
+        "in": {
+            "k": "$$letter",
+            "v": {"$size": {"$filter": {"input": "$$letters", "as": "l", "cond": {"$eq": ["$$l", "$$letter"]}}}},
+        },
+    }}}
+    return {"$let": {
+        "vars": {"totals": totals, "letters": letters},
+        "in": {
+            "graded": {"$size": "$$totals"},
+            "average_total": {"$round": [{"$avg": "$$totals"}, 2]},
+            "min_total": {"$min": "$$totals"},
+            "max_total": {"$max": "$$totals"},
+            "letter_distribution": distribution,
+            "computed_at": computed_at,
+        },
+    }}
+
+
+def refresh_grade_summary(collection, course_id):
+    """
+    Tính lại grade_summary của lớp ngay trên MongoDB (cập nhật bằng pipeline)
+
+    Không đổi updated_at, để giá trị mà client đang giữ vẫn hợp lệ.
+
+    Returns:
+        dict: grade_summary mới, None nếu không có lớp
+    """
+    course = collection.find_one_and_update(
+        {'_id': course_id},
+        [{'$set': {'grade_summary': grade_summary_expression()}}],
+        projection={'grade_summary': 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    return course.get('grade_summary') if course else None
+
+
+def grading_update(students, grading_schema):
+    """
+    Nội dung $set lưu kết quả tính điểm: chỉ các phần tử students có điểm
+    thay đổi, cùng grade_summary của lớp
+    """
+    results = compute_totals(students, grading_schema)
+    update = {}
+    for i, (student, (total, letter)) in enumerate(zip(students, results)):
+        if (student.get('grades') or {}).get('total') != total:
+            update[f'students.{i}.grades.total'] = total
+        if student.get('letter_grade') != letter:
+            update[f'students.{i}.letter_grade'] = letter
+    update['grade_summary'] = dict(grade_summary(results), computed_at=datetime.now())
+    return update
+
+
+def recompute_course_grades(collection, course_id):
+    """
+    Tính lại điểm tổng kết của cả lớp và lưu vào tài liệu offered_courses
+
+    Chỉ ghi khi updated_at của lớp chưa đổi kể từ lúc đọc (ghi theo chỉ số
+    mảng nên phải chắc danh sách sinh viên không bị sửa giữa chừng); nếu
+    có thay đổi đồng thời thì đọc và tính lại. Không đổi updated_at, để
+    giá trị mà client đang giữ vẫn hợp lệ.
+
+    Returns:
+        dict: grade_summary mới, None nếu không có lớp
+    """
+    for _ in range(MAX_RECOMPUTE_ATTEMPTS):
+        course = collection.find_one(
+            {'_id': course_id},
+            {'students.grades': 1, 'students.letter_grade': 1, 'grading_schema': 1, 'updated_at': 1},
+        )
+        if not course:
+            return None
+
+        update = grading_update(course.get('students') or [], course.get('grading_schema'))
+        result = collection.update_one(
+            {'_id': course_id, 'updated_at': course.get('updated_at')},
+            {'$set': update},
+        )
+        if result.matched_count:
+            return update['grade_summary']
+    return None
+
+
+def validate_grading_schema(data):
+    """
+    Kiểm tra grading_schema gửi lên
+
+    Returns:
+        dict: grading_schema đã chuẩn hóa
+
+    Raises:
+        GradingSchemaError: Trọng số hoặc thang điểm không hợp lệ
+    """
+    if not isinstance(data, dict):
+        raise GradingSchemaError("grading_schema không hợp lệ")
+
+    schema = {}
+    for component in DEFAULT_WEIGHTS:
+        field = f"{component}_weight"
+        weight = to_number(data.get(field))
+        if weight is None or weight < 0:
+            raise GradingSchemaError(f"{field} phải là số không âm")
+        schema[field] = weight
+    if sum(schema.values()) <= 0:
+        raise GradingSchemaError("Tổng trọng số phải lớn hơn 0")
+
+    scale = []
+    for entry in data.get('grading_scale') or DEFAULT_GRADING_SCALE:
+        min_score = to_number(entry.get('min_score')) if isinstance(entry, dict) else None
+        letter = scale_letter(entry) if isinstance(entry, dict) else None
+        if not letter or min_score is None or not 0 <= min_score <= 10:
+            raise GradingSchemaError("Mỗi mức của grading_scale cần letter và min_score trong khoảng 0-10")
+        scale.append({"letter": letter, "min_score": min_score})
+    schema['grading_scale'] = sorted(scale, key=lambda entry: entry['min_score'], reverse=True)
+    return schema
@@ -0,0 +1,212 @@
+# Xác định giảng viên của một tài khoản users bằng một truy vấn, có bộ nhớ đệm ngắn hạn
+#
+# Migration chuẩn hóa instructors.user_id (chuỗi -> ObjectId), chạy một lần:
+#     python -m instructor_module.identity --migrate-user-ids
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+
+import metrics
+from .student_lookup import to_object_id
+
+# Thời gian giữ thông tin giảng viên của một tài khoản trong bộ nhớ (giây)
+INSTRUCTOR_IDENTITY_TTL = int(os.getenv("INSTRUCTOR_IDENTITY_TTL", "300"))
+
+# Các trường giảng viên cần khi đăng nhập
+INSTRUCTOR_IDENTITY_PROJECTION = {
+    "instructor_id": 1,
+    "user_id": 1,
+    "contact.email": 1,
+    "personal_info.full_name": 1,
+}
+
+# Số tài liệu mỗi lần bulk_write của migration
+MIGRATION_BATCH_SIZE = 500
+
+
+def user_id_values(user_id):
+    """user_id trong instructors có thể lưu dạng ObjectId hoặc chuỗi, khớp cả hai"""
+    values = [str(user_id)]
+    object_id = to_object_id(user_id)
+    if object_id is not None:
+        values.insert(0, object_id)
+    return values
+
+
+def identity_query(user_id, email=None, instructor_id=None):
+    """
+    Điều kiện $or tìm giảng viên theo user_id (ObjectId hoặc chuỗi), contact.email
+    hoặc chính _id của giảng viên
+    """
+    conditions = [{"user_id": {"$in": user_id_values(user_id)}}]
+    if email:
+        conditions.append({"contact.email": email})
+    if instructor_id is not None:
+        conditions.append({"_id": instructor_id})
+    return {"$or": conditions}
+
+
+def best_match(instructors, user_id, email=None):
+    """
+    Chọn giảng viên theo thứ tự ưu tiên như trước đây: khớp user_id, rồi
+    contact.email, rồi _id
+    """
+    user_ids = {str(value) for value in user_id_values(user_id)}
+
+    def rank(instructor):
+        if str(instructor.get("user_id")) in user_ids:
+            return 0
+        if email and (instructor.get("contact") or {}).get("email") == email:
+            return 1
+        return 2
+
+    return min(instructors, key=rank, default=None)
+
+
+class InstructorIdentityCache:
+    """
+    Bộ nhớ đệm trong tiến trình: user _id -> thông tin giảng viên (theo INSTRUCTOR_IDENTITY_PROJECTION)
+
+    TTL ngắn để thay đổi hồ sơ / gán lại tài khoản được thấy sau vài phút
+    mà không cần cơ chế xóa bộ nhớ đệm giữa các tiến trình.
+    """
+
+    def __init__(self, ttl=INSTRUCTOR_IDENTITY_TTL):
+        self.ttl = ttl
+        self._identities = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._identities.get(str(user_id))
+            if cached and now - cached[0] < self.ttl:
+                metrics.incr("instructor_identity.hits")
+                return cached[1]
+        metrics.incr("instructor_identity.misses")
+        return None
+
+    def set(self, user_id, instructor):
+        with self._lock:
+            self._identities[str(user_id)] = (time.monotonic(), instructor)
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                self._identities.clear()
+            else:
+                self._identities.pop(str(user_id), None)
+
+
+def find_instructor(collection, user_id, email=None, instructor_id=None, projection=INSTRUCTOR_IDENTITY_PROJECTION):
+    """Tìm giảng viên bằng một truy vấn $or, None nếu không có"""
+    query = identity_query(user_id, email, instructor_id)
+    return best_match(list(collection.find(query, projection).limit(5)), user_id, email)
+
+
+def new_instructor_document(user_id, email, instructor_count):
+    """Hồ sơ mặc định cho tài khoản giảng viên chưa có trong instructors"""
+    now = datetime.now()
+    return {
+        "instructor_id": f"GV{instructor_count + 1:04d}",
+        "user_id": to_object_id(user_id) or user_id,
+        "personal_info": {
+            "full_name": "Giảng Viên",
+            "faculty": "Công nghệ Thông tin"
+        },
+        "contact": {
+            "email": email,
+            "phone": ""
+        },
+        "academic_info": {
+            "degree": "Thạc sĩ",
+            "specialization": "Công nghệ phần mềm",
+            "research_interests": []
+        },
+        "faculty_id": "60d5ec9af682fbd12a8952c1",
+        "courses_taught": [],
+        "created_at": now,
+        "updated_at": now
+    }
+
+
+def resolve_instructor(collection, cache, user_id, email):
+    """
+    Giảng viên của tài khoản users: bộ nhớ đệm, rồi một truy vấn $or, nếu
+    chưa có thì tạo hồ sơ mặc định (không đọc lại sau khi insert)
+
+    Returns:
+        tuple: (instructor, created)
+    """
+    instructor = cache.get(user_id)
+    if instructor is not None:
+        return instructor, False
+
+    created = False
+    instructor = find_instructor(collection, user_id, email)
+    if instructor is None:
+        instructor = new_instructor_document(user_id, email, collection.estimated_document_count())
+        collection.insert_one(instructor)
+        created = True
+
+    cache.set(user_id, instructor)
+    return instructor, created
+
+
+def normalize_instructor_user_ids(collection, batch_size=MIGRATION_BATCH_SIZE, cache=None):
+    """
+    Chuyển instructors.user_id dạng chuỗi ObjectId sang ObjectId (chạy lại nhiều lần không sao)
+
+    Args:
+        cache (InstructorIdentityCache): Bộ nhớ đệm cần xóa các tài khoản đã chuyển, nếu chạy
+            trong tiến trình ứng dụng (chạy bằng CLI thì các worker tự hết hạn sau INSTRUCTOR_IDENTITY_TTL)
+
+    Returns:
+        dict: Số tài liệu đã chuyển và số user_id chuỗi không phải ObjectId (giữ nguyên)
+    """
+    converted = skipped = 0
+    operations = []
+    for instructor in collection.find({"user_id": {"$type": "string"}}, {"user_id": 1}):
+        object_id = to_object_id(instructor["user_id"])
+        if object_id is None:
+            skipped += 1
+            continue
+        operations.append(UpdateOne(
+            {"_id": instructor["_id"], "user_id": instructor["user_id"]},
+            {"$set": {"user_id": object_id}}
+        ))
+        if cache is not None:
+            cache.invalidate(object_id)
+        if len(operations) >= batch_size:
+            converted += collection.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        converted += collection.bulk_write(operations, ordered=False).modified_count
+    return {"converted": converted, "skipped": skipped}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chuẩn hóa instructors.user_id về ObjectId")
+    parser.add_argument("--migrate-user-ids", action="store_true", help="Chuyển user_id dạng chuỗi sang ObjectId")
+    args = parser.parse_args(argv)
+    if not args.migrate_user_ids:
+        parser.print_help()
+        return 1
+
+    load_dotenv()
+    client = MongoClient(os.getenv("MONGO_URI"))
+    database = client.get_default_database()
+
+    print(json.dumps(normalize_instructor_user_ids(database.instructors), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,23 @@ from bson.objectid import ObjectId
 from datetime import datetime
 import logging
 from .student_schema import DEFAULT_GRADES_SCHEMA
+from .student_lookup import resolve_students, roster_student_ids
+from .grade_import import GradeImportError, import_grades, read_grade_rows
+from .grades import (
+    COURSE_NOT_FOUND,
+    GRADES_CONFLICT,
+    STUDENT_NOT_FOUND,
+    now_millis,
+    parse_updated_at,
+    set_student_grades,
+)
+from .grading import (
+    GradingSchemaError,
+    recompute_course_grades,
+    refresh_grade_summary,
+    student_grade,
+    validate_grading_schema,
+)
 
 # Lấy logger
 logger = logging.getLogger(__name__)
@@ -24,11 +41,11 @@ def instructor_required(f):
     def decorated_function(*args, **kwargs):
         # Kiểm tra quyền giáo viên
         if 'role' not in session or session['role'] != 'instructor':
-            logger.warning(f"Không có quyền giáo viên: {dict(session)}")
+            logger.warning("Không có quyền giáo viên: %s", dict(session))
             return jsonify({"status": "error", "message": "Bạn không có quyền truy cập trang này"}), 403
             
         if 'instructor_id' not in session:
-            logger.warning(f"Không tìm thấy instructor_id trong session: {dict(session)}")
+            logger.warning("Không tìm thấy instructor_id trong session: %s", dict(session))
             return jsonify({"status": "error", "message": "Vui lòng đăng nhập lại"}), 401
             
         return f(*args, **kwargs)
@@ -52,19 +69,8 @@ def get_instructor_profile():
             logger.error(f"Không tìm thấy giảng viên với ID: {instructor_id}")
             return jsonify({"status": "error", "message": "Không tìm thấy thông tin giáo viên"}), 404
         
-        # Chuyển đổi ObjectId thành string
-        instructor_data = {}
-        for key, value in instructor.items():
-            if key == '_id':
-                instructor_data[key] = str(value)
-            elif isinstance(value, datetime):
-                instructor_data[key] = value.strftime("%Y-%m-%d %H:%M:%S")
-            elif isinstance(value, ObjectId):
-                instructor_data[key] = str(value)
-            else:
-                instructor_data[key] = value
-        
-        return jsonify({"status": "success", "data": instructor_data})
+        # ObjectId, datetime do MongoJSONProvider chuyển khi trả về
+        return jsonify({"status": "success", "data": instructor})
     except Exception as e:
         logger.error(f"Lỗi khi lấy thông tin giảng viên: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -73,7 +79,7 @@ def get_instructor_profile():
 @instructor_bp.route('/courses', methods=['GET'])
 @instructor_required
 def get_instructor_courses():
-    logger.info("=== TRUY VẤN DANH SÁCH MÔN HỌC GIẢNG VIÊN ===")
+    logger.debug("=== TRUY VẤN DANH SÁCH MÔN HỌC GIẢNG VIÊN ===")
     
     # Lấy instructor_id từ session
     instructor_id = session.get('instructor_id')
@@ -130,7 +136,8 @@ def get_instructor_courses():
                 "location": offered_course.get('location', 'N/A'),
                 "status": offered_course.get('status', 'active'),
                 "students_count": len(offered_course.get('students', [])),
-                "max_enrollment": offered_course.get('max_enrollment', 0)
+                "max_enrollment": offered_course.get('max_enrollment', 0),
+                "grade_summary": offered_course.get('grade_summary')
             }
             
             courses_data.append(course_data)
@@ -158,7 +165,7 @@ def get_instructor_courses():
 @instructor_bp.route('/classes/<course_id>', methods=['GET'])  # Hỗ trợ cả hai loại URL
 @instructor_required
 def get_course_by_id(course_id):
-    logger.info(f"=== LẤY CHI TIẾT KHÓA HỌC: {course_id} ===")
+    logger.debug("=== LẤY CHI TIẾT KHÓA HỌC: %s ===", course_id)
     
     try:
         # Chuyển đổi ID thành ObjectId
@@ -184,14 +191,16 @@ def get_course_by_id(course_id):
         # Xử lý dữ liệu sinh viên
         students_data = []
         if 'students' in offered_course and isinstance(offered_course['students'], list):
+            # Lấy thông tin tất cả sinh viên của lớp bằng một truy vấn
+            students_by_id = resolve_students(students_collection, roster_student_ids([offered_course]))
             for student_info in offered_course['students']:
                 try:
                     student_id = student_info.get('student_id')
                     if isinstance(student_id, str):
                         student_id = ObjectId(student_id)
                     
-                    # Lấy thêm thông tin từ collection students
-                    student = students_collection.find_one({'_id': student_id})
+                    # Thông tin từ collection students
+                    student = students_by_id.get(student_id)
                     
                     # Kết hợp thông tin từ cả hai nguồn
                     student_data = {
@@ -200,7 +209,8 @@ def get_course_by_id(course_id):
                         "full_name": student_info.get('full_name') or (student.get('personal_info', {}).get('full_name', 'N/A') if student else student_info.get('mssv', 'N/A')),
                         "email": student_info.get('email') or (student.get('personal_info', {}).get('email', {}).get('school', 'N/A') if student else 'N/A'),
                         "class": (student.get('personal_info', {}).get('class', 'N/A') if student else 'N/A'),
-                        "grades": student_info.get('grades', DEFAULT_GRADES_SCHEMA.copy())
+                        "grades": student_info.get('grades', DEFAULT_GRADES_SCHEMA.copy()),
+                        "letter_grade": student_info.get('letter_grade')
                     }
                     students_data.append(student_data)
                 except Exception as e:
@@ -226,6 +236,7 @@ def get_course_by_id(course_id):
                 "email": instructor.get('contact', {}).get('email', 'N/A') if instructor else 'N/A'
             },
             "grading_schema": offered_course.get('grading_schema', {}),
+            "grade_summary": offered_course.get('grade_summary'),
             "created_at": offered_course.get('created_at', datetime.now()).isoformat() if hasattr(offered_course.get('created_at', None), 'isoformat') else str(offered_course.get('created_at', '')),
             "updated_at": offered_course.get('updated_at', datetime.now()).isoformat() if hasattr(offered_course.get('updated_at', None), 'isoformat') else str(offered_course.get('updated_at', ''))
         }
@@ -239,20 +250,10 @@ def get_course_by_id(course_id):
         return jsonify({"status": "error", "message": str(e)}), 500
 
 # API cập nhật điểm số của sinh viên
-@instructor_bp.route('/courses/<course_id>/students/<student_id>/grades', methods=['PUT', 'OPTIONS'])
+@instructor_bp.route('/courses/<course_id>/students/<student_id>/grades', methods=['PUT'])
 @instructor_required
 def update_student_grades(course_id, student_id):
-    # Xử lý yêu cầu OPTIONS (CORS preflight)
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'ok'})
-        origin = request.headers.get('Origin', 'http://localhost:5173')
-        response.headers['Access-Control-Allow-Origin'] = origin
-        response.headers['Access-Control-Allow-Methods'] = 'PUT, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Access-Control-Allow-Origin, Access-Control-Allow-Methods, Access-Control-Allow-Headers'
-        response.headers['Access-Control-Allow-Credentials'] = 'true'
-        return response
-        
-    logger.info(f"=== CẬP NHẬT ĐIỂM SỐ SINH VIÊN: Khóa học {course_id}, Sinh viên {student_id} ===")
+    logger.debug("=== CẬP NHẬT ĐIỂM SỐ SINH VIÊN: Khóa học %s, Sinh viên %s ===", course_id, student_id)
     
     try:
         # Lấy dữ liệu từ request
@@ -272,60 +273,146 @@ def update_student_grades(course_id, student_id):
         # Chuyển đổi ID thành ObjectId
         try:
             course_obj_id = ObjectId(course_id)
-            student_obj_id = ObjectId(student_id)
+            ObjectId(student_id)
         except Exception as e:
             logger.warning(f"ID không hợp lệ: {e}")
             return jsonify({"status": "error", "message": "ID không hợp lệ"}), 400
         
-        # Lấy thông tin khóa học
-        offered_course = offered_courses_collection.find_one({'_id': course_obj_id})
-        if not offered_course:
+        # updated_at của lớp mà client đã tải (không bắt buộc), dùng để phát hiện sửa đồng thời
+        expected_updated_at = None
+        if data.get('updated_at'):
+            expected_updated_at = parse_updated_at(data.get('updated_at'))
+            if expected_updated_at is None:
+                return jsonify({"status": "error", "message": "updated_at không hợp lệ"}), 400
+        
+        # Chỉ đọc grading_schema của lớp để tính điểm tổng kết của sinh viên này
+        course = offered_courses_collection.find_one({'_id': course_obj_id}, {'grading_schema': 1})
+        if not course:
             logger.warning(f"Không tìm thấy khóa học với ID: {course_id}")
             return jsonify({"status": "error", "message": "Không tìm thấy khóa học"}), 404
         
-        # Kiểm tra xem sinh viên có trong danh sách không
-        student_found = False
-        students = offered_course.get('students', [])
-        
-        for i, student in enumerate(students):
-            if isinstance(student.get('student_id'), ObjectId) and student.get('student_id') == student_obj_id:
-                student_found = True
-                # Cập nhật điểm số
-                students[i]['grades'] = grades
-                break
-            elif isinstance(student.get('student_id'), str) and student.get('student_id') == student_id:
-                student_found = True
-                # Cập nhật điểm số
-                students[i]['grades'] = grades
-                break
-        
-        if not student_found:
-            logger.warning(f"Không tìm thấy sinh viên {student_id} trong khóa học {course_id}")
-            return jsonify({"status": "error", "message": "Không tìm thấy sinh viên trong khóa học"}), 404
+        total, letter_grade = student_grade(grades, course.get('grading_schema'))
+        grades['total'] = total
         
-        # Cập nhật vào cơ sở dữ liệu
-        result = offered_courses_collection.update_one(
-            {'_id': course_obj_id},
-            {'$set': {'students': students, 'updated_at': datetime.now()}}
+        # Cập nhật nguyên tử điểm của đúng sinh viên trong mảng students
+        result, updated_at = set_student_grades(
+            offered_courses_collection, course_obj_id, student_id, grades, expected_updated_at, letter_grade
         )
         
-        if result.modified_count == 0:
-            logger.warning("Không có thay đổi nào được cập nhật")
+        if result == COURSE_NOT_FOUND:
+            logger.warning(f"Không tìm thấy khóa học với ID: {course_id}")
+            return jsonify({"status": "error", "message": "Không tìm thấy khóa học"}), 404
+        
+        if result == STUDENT_NOT_FOUND:
+            logger.warning(f"Không tìm thấy sinh viên {student_id} trong khóa học {course_id}")
+            return jsonify({"status": "error", "message": "Không tìm thấy sinh viên trong khóa học"}), 404
+        
+        if result == GRADES_CONFLICT:
+            logger.warning(f"Điểm của khóa học {course_id} đã được người khác cập nhật")
             return jsonify({
-                "status": "warning", 
-                "message": "Không có thay đổi nào được cập nhật"
-            }), 200
+                "status": "error",
+                "message": "Dữ liệu lớp học đã được cập nhật bởi người khác, vui lòng tải lại",
+                "updated_at": updated_at.isoformat() if updated_at else None
+            }), 409
         
         logger.info(f"Đã cập nhật điểm thành công cho sinh viên {student_id}")
         
+        # Làm mới grade_summary của lớp trên MongoDB, không tải danh sách sinh viên về
+        grade_summary = refresh_grade_summary(offered_courses_collection, course_obj_id)
+        
         return jsonify({
             "status": "success", 
-            "message": "Cập nhật điểm số thành công"
+            "message": "Cập nhật điểm số thành công",
+            "updated_at": updated_at.isoformat(),
+            "grades": grades,
+            "letter_grade": letter_grade,
+            "grade_summary": grade_summary
         })
     except Exception as e:
         logger.error(f"Lỗi khi cập nhật điểm: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# API nhập điểm cho cả lớp: file .csv / .xlsx (trường "file") hoặc JSON {"rows": [...]}
+# Mỗi dòng gồm student_id hoặc mssv và các cột midterm, final, assignments, attendance, total
+@instructor_bp.route('/courses/<course_id>/grades/bulk', methods=['POST'])
+@instructor_required
+def import_course_grades(course_id):
+    logger.debug("=== NHẬP ĐIỂM CẢ LỚP: Khóa học %s ===", course_id)
+    
+    try:
+        try:
+            course_obj_id = ObjectId(course_id)
+        except Exception as e:
+            logger.warning(f"ID không hợp lệ: {e}")
+            return jsonify({"status": "error", "message": "ID không hợp lệ"}), 400
+        
+        try:
+            rows = read_grade_rows(request.files.get('file'), None if 'file' in request.files else request.get_json(silent=True))
+            result = import_grades(offered_courses_collection, students_collection, course_obj_id, rows)
+        except GradeImportError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        if result is None:
+            logger.warning(f"Không tìm thấy khóa học với ID: {course_id}")
+            return jsonify({"status": "error", "message": "Không tìm thấy khóa học"}), 404
+        
+        logger.info(f"Đã nhập điểm cho {result['updated']}/{result['total_rows']} dòng của khóa học {course_id}")
+        
+        # Tính lại điểm tổng kết của cả lớp một lần sau khi nhập
+        grade_summary = None
+        if result['updated']:
+            grade_summary = recompute_course_grades(offered_courses_collection, course_obj_id)
+        
+        return jsonify({
+            "status": "success" if not result["errors"] else "warning",
+            "message": f"Đã cập nhật điểm cho {result['updated']} sinh viên",
+            "grade_summary": grade_summary,
+            **result
+        })
+    except Exception as e:
+        logger.error(f"Lỗi khi nhập điểm: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+# API cập nhật cách tính điểm của lớp (trọng số và thang điểm chữ), sau đó tính lại điểm cả lớp
+@instructor_bp.route('/courses/<course_id>/grading-schema', methods=['PUT'])
+@instructor_required
+def update_grading_schema(course_id):
+    logger.debug("=== CẬP NHẬT CÁCH TÍNH ĐIỂM: Khóa học %s ===", course_id)
+    
+    try:
+        try:
+            course_obj_id = ObjectId(course_id)
+        except Exception as e:
+            logger.warning(f"ID không hợp lệ: {e}")
+            return jsonify({"status": "error", "message": "ID không hợp lệ"}), 400
+        
+        try:
+            grading_schema = validate_grading_schema(request.get_json(silent=True))
+        except GradingSchemaError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        updated_at = now_millis()
+        result = offered_courses_collection.update_one(
+            {'_id': course_obj_id},
+            {'$set': {'grading_schema': grading_schema, 'updated_at': updated_at}}
+        )
+        if not result.matched_count:
+            logger.warning(f"Không tìm thấy khóa học với ID: {course_id}")
+            return jsonify({"status": "error", "message": "Không tìm thấy khóa học"}), 404
+        
+        grade_summary = recompute_course_grades(offered_courses_collection, course_obj_id)
+        
+        return jsonify({
+            "status": "success",
+            "message": "Cập nhật cách tính điểm thành công",
+            "grading_schema": grading_schema,
+            "grade_summary": grade_summary,
+            "updated_at": updated_at.isoformat()
+        })
+    except Exception as e:
+        logger.error(f"Lỗi khi cập nhật cách tính điểm: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 # Hàm khởi tạo blueprint
 def init_app(app, mongo_client):
     global mongo, instructors_collection, offered_courses_collection, courses_collection, registered_courses_collection, students_collection, curriculum_collection
@@ -338,7 +425,8 @@ def init_app(app, mongo_client):
         offered_courses_collection = mongo.db.offered_courses
         courses_collection = mongo.db.courses
         registered_courses_collection = mongo.db.registered_courses
-        students_collection = mongo.db.students
+        # Cùng collection sinh viên với main.py và admin (student, không phải students)
+        students_collection = mongo.db.student
         curriculum_collection = mongo.db.curriculum
         
         logger.info("Đã khởi tạo các collection thành công")
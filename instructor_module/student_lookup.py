@@ -0,0 +1,51 @@
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+
+# Các trường sinh viên dùng khi hiển thị danh sách lớp
+STUDENT_LOOKUP_PROJECTION = {
+    "mssv": 1,
+    "personal_info.full_name": 1,
+    "personal_info.email.school": 1,
+    "personal_info.class": 1,
+}
+
+
+def to_object_id(value):
+    """Chuyển student_id (ObjectId hoặc chuỗi) thành ObjectId, None nếu không hợp lệ"""
+    if isinstance(value, ObjectId):
+        return value
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def resolve_students(collection, student_ids, projection=STUDENT_LOOKUP_PROJECTION):
+    """
+    Lấy thông tin nhiều sinh viên bằng một truy vấn $in
+
+    Args:
+        collection: Collection sinh viên
+        student_ids: Các student_id (ObjectId hoặc chuỗi), có thể trùng hoặc không hợp lệ
+        projection (dict): Các trường cần lấy
+
+    Returns:
+        dict: ObjectId -> tài liệu sinh viên (chỉ gồm sinh viên tìm thấy)
+    """
+    object_ids = {oid for oid in map(to_object_id, student_ids) if oid is not None}
+    if not object_ids:
+        return {}
+    return {
+        student['_id']: student
+        for student in collection.find({'_id': {'$in': list(object_ids)}}, projection)
+    }
+
+
+def roster_student_ids(courses):
+    """Tất cả student_id trong danh sách sinh viên của các lớp"""
+    return [
+        student_info.get('student_id')
+        for course in courses
+        for student_info in (course.get('students') or [])
+        if isinstance(student_info, dict) and student_info.get('student_id') is not None
+    ]
@@ -0,0 +1,86 @@
+# JSON provider cho Flask: hiểu sẵn ObjectId, datetime, Decimal128 để route trả thẳng tài liệu MongoDB
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+import json
+
+from bson import Decimal128, ObjectId
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson là tùy chọn, không có thì dùng thư viện json chuẩn
+    orjson = None
+
+
+@lru_cache(maxsize=4096)
+def _decimal128_to_float(bid):
+    # Giải mã Decimal128 khá chậm (~13µs), điểm số chỉ có ít giá trị khác nhau nên nhớ lại theo bytes
+    return float(Decimal128.from_bid(bid).to_decimal())
+
+
+def bson_default(obj):
+    """Chuyển các kiểu của BSON / Python mà JSON không có sẵn"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        return _decimal128_to_float(obj.bid)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class MongoJSONProvider(JSONProvider):
+    """
+    Serialize bằng orjson (nếu có), ngược lại dùng json chuẩn với bson_default
+
+    datetime được ghi theo ISO 8601 ở cả hai cách. Giữ sort_keys mặc định
+    của Flask để thứ tự khóa trong response không đổi.
+    """
+
+    sort_keys = True
+    mimetype = "application/json"
+
+    def _orjson_dumps(self, obj, **kwargs):
+        """Bytes do orjson tạo ra, None nếu không dùng được orjson cho lần gọi này"""
+        if orjson is None or set(kwargs) - {"sort_keys", "indent"}:
+            return None
+        options = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            options |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            options |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=bson_default, option=options)
+        except TypeError:
+            # Số nguyên vượt 64 bit, khóa lẫn kiểu, ... để json chuẩn xử lý
+            return None
+
+    def _json_dumps(self, obj, **kwargs):
+        kwargs.setdefault("default", bson_default)
+        kwargs.setdefault("ensure_ascii", False)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def dumps(self, obj, **kwargs):
+        data = self._orjson_dumps(obj, **kwargs)
+        return data.decode("utf-8") if data is not None else self._json_dumps(obj, **kwargs)
+
+    def dumps_bytes(self, obj, **kwargs):
+        data = self._orjson_dumps(obj, **kwargs)
+        return data if data is not None else self._json_dumps(obj, **kwargs).encode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if self._app.debug:
+            return self._app.response_class(self.dumps_bytes(obj, indent=2) + b"\n", mimetype=self.mimetype)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
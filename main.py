@@ -1,34 +1,40 @@
 from flask import Flask, request, session, jsonify
 from flask_pymongo import PyMongo
-from flask_cors import CORS
 from dotenv import load_dotenv
+import logging
 import os
 import smtplib
 from email.mime.text import MIMEText
 from datetime import datetime
-import requests
-import re
-from bs4 import BeautifulSoup
 from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 from flask_wtf.csrf import CSRFProtect
 from datetime import timedelta
-import json
 from bson import ObjectId
+from scraper import fetch_portal_pages, PORTAL_COOKIE_NAME, TRANSCRIPT_PAGE, REGISTRATION_PAGE, PROFILE_PAGE
+from scraper import TranscriptParser, ensure_transcript_page, parse_registration_html
+from scraper import SyncJobQueue, public_job, MongoJobBackend, JOB_SYNC, JOB_REGISTER
+from scraper import write_academic_delta, add_timing_hook
+from scraper import PageStateStore, conditional_headers, is_unchanged, page_fingerprint, NOT_MODIFIED
+from academics import CompletedCourseIndex, get_prerequisite_graph, CurriculumCache
+from academics import analyze_performance, build_student_summary, refresh_student_summary
+import metrics
+from json_provider import MongoJSONProvider
+from rate_limit import limiter_options, rate_limit_key
+from cors import init_cors
+from app_logging import setup_logging
+from indexes import bootstrap_indexes
+from instructor_module.identity import find_instructor
+from instructor_module.student_lookup import to_object_id
 
 load_dotenv()
 
-# Tạo lớp JSONEncoder tùy chỉnh để xử lý ObjectId và datetime
-class MongoJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        elif isinstance(obj, datetime):
-            return obj.strftime("%Y-%m-%d %H:%M:%S")
-        return super().default(obj)
+# Log đi qua hàng đợi và được ghi ra stdout ở luồng nền (cấu hình trong app_logging.py)
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-app.json_encoder = MongoJSONEncoder
+# JSON provider hiểu ObjectId, datetime, Decimal128: route trả thẳng tài liệu MongoDB
+app.json = MongoJSONProvider(app)
 app.config.update(
     SECRET_KEY=os.getenv("SECRET_KEY"),
     SESSION_COOKIE_HTTPONLY=True,
@@ -37,27 +43,21 @@ app.config.update(
     PERMANENT_SESSION_LIFETIME=timedelta(minutes=30)
 )
 
+# CORS đăng ký trước Limiter: preflight được trả lời trước khi tính rate limit
+init_cors(app)
+
+# Bộ đếm lưu ở RATELIMIT_STORAGE_URI (dùng chung giữa các worker), khóa theo mssv / giảng viên khi đã đăng nhập
 limiter = Limiter(
-    get_remote_address,
+    rate_limit_key,
     app=app,
-    default_limits=["200 per day", "30 per hour"]
+    default_limits=["200 per day", "30 per hour"],
+    **limiter_options()
 )
 
 @limiter.request_filter
 def exempt_localhost():
     return request.remote_addr == "127.0.0.1"
 
-# Cấu hình CORS
-CORS(app, 
-     origins=["http://localhost:5173", "http://127.0.0.1:5173", "*"],
-     supports_credentials=True,
-     allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Access-Control-Allow-Origin", "Access-Control-Allow-Methods", "Access-Control-Allow-Headers"],
-     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-     expose_headers=["Content-Type", "Authorization"]
-)
-
-# Xử lý OPTIONS request cho CORS preflight đã được chuyển vào instructor_module/auth.py
-
 # Cấu hình kết nối MongoDB
 # csrf = CSRFProtect(app)
 app.config["MONGO_URI"] = os.getenv("MONGO_URI")
@@ -68,445 +68,99 @@ users_collection = mongo.db.users
 student_collection = mongo.db.student
 subject_collection = mongo.db.subject
 academic_records_collection = mongo.db.academic_records
+sync_state_collection = mongo.db.sync_state
 
-# Thông tin tài khoản email admin
-ADMIN_EMAIL = os.getenv("ADMIN_EMAIL")
-ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
-
-def parse_float(value):
-    try:
-        return float(value)
-    except:
-        return None
+# Hàng đợi job /sync_data và /register; trạng thái job lưu trong MongoDB để worker nào cũng trả lời được /sync_data/<job_id>
+sync_queue = SyncJobQueue(MongoJobBackend(mongo.db.sync_jobs))
 
-def parse_int(value):
+# Tạo chỉ mục còn thiếu và báo các truy vấn chính đang quét toàn bộ collection (xem indexes.py)
+if os.getenv("MONGO_INDEX_BOOTSTRAP", "1") != "0":
     try:
-        return int(value)
-    except:
-        return None
-
-def determine_status(score):
-    if isinstance(score, str):
-        if score.strip().lower() == "miễn":
-            return "Đã hoàn thành"
-        try:
-            numeric_score = parse_float(score)
-            return "Qua môn" if isinstance(numeric_score, float) and numeric_score >= 4 else "Không hoàn thành"
-        except ValueError:
-            return "Chưa hoàn thành"
-    return "Chưa hoàn thành"
-
-
-def parse_registration_html(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
-    title_text = soup.find('div', class_='title_thongtindangky')
-    match = re.search(r"HỌC KỲ (\d+) NĂM (\d{4}) - (\d{4})", title_text.get_text(), re.IGNORECASE)
-
-    if match:
-        semester_number = match.group(1)
-        year_start = match.group(2)
-        year_end = match.group(3)
-        formatted = f"Học kỳ {semester_number} - Năm học {year_start}-{year_end}"
-    else:
-        formatted = "Current Semester"
-
-    semester_name = formatted
-
-    table = soup.find('table')
-    courses = []
-    if table:
-        rows = table.find_all('tr')[1:]
-        for row in rows:
-            cells = row.find_all('td')
-            if len(cells) >= 5:
-                course_code = cells[1].text.strip()
-                course_name = cells[3].text.strip()
-                credits = parse_int(cells[4].text.strip())
-                if "(TH" in course_name:
-                    for course in courses:
-                        if course_code.startswith(course["course_code"]):
-                            course["credits"] += credits
-                            break
-                    continue
-                courses.append({
-                    "course_code": course_code,
-                    "course_name": course_name,
-                    "credits": parse_int(credits),
-                    "scores": {
-                        "process": None,
-                        "midterm": None,
-                        "practice": None,
-                        "final": None,
-                    },
-                    "total_score": None,
-                    "complete": "Chưa hoàn thành",
-                    "note": ""
-                })
-    return semester_name, courses
-
-# Support for parsing data for the new user
-def get_new_userdata(cookies, mssv):
-    url = f"https://student.uit.edu.vn/sinhvien/kqhoctap?sid={mssv}"
-    registration_url = 'https://student.uit.edu.vn/sinhvien/dkhp/thongtindangky'
-    profile_url = "https://student.uit.edu.vn/sinhvien/thongtin/hoso-online"
-
-    response = requests.get(url, cookies=cookies)
-    if "BẢNG ĐIỂM SINH VIÊN" not in response.text:
-        raise Exception("Không thể truy xuất dữ liệu. Cookie có thể sai hoặc hết hạn.")
-    
-    registration_response = requests.get(registration_url, cookies=cookies)
-    profile_response = requests.get(profile_url, cookies=cookies)
-
-    profile_soup = BeautifulSoup(profile_response.text, 'html.parser')
-    major = ""
-
-    try:
-        profile_table = profile_soup.find('table', class_='mytable')
-        if profile_table:
-            rows = profile_table.find_all('tr')
-            for row in rows:
-                cells = row.find_all('td')
-                if len(cells) >= 2 and "Ngành học" in cells[0].text:
-                    major = cells[1].text.strip().split(" - ")[0].strip()
-                    break
+        bootstrap_indexes(mongo.db)
     except Exception as e:
-        print(f"Error parsing major info: {e}")
-        major = ""
-
-    soup = BeautifulSoup(response.text, 'html.parser')
-    student_info_table = soup.find('table')
-    student_info_rows = student_info_table.find_all('tr')
-
-    academic_records = []
-    rows = soup.find_all('tr')
-    total_credits_taken = 0
-    total_credits_accumulated = 0
-    total_score_sum = 0
-    total_credits_with_scores = 0
-
-    semester_info = None
-    courses = []
-    semester_credits = 0
-    semester_score_sum = 0
-
-    for row in rows:
-        cells = row.find_all('td') 
-        if len(cells) == 1 and "Học kỳ" in cells[0].text:
-            if semester_info and courses:
-                semester_average = round(semester_score_sum / semester_credits, 2) if semester_credits > 0 else None
-                academic_records.append({
-                    "semester": semester_info,
-                    "courses": courses,
-                    "semester_average": str(semester_average),
-                    "credits_taken": (semester_credits),
-                    "status": "Đã hoàn thành",
-                    "start_date": {"$date": "2024-09-01T00:00:00Z"},
-                    "end_date": {"$date": "2025-01-15T00:00:00Z"},
-                })
-                total_credits_taken += semester_credits
-                semester_credits = 0
-                semester_score_sum = 0
-                courses = []
-
-            semester_info = cells[0].text.strip()
-        elif len(cells) >= 10:
-            credits = parse_int(cells[3].text.strip())
-            total_score = cells[8].text.strip()
-
-            if total_score == "Miễn":
-                total_score = "Miễn"
-            else:
-                try:
-                    total_score = parse_float(total_score)
-                except ValueError:
-                    total_score = None
-            
-            course = {
-                "course_code": cells[1].text.strip(),
-                "course_name": cells[2].text.strip(),
-                "credits": credits,
-                "scores": {
-                    "process": parse_float(cells[4].text.strip()),
-                    "midterm": parse_float(cells[5].text.strip()),
-                    "practice": parse_float(cells[6].text.strip()),
-                    "final": parse_float(cells[7].text.strip()),
-                },
-                "total_score": total_score,
-                "complete": determine_status(cells[8].text.strip()),
-                "note": cells[9].text.strip(),
-            }
-            courses.append(course)
-
-            total_credits_accumulated += credits
-
-            if total_score is not None and total_score != "Miễn":
-                semester_score_sum += total_score * credits
-                total_score_sum += total_score * credits
-                total_credits_with_scores += credits
-                semester_credits += credits
+        logger.error("Không tạo được chỉ mục: %s", e)
 
-    if semester_info and courses:
-        semester_average = round(semester_score_sum / semester_credits, 2) if semester_credits > 0 else None
-        academic_records.append({
-            "semester": semester_info,
-            "courses": courses,
-            "semester_average": str(semester_average),
-            "credits_taken": str(semester_credits),
-            "status": "Đã hoàn thành",
-            "start_date": {"$date": "2024-09-01T00:00:00Z"},
-            "end_date": {"$date": "2025-01-15T00:00:00Z"},
-        })
-        total_credits_taken += semester_credits
+# Dấu vân tay các trang cổng thông tin của lần đồng bộ gần nhất
+page_state_store = PageStateStore(sync_state_collection)
 
-    overall_average = round(total_score_sum / total_credits_with_scores, 2) if total_credits_with_scores > 0 else None
-    mssv = mssv or soup.find('strong').text.strip()
+# Chương trình đào tạo theo ngành được giữ trong bộ nhớ (xem /admin/curriculum/cache)
+curriculum_cache = CurriculumCache(subject_collection)
+# Blueprint đọc mongo và bộ nhớ đệm qua current_app, không import lại main
+# (chạy `python main.py` thì main là __main__, import main sẽ tạo thêm một ứng dụng thứ hai)
+app.extensions['mongo'] = mongo
+app.extensions['curriculum_cache'] = curriculum_cache
+# Change stream báo thay đổi cho mọi worker (cần replica set, không có thì chỉ dùng TTL); tắt bằng CURRICULUM_CHANGE_STREAM=0
+if os.getenv("CURRICULUM_CHANGE_STREAM", "1") != "0":
+    curriculum_cache.start_watch()
 
-    current_semester, current_courses = parse_registration_html(registration_response.text)
-    current_credits = sum(course['credits'] for course in current_courses)
+# Ghi thời gian từng giai đoạn phân tích dữ liệu vào metrics
+add_timing_hook(lambda stage, seconds, mssv: metrics.observe(f"scraper.{stage}_seconds", seconds))
 
-    if current_courses:
-        existing_semester = next((r for r in academic_records if r["semester"] == current_semester), None)
+# Thông tin tài khoản email admin
+ADMIN_EMAIL = os.getenv("ADMIN_EMAIL")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
 
-    if existing_semester:
-        old_courses = existing_semester["courses"]
-        old_course_map = {c["course_code"]: c for c in old_courses}
 
-        for course in current_courses:
-            code = course["course_code"]
-            if code in old_course_map:
-                old = old_course_map[code]
-                course["scores"] = old.get("scores", course["scores"])
-                course["total_score"] = old.get("total_score", course["total_score"])
-                course["note"] = old.get("note", course["note"])
-                course["complete"] = determine_status(course["total_score"])
-            else:
-                course["complete"] = "Chưa hoàn thành"
-    else:
-        for course in current_courses:
-            course["complete"] = "Chưa hoàn thành"
-
-    academic_records = [r for r in academic_records if r["semester"] != current_semester]
-    academic_records.insert(0, {
-        "semester": current_semester,
-        "courses": current_courses,
-        "semester_average": "0",
-        "credits_taken": parse_int(sum(course['credits'] if course['total_score'] != "Miễn" else 0 for course in current_courses)),
-        "status": "Đang học",
-        "start_date": {"$date": "2024-09-01T00:00:00Z"},
-        "end_date": {"$date": "2025-01-15T00:00:00Z"},
-    })
-
-    student_info = {
-        "mssv": mssv,
-        "role": "student", 
-        "personal_info": {
-            "full_name": student_info_rows[0].find_all('td')[1].text.strip() if student_info_rows[0].find_all('td')[1] else "",
-            "gender": student_info_rows[0].find_all('td')[5].text.strip() if student_info_rows[0].find_all('td')[5] else "",
-            "birth_date": student_info_rows[0].find_all('td')[3].text.strip() if student_info_rows[0].find_all('td')[3] else "",
-            "class": student_info_rows[1].find_all('td')[3].text.strip() if student_info_rows[1].find_all('td')[3] else "",
-            "faculty": student_info_rows[1].find_all('td')[5].text.strip() if student_info_rows[1].find_all('td')[5] else "",
-            "major": major,
-            "email": {
-                "school": f"{mssv}@gm.uit.edu.vn",
-            },
-            "training_system": student_info_rows[2].find_all('td')[3].text.strip() if student_info_rows[2].find_all('td')[3] else "",
-        },
-        "chat_history": [], 
-    }
-
-    unique_records = {}
-    for record in academic_records:
-        sem_key = record["semester"]
-        if sem_key not in unique_records:
-            unique_records[sem_key] = record
-        else:
-            if record["status"] == "Đang học":
-                unique_records[sem_key] = record
-            elif record["status"] == "Đã hoàn thành" and unique_records[sem_key]["status"] != "Đang học":
-                unique_records[sem_key] = record
-
-    academic_records = list(unique_records.values())
+# Support for parsing data for the new user
+def get_new_userdata(cookies, mssv):
+    # Tải đồng thời bảng điểm, thông tin đăng ký học phần và hồ sơ
+    pages = fetch_portal_pages(cookies, mssv, (TRANSCRIPT_PAGE, REGISTRATION_PAGE, PROFILE_PAGE))
+    ensure_transcript_page(pages[TRANSCRIPT_PAGE].text)
 
-    academic_data = {
-        "mssv": mssv,
-        "academic_records": academic_records,
-        "summary": {
-            "total_credits_taken": total_credits_taken,
-            "total_credits_accumulated": total_credits_accumulated,
-            "overall_average": overall_average,
-        },
-        "progress": {
-            "total_credits_required": 150,
-            "graduation_status": "Đang học",
-            "warnings": [],
-        }
-    }
+    parser = TranscriptParser(mssv)
+    academic_data = parser.parse(pages[TRANSCRIPT_PAGE].text, pages[REGISTRATION_PAGE].text)
+    student_info = parser.student_info(pages[PROFILE_PAGE].text)
 
     return student_info, academic_data
 
 # Support for parsing data for route /sync_data
-def get_latest_data(cookies, mssv):
-    url = f"https://student.uit.edu.vn/sinhvien/kqhoctap?sid={mssv}"
-    registration_url = 'https://student.uit.edu.vn/sinhvien/dkhp/thongtindangky'
-
-    response = requests.get(url, cookies=cookies)
-    if "BẢNG ĐIỂM SINH VIÊN" not in response.text:
-        raise Exception("Không thể truy xuất dữ liệu. Cookie có thể sai hoặc hết hạn.")
-    
-    registration_response = requests.get(registration_url, cookies=cookies)
-
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    academic_records = []
-    rows = soup.find_all('tr')
-    total_credits_taken = 0
-    total_credits_accumulated = 0
-    total_score_sum = 0
-    total_credits_with_scores = 0
-
-    semester_info = None
-    courses = []
-    semester_credits = 0
-    semester_score_sum = 0
-
-    for row in rows:
-        cells = row.find_all('td') 
-        if len(cells) == 1 and "Học kỳ" in cells[0].text:
-            if semester_info and courses:
-                semester_average = round(semester_score_sum / semester_credits, 2) if semester_credits > 0 else None
-                academic_records.append({
-                    "semester": semester_info,
-                    "courses": courses,
-                    "semester_average": str(semester_average),
-                    "credits_taken": (semester_credits),
-                    "status": "Đã hoàn thành",
-                    "start_date": {"$date": "2024-09-01T00:00:00Z"},
-                    "end_date": {"$date": "2025-01-15T00:00:00Z"},
-                })
-                total_credits_taken += semester_credits
-                semester_credits = 0
-                semester_score_sum = 0
-                courses = []
-
-            semester_info = cells[0].text.strip()
-        elif len(cells) >= 10:
-            credits = parse_int(cells[3].text.strip())
-            total_score = cells[8].text.strip()
-
-            if total_score == "Miễn":
-                total_score = "Miễn"
-            else:
-                try:
-                    total_score = parse_float(total_score)
-                except ValueError:
-                    total_score = None
-            
-            course = {
-                "course_code": cells[1].text.strip(),
-                "course_name": cells[2].text.strip(),
-                "credits": credits,
-                "scores": {
-                    "process": parse_float(cells[4].text.strip()),
-                    "midterm": parse_float(cells[5].text.strip()),
-                    "practice": parse_float(cells[6].text.strip()),
-                    "final": parse_float(cells[7].text.strip()),
-                },
-                "total_score": total_score,
-                "complete": determine_status(cells[8].text.strip()),
-                "note": cells[9].text.strip(),
-            }
-            courses.append(course)
-
-            total_credits_accumulated += credits
-
-            if total_score is not None and total_score != "Miễn":
-                semester_score_sum += total_score * credits
-                total_score_sum += total_score * credits
-                total_credits_with_scores += credits
-                semester_credits += credits
-
-    if semester_info and courses:
-        semester_average = round(semester_score_sum / semester_credits, 2) if semester_credits > 0 else None
-        academic_records.append({
-            "semester": semester_info,
-            "courses": courses,
-            "semester_average": str(semester_average),
-            "credits_taken": str(semester_credits),
-            "status": "Đã hoàn thành",
-            "start_date": {"$date": "2024-09-01T00:00:00Z"},
-            "end_date": {"$date": "2025-01-15T00:00:00Z"},
-        })
-        total_credits_taken += semester_credits
-
-    overall_average = round(total_score_sum / total_credits_with_scores, 2) if total_credits_with_scores > 0 else None
-    mssv = mssv or soup.find('strong').text.strip()
-
-    current_semester, current_courses = parse_registration_html(registration_response.text)
-
-    if current_courses:
-        existing_semester = next((r for r in academic_records if r["semester"] == current_semester), None)
-
-    if existing_semester:
-        old_courses = existing_semester["courses"]
-        old_course_map = {c["course_code"]: c for c in old_courses}
-
-        for course in current_courses:
-            code = course["course_code"]
-            if code in old_course_map:
-                old = old_course_map[code]
-                course["scores"] = old.get("scores", course["scores"])
-                course["total_score"] = old.get("total_score", course["total_score"])
-                course["note"] = old.get("note", course["note"])
-                course["complete"] = determine_status(course["total_score"])
-            else:
-                course["complete"] = "Chưa hoàn thành"
-    else:
-        for course in current_courses:
-            course["complete"] = "Chưa hoàn thành"
-
-    academic_records = [r for r in academic_records if r["semester"] != current_semester]
-    academic_records.insert(0, {
-        "semester": current_semester,
-        "courses": current_courses,
-        "semester_average": "0",
-        "credits_taken": parse_int(sum(course['credits'] if course['total_score'] != "Miễn" else 0 for course in current_courses)),
-        "status": "Đang học",
-        "start_date": {"$date": "2024-09-01T00:00:00Z"},
-        "end_date": {"$date": "2025-01-15T00:00:00Z"},
-    })
-
-    # Gộp học kỳ trùng tên: Ưu tiên bản "Đang học", bỏ bản "Đã hoàn thành" nếu trùng
-    unique_records = {}
-    for record in academic_records:
-        sem_key = record["semester"]
-        if sem_key not in unique_records:
-            unique_records[sem_key] = record
-        else:
-            if record["status"] == "Đang học":
-                # Nếu đã có bản cũ, mà bản mới là "Đang học" → ghi đè
-                unique_records[sem_key] = record
-            elif record["status"] == "Đã hoàn thành" and unique_records[sem_key]["status"] != "Đang học":
-                # Nếu chưa có "Đang học", và đây là "Đã hoàn thành", thì giữ
-                unique_records[sem_key] = record
-
-    academic_records = list(unique_records.values())
-
-    academic_data = {
-        "mssv": mssv,
-        "academic_records": academic_records,
-        "summary": {
-            "total_credits_taken": total_credits_taken,
-            "total_credits_accumulated": total_credits_accumulated,
-            "overall_average": overall_average,
-        },
-        "progress": {
-            "total_credits_required": 150,
-            "graduation_status": "Đang học",
-            "warnings": [],
-        }
-    }
-
-    return academic_data
+def get_latest_data(cookies, mssv, known_pages=None):
+    """
+    Tải và phân tích dữ liệu mới nhất của sinh viên
+
+    Args:
+        known_pages (dict): Dấu vân tay các trang ở lần đồng bộ trước (PageStateStore.load)
+
+    Returns:
+        tuple: (academic_data, fingerprints) - academic_data là None nếu mọi
+               trang đều giống lần đồng bộ trước (bỏ qua phân tích và ghi)
+    """
+    sync_pages = (TRANSCRIPT_PAGE, REGISTRATION_PAGE)
+    known_pages = known_pages or {}
+
+    # Tải đồng thời bảng điểm và thông tin đăng ký học phần, gửi kèm ETag / Last-Modified
+    pages = fetch_portal_pages(cookies, mssv, sync_pages, conditional_headers(known_pages, sync_pages))
+    unchanged = [page for page in sync_pages if is_unchanged(pages[page], known_pages.get(page))]
+    if len(unchanged) == len(sync_pages):
+        return None, {}
+
+    # Trang trả 304 không có nội dung, cần tải lại đầy đủ để phân tích
+    not_modified = [page for page in sync_pages if pages[page].status_code == NOT_MODIFIED]
+    if not_modified:
+        pages.update(fetch_portal_pages(cookies, mssv, tuple(not_modified)))
+
+    ensure_transcript_page(pages[TRANSCRIPT_PAGE].text)
+
+    parser = TranscriptParser(mssv)
+    academic_data = parser.parse(pages[TRANSCRIPT_PAGE].text, pages[REGISTRATION_PAGE].text)
+    return academic_data, {page: page_fingerprint(pages[page]) for page in sync_pages}
+
+# Job đồng bộ chạy trên worker của sync_queue
+def run_sync_job(cookies, mssv):
+    record, fingerprints = get_latest_data(cookies, mssv, page_state_store.load(mssv))
+    if record is None:
+        # Trang trên cổng thông tin không đổi từ lần trước: bỏ qua phân tích và ghi
+        metrics.incr("sync.skipped")
+        return {"changed": False, "skipped": True, "message": "Dữ liệu đã được cập nhật mới nhất"}
+
+    # Chỉ ghi các học kỳ / môn học thay đổi, bỏ qua nếu không có gì mới
+    result = write_academic_delta(academic_records_collection, mssv, record)
+    if result["changed"]:
+        # Chỉ tính lại tổng của các học kỳ thay đổi
+        refresh_student_summary(student_collection, mssv, record, result["changes"])
+    page_state_store.save(mssv, fingerprints)
+    message = "Đồng bộ dữ liệu thành công" if result["changed"] else "Dữ liệu đã được cập nhật mới nhất"
+    return dict(result, skipped=False, message=message)
 
 @app.route('/sync_data', methods=['POST'])
 def sync_data():
@@ -515,7 +169,7 @@ def sync_data():
 
     mssv = session['mssv']
     data = request.get_json()
-    cookie_name = "SSESSdf6f777d3f8a1d0fb2e4e5d1ec62f6e2"
+    cookie_name = PORTAL_COOKIE_NAME
     cookie_value = data.get('cookie_value')
 
     if not cookie_value:
@@ -523,51 +177,32 @@ def sync_data():
 
     cookies = {cookie_name: cookie_value}
 
-    try:
-        record = get_latest_data(cookies, mssv)
-        academic_records_collection.replace_one({"mssv": mssv}, record, upsert=True)
-        return jsonify({"status": "success", "message": "Đồng bộ dữ liệu thành công"})
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+    job = sync_queue.enqueue(JOB_SYNC, mssv, run_sync_job, cookies, mssv)
+    return jsonify({
+        "status": "success",
+        "message": "Đã tiếp nhận yêu cầu đồng bộ dữ liệu",
+        "job_id": job["job_id"],
+        "job": job
+    }), 202
+
+@app.route('/sync_data/<job_id>', methods=['GET'])
+@limiter.exempt
+def sync_data_status(job_id):
+    if 'mssv' not in session:
+        return jsonify({"status": "error", "message": "Vui lòng đăng nhập"}), 401
+
+    job = sync_queue.get(job_id)
+    if not job or job["kind"] != JOB_SYNC or job["owner"] != session['mssv']:
+        return jsonify({"status": "error", "message": "Không tìm thấy yêu cầu đồng bộ"}), 404
+    return jsonify({"status": "success", "job": public_job(job)})
 
 # Hàm cập nhật tổng tín chỉ và điểm trung bình
+# Tính lại toàn bộ summary từ academic_records; /sync_data và /register cập nhật summary khi ghi
 def update_student_summary(mssv):
     academic_record = academic_records_collection.find_one({"mssv": mssv})
     if not academic_record or 'academic_records' not in academic_record:
-        return
-    
-    total_credits = 0
-    total_score_weighted = 0
-    total_credits_for_gpa = 0
-    
-    for record in academic_record['academic_records']:
-        for course in record['courses']:
-            credits = course.get('credits', 0)
-            total_score = course.get('total_score', "0")
-            complete_status = course.get('complete', "")
-            
-            if complete_status == "Chưa hoàn thành":
-                continue
-            if complete_status != "Không hoàn thành":
-                total_credits += credits
-            if str(total_score).lower() != "miễn" and complete_status != "Không hoàn thành":
-                try:
-                    total_score_weighted += float(total_score) * credits
-                except (TypeError, ValueError):
-                    total_score_weighted += 0
-
-                total_credits_for_gpa += credits
-    
-    accumulated_average = (total_score_weighted / total_credits_for_gpa) if total_credits_for_gpa > 0 else 0
-    
-    # Cập nhật vào student_collection
-    student_collection.update_one(
-        {"mssv": mssv},
-        {"$set": {
-            "summary.total_credits_taken": total_credits,
-            "summary.accumulated_average": round(accumulated_average, 2)
-        }}
-    )
+        return None
+    return refresh_student_summary(student_collection, mssv, academic_record)
 
 # Hàm cập nhật tổng tín chỉ và điểm trung bình từng học kỳ
 def update_academic_records_summary(mssv):
@@ -611,70 +246,50 @@ def update_academic_records_summary(mssv):
     )
 
 # Các route cơ bản
-@app.route("/check-session", methods=["GET", "OPTIONS"])
+@app.route("/check-session", methods=["GET"])
 @limiter.limit("10 per minute")
 # @csrf.exempt
 def check_session():
-    if request.method == 'OPTIONS':
-        response = jsonify({'status': 'success'})
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
-        response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
-        
-    print(f"Kiểm tra session: {dict(session)}")
+    logger.debug("Kiểm tra session: %s", dict(session))
     
     if "mssv" in session:
-        response = jsonify({
+        return jsonify({
             "status": "success",
             "mssv": session["mssv"],
             "role": "student"
         })
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     elif "instructor_id" in session and session.get("role") == "instructor":
-        response = jsonify({
+        return jsonify({
             "status": "success",
             "user": {
                 "instructor_id": session["instructor_id"],
                 "role": "instructor"
             }
         })
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     elif "admin_id" in session and session.get("role") == "admin":
-        response = jsonify({
+        return jsonify({
             "status": "success",
             "admin": {
                 "username": session["admin_id"],
                 "role": "admin"
             }
         })
-        response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-        response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
     else:
-        response = jsonify({
+        return jsonify({
             "status": "error",
             "message": "Không có session hợp lệ."
         }), 401
-        if isinstance(response, tuple):
-            response[0].headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-            response[0].headers.add('Access-Control-Allow-Credentials', 'true')
-        else:
-            response.headers.add('Access-Control-Allow-Origin', 'http://localhost:5173')
-            response.headers.add('Access-Control-Allow-Credentials', 'true')
-        return response
 
 @app.route('/user')
 def home():
     if 'mssv' in session:
-        # update_student_summary(session['mssv'])
         student = student_collection.find_one({"mssv": session['mssv']})
         if student:
+            # Tài liệu cũ chưa có summary tính sẵn thì tính một lần
+            if 'semesters' not in student.get('summary', {}):
+                summary = update_student_summary(session['mssv'])
+                if summary:
+                    student['summary'] = summary
             return jsonify({"status": "success", "student": student})
     return jsonify({"status": "error", "message": "Vui lòng đăng nhập"}), 401
 
@@ -700,13 +315,28 @@ def logout():
     response.delete_cookie('session')
     return response, 200
 
+# Job đăng ký chạy trên worker của sync_queue
+def run_register_job(cookies, mssv, password):
+    info, record = get_new_userdata(cookies, mssv)
+    info["summary"] = build_student_summary(record["academic_records"])
+
+    student_collection.insert_one(info)
+    academic_records_collection.insert_one(record)
+
+    users_collection.insert_one({
+        "mssv": mssv,
+        "password": password,
+        "role": "student"
+    })
+    return {"message": "Đăng kí tài khoản thành công"}
+
 @app.route('/register', methods=['POST'])
 @limiter.limit("3 per minute")
 def register():
     data = request.get_json()
     mssv = data.get('mssv')
     password = data.get('regPassword')
-    cookie_name = "SSESSdf6f777d3f8a1d0fb2e4e5d1ec62f6e2"
+    cookie_name = PORTAL_COOKIE_NAME
     cookie_value = data.get('cookieValue')
 
     existing_user = users_collection.find_one({"mssv": mssv})
@@ -714,21 +344,26 @@ def register():
     if existing_user:
         return jsonify({"status": "error", "message": "Tài khoản đã tồn tại"}), 400
 
-    try:
-        info, record = get_new_userdata({cookie_name: cookie_value}, mssv)
+    job = sync_queue.enqueue(JOB_REGISTER, mssv, run_register_job, {cookie_name: cookie_value}, mssv, password)
+    # Chưa đăng nhập nên gắn job với session đã gửi yêu cầu, chỉ session này xem được trạng thái
+    session['register_job_id'] = job["job_id"]
+    return jsonify({
+        "status": "success",
+        "message": "Đã tiếp nhận yêu cầu đăng kí",
+        "job_id": job["job_id"],
+        "job": job
+    }), 202
 
-        student_collection.insert_one(info)
-        academic_records_collection.insert_one(record)
+@app.route('/register/<job_id>', methods=['GET'])
+@limiter.exempt
+def register_status(job_id):
+    if job_id != session.get('register_job_id'):
+        return jsonify({"status": "error", "message": "Không tìm thấy yêu cầu đăng kí"}), 404
 
-        users_collection.insert_one({
-            "mssv": mssv,
-            "password": password,
-            "role": "student"
-        })
-
-        return jsonify({"status": "success", "message": "Đăng kí tài khoản thành công"})
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+    job = sync_queue.get(job_id)
+    if not job or job["kind"] != JOB_REGISTER:
+        return jsonify({"status": "error", "message": "Không tìm thấy yêu cầu đăng kí"}), 404
+    return jsonify({"status": "success", "job": public_job(job)})
 
 
 @app.route('/academic_records')
@@ -750,7 +385,7 @@ def view_curriculum():
     if not student or 'personal_info' not in student or 'faculty' not in student['personal_info']:
         return jsonify({"status": "error", "message": "Không tìm thấy thông tin khoa của sinh viên"}), 404
     student_major = student['personal_info']['major']
-    program = subject_collection.find_one({"major": student_major})
+    program = curriculum_cache.get(student_major)
     if not program or 'curriculum' not in program:
         return jsonify({"status": "error", "message": f"Không tìm thấy chương trình đào tạo cho khoa {student_major}"}), 404
     curriculum_by_category = {}
@@ -767,13 +402,6 @@ def view_scholarships():
         return jsonify({"status": "error", "message": "Vui lòng đăng nhập để xem thông báo"}), 401
     
     scholarships = list(mongo.db.scholarships_events.find().sort("created_at", -1))
-    
-    for schorlaship in scholarships:
-        schorlaship['_id'] = str(schorlaship['_id'])
-        if isinstance(schorlaship['created_at'], datetime):
-            schorlaship['created_at'] = schorlaship['created_at'].isoformat()
-        else:
-            schorlaship['created_at'] = schorlaship['created_at']
     return jsonify({"status": "success", "scholarships": scholarships})
     
 
@@ -782,23 +410,8 @@ def view_notifications():
     if 'mssv' not in session:
         return jsonify({"status": "error", "message": "Vui lòng đăng nhập để xem thông báo"}), 401
     notifications = list(mongo.db.notifications.find().sort("created_at", -1))
-    for notification in notifications:
-        notification['_id'] = str(notification['_id'])
-        if isinstance(notification['created_at'], datetime):
-            notification['created_at'] = notification['created_at'].isoformat()
     return jsonify({"status": "success", "notifications": notifications})
 
-# Kiểm tra môn học đã hoàn thành hay chưa
-def check_course_completion(course_code, mssv):
-    academic_record = academic_records_collection.find_one({"mssv": mssv})
-    if not academic_record or 'academic_records' not in academic_record:
-        return False
-    for record in academic_record['academic_records']:
-        for course in record['courses']:
-            if course.get('course_code') == course_code and course.get('complete') != 'Không hoàn thành':
-                return True
-    return False
-
 # Gợi ý lịch học, gợi ý môn học
 @app.route('/calendar')
 def calendar():
@@ -827,6 +440,7 @@ def calendar():
         }), 404
 
     academic_records = academic_record['academic_records']
+    completed_courses = CompletedCourseIndex.from_academic_record(academic_record)
 
     personal_info = student.get('personal_info', {})
     major = personal_info.get('major')
@@ -836,23 +450,14 @@ def calendar():
             "message": "Không tìm thấy thông tin ngành của sinh viên"
         }), 404
 
-    program = subject_collection.find_one({"major": major})
+    program = curriculum_cache.get(major)
     if not program or 'curriculum' not in program:
         return jsonify({
             "status": "error",
             "message": f"Không tìm thấy chương trình đào tạo cho ngành {major}"
         }), 404
-    mssv = session['mssv']
-    student = student_collection.find_one({"mssv": mssv})
-    if not student or 'personal_info' not in student or 'major' not in student['personal_info']:
-        return jsonify({"status": "error", "message": "Không tìm thấy thông tin sinh viên"}), 404
-
-    major = student['personal_info']['major']
-    program = subject_collection.find_one({"major": major})
-    if not program or 'curriculum' not in program:
-        return jsonify({"status": "error", "message": f"Không tìm thấy chương trình đào tạo cho ngành {major}"}), 404
 
-    curriculum = program['curriculum']
+    graph = get_prerequisite_graph(program)
 
     # Lấy danh sách các môn học chưa hoàn thành
     # Môn đại cương
@@ -863,38 +468,34 @@ def calendar():
     specialized_subjects = []
 
     monGoiY = 0
-    for subject in curriculum:
-        course_code = subject.get('course_code')
-        if course_code:
-            is_completed = check_course_completion(course_code, mssv)
-            if not is_completed:
-                # Kiểm tra các môn tiên quyết đã hoàn thành hay chưa
-                prerequisites = subject.get('prerequisites', [])
-                prerequisites_completed = all(check_course_completion(prereq, mssv) for prereq in prerequisites)
-                if prerequisites_completed:
-                    if subject['category'] == 'Lý luận chính trị' or subject['category'] == 'Giáo dục thể chất' or subject['category'] == 'Ngoại ngữ' or subject['category'] == 'Toán - Tin học - Khoa học tự nhiên':
-                        general_subjects.append(subject)
-                        monGoiY += 1
-                    elif subject['category'] == 'Cơ sở ngành':
-                        basic_subjects.append(subject)
-                        monGoiY += 1
-                    elif subject['category'] == 'Chuyên ngành':
-                        specialized_subjects.append(subject)
-                        monGoiY += 1
+    # Các môn chưa hoàn thành và đã hoàn thành đủ môn tiên quyết
+    for course_code in graph.unlocked(completed_courses):
+        subject = graph.subjects[course_code]
+        if subject['category'] == 'Lý luận chính trị' or subject['category'] == 'Giáo dục thể chất' or subject['category'] == 'Ngoại ngữ' or subject['category'] == 'Toán - Tin học - Khoa học tự nhiên':
+            general_subjects.append(subject)
+            monGoiY += 1
+        elif subject['category'] == 'Cơ sở ngành':
+            basic_subjects.append(subject)
+            monGoiY += 1
+        elif subject['category'] == 'Chuyên ngành':
+            specialized_subjects.append(subject)
+            monGoiY += 1
+
+    # Kế hoạch học các môn còn lại theo từng học kỳ (?plan=1 hoặc ?plan=true, tùy chọn ?max_credits=)
+    plan = {}
+    if request.args.get('plan', '').lower() in ('1', 'true'):
+        plan = {
+            "plan": graph.plan(completed_courses, request.args.get('max_credits', type=int)),
+            "remaining_semesters": graph.critical_path_length(completed_courses),
+        }
     
     if monGoiY == 0:
         # Nếu không có môn nào để gợi ý học môn tốt nghiệp
-        graduate_subjects = []
-        for subject in curriculum:
-            course_code = subject.get('course_code')
-            if course_code:
-                if course_code == 'NT522' or course_code == 'NT541' or course_code == 'NT533' or course_code == 'NT505':
-                    graduate_subjects.append(subject)
-        
         return jsonify({
             "status": "success",
             "message": "Kỳ sau sinh viên nên chọn môn học để tốt nghiệp",
-            "graduate_subjects": graduate_subjects
+            "graduate_subjects": graph.graduation_subjects(),
+            **plan
         })
     
     # Nếu có môn để gợi ý học
@@ -903,7 +504,8 @@ def calendar():
         "message": "Kỳ sau sinh viên nên chọn hoàn thành các môn học sau",
         "general_subjects": general_subjects,
         "basic_subjects": basic_subjects,
-        "specialized_subjects": specialized_subjects
+        "specialized_subjects": specialized_subjects,
+        **plan
     })
 
 @app.route('/performance_review')
@@ -932,8 +534,6 @@ def performance_review():
             "message": "Không tìm thấy thông tin học tập của sinh viên"
         }), 404
 
-    academic_records = academic_record['academic_records']
-
     personal_info = student.get('personal_info', {})
     major = personal_info.get('major')
     if not major:
@@ -942,137 +542,16 @@ def performance_review():
             "message": "Không tìm thấy thông tin khoa của sinh viên"
         }), 404
 
-    program = subject_collection.find_one({"major": major})
+    program = curriculum_cache.get(major)
     if not program or 'curriculum' not in program:
         return jsonify({
             "status": "error",
             "message": f"Không tìm thấy chương trình đào tạo cho khoa {major}"
         }), 404
 
-    semester_performance = []
-    total_failed_courses = 0
-    total_failed_credits = 0
-    total_passed_courses = 0
-    total_taken_credits = 0
-
-    for record in academic_records:
-        semester = record['semester']
-        courses = record['courses']
-        failed_courses_count = 0
-        passed_courses_count = 0
-        failed_credits_semester = 0
-        taken_credits_semester = 0
-
-        for course in courses:
-            complete_status = course.get('complete', "")
-            credits = course.get('credits', 0)
-            total_score = course.get('total_score', "0")
-
-            if complete_status == "Chưa hoàn thành":
-                continue
-
-            taken_credits_semester += credits
-            if complete_status == "Không hoàn thành":
-                failed_courses_count += 1
-                failed_credits_semester += credits
-            elif str(total_score).lower() != "miễn":
-                passed_courses_count += 1
-
-        semester_performance.append({
-            "semester": semester,
-            "failed_courses": failed_courses_count,
-            "passed_courses": passed_courses_count,
-            "failed_credits": failed_credits_semester,
-            "taken_credits": taken_credits_semester
-        })
-        total_failed_courses += failed_courses_count
-        total_failed_credits += failed_credits_semester
-        total_passed_courses += passed_courses_count
-        total_taken_credits += taken_credits_semester
-
-    # Đánh giá tiến độ hoàn thành
-    completed_required_credits = 0
-    total_required_credits_in_program = 0
-    remaining_required_courses = []
-    completed_course_codes = set()
-
-    if program and 'curriculum' in program:
-        for subject in program['curriculum']:
-            credits = subject.get('credits', 0) 
-            if isinstance(credits, (int, float)):
-                total_required_credits_in_program += credits
-            course_code = subject.get('course_code')
-            if course_code:
-                is_completed = False
-                for record in academic_records:
-                    for course in record['courses']:
-                        if (course.get('course_code') == course_code 
-                            and course.get('complete') != 'Không hoàn thành' 
-                            and course.get('complete') != 'Chưa hoàn thành'
-                            and str(course.get('total_score', '0')).lower() != 'miễn'):
-                            completed_required_credits += subject.get('credits', 0)
-                            completed_course_codes.add(course_code)
-                            is_completed = True
-                            break
-                    if is_completed:
-                        break
-                if not is_completed:
-                    remaining_required_courses.append(subject)
-
-    progress_percentage = (completed_required_credits / total_required_credits_in_program) * 100 if total_required_credits_in_program > 0 else 0
-    # Ước tính khả năng tốt nghiệp đúng hạn
-    standard_program_duration_semesters = 8  # Giả định
-    current_semester = len(academic_records)
-    remaining_semesters = standard_program_duration_semesters - current_semester
-    remaining_required_credits = total_required_credits_in_program - completed_required_credits
-    average_credits_per_semester_needed = remaining_required_credits / remaining_semesters if remaining_semesters > 0 else remaining_required_credits
-
-    # Đánh giá dựa trên số môn Không hoàn thành, tiến độ và khối lượng công việc còn lại
-    graduation_assessment_detail = "Đang tiến triển tốt"
-    if total_failed_courses > 3:
-        graduation_assessment_detail = "Cần chú ý đến các môn học bị Không hoàn thành và có kế hoạch học lại hợp lý."
-    if progress_percentage < 50:
-        graduation_assessment_detail = "Tiến độ đang chậm, cần tăng cường học tập để theo kịp chương trình."
-    if remaining_semesters <= 1 and remaining_required_credits > 15:
-        graduation_assessment_detail = "Có nguy cơ cao không tốt nghiệp đúng hạn do khối lượng môn học còn lại lớn."
-
-    # Xem xét các môn Không hoàn thành có phải là môn học tiên quyết hay không
-    failed_course_codes = set()
-    for record in academic_records:
-        for course in record['courses']:
-            if course.get('complete') == 'Không hoàn thành':
-                failed_course_codes.add(course.get('course_code'))
-
-    # Tính toán chi phí học lại
-    cost_per_credit = 980000
-    total_retake_cost = total_failed_credits * cost_per_credit
-
     return jsonify({
         "status": "success",
-        "semester_performance": semester_performance,
-        "overall_performance": {
-            "total_failed_courses": total_failed_courses,
-            "total_failed_credits": total_failed_credits,
-            "total_passed_courses": total_passed_courses,
-            "total_taken_credits": total_taken_credits
-        },
-        "progress": {
-            "percentage_completed": round(progress_percentage, 2),
-            "completed_required_credits": completed_required_credits,
-            "total_required_credits": total_required_credits_in_program,
-            "remaining_required_courses": remaining_required_courses,
-            "completed_course_codes": list(completed_course_codes)
-        },
-        "graduation_outlook": {
-            "assessment": graduation_assessment_detail,
-            "current_semester": current_semester,
-            "remaining_semesters": remaining_semesters,
-            "average_credits_per_semester_needed": round(average_credits_per_semester_needed, 2)
-        },
-        "retake_cost": {
-            "total_cost": total_retake_cost,
-            "cost_per_credit": cost_per_credit
-        }
+        **analyze_performance(academic_record['academic_records'], program['curriculum'])
     })
 
 # Thêm chức năng quên mật khẩu
@@ -1097,11 +576,11 @@ def forgot_password():
                 server.login(ADMIN_EMAIL, ADMIN_PASSWORD)
                 server.sendmail(ADMIN_EMAIL, f"{mssv}@gm.uit.edu.vn", msg.as_string())
 
-            print(f"Mật khẩu tạm thời đã được gửi đến email: {mssv}@gm.uit.edu.vn")
+            logger.info("Mật khẩu tạm thời đã được gửi đến email: %s@gm.uit.edu.vn", mssv)
             return jsonify({"status": "success", "message": f"Mật khẩu tạm thời đã được gửi đến email: {mssv}@gm.uit.edu.vn"})
 
         except Exception as e:
-            print(f"Lỗi khi gửi email: {e}")
+            logger.error("Lỗi khi gửi email: %s", e)
             return jsonify({"status": "error", "message": "Có lỗi xảy ra khi gửi email. Vui lòng thử lại sau."}), 500
     else:
         return jsonify({"status": "error", "message": "Không tìm thấy người dùng với mã số sinh viên này"}), 404
@@ -1134,7 +613,7 @@ def change_password():
 @app.route('/api/course-students/<course_id>', methods=['GET'])
 @app.route('/api/course-detail/<course_id>', methods=['GET'])
 def get_course_detail(course_id):
-    print(f"=== LẤY THÔNG TIN CHI TIẾT KHÓA HỌC: {course_id} ===")
+    logger.debug("Lấy thông tin chi tiết khóa học: %s", course_id)
     
     try:
         # Tìm khóa học từ collection offered_courses
@@ -1147,20 +626,8 @@ def get_course_detail(course_id):
             # Thử tìm với string
             course = offered_courses_collection.find_one({"_id": course_id})
         
-        # Chuyển ObjectId thành string để có thể serialize
-        if isinstance(course['_id'], ObjectId):
-            course['_id'] = str(course['_id'])
-        
-        # Chuyển các ObjectId khác thành string
-        for field in ['course_id', 'instructor_id']:
-            if field in course and isinstance(course[field], ObjectId):
-                course[field] = str(course[field])
-        
-        # Xử lý danh sách sinh viên
+        # Danh sách sinh viên (ObjectId, datetime do MongoJSONProvider chuyển khi trả về)
         students = course.get('students', [])
-        for student in students:
-            if 'student_id' in student and isinstance(student['student_id'], ObjectId):
-                student['student_id'] = str(student['student_id'])
         
         # Đếm số sinh viên đã đăng ký
         course['student_count'] = len(students)
@@ -1211,7 +678,7 @@ def get_course_detail(course_id):
         })
     
     except Exception as e:
-        print(f"Lỗi khi lấy thông tin khóa học: {e}")
+        logger.error("Lỗi khi lấy thông tin khóa học: %s", e)
         return jsonify({
             "status": "error",
             "message": f"Lỗi khi lấy thông tin khóa học: {str(e)}"
@@ -1220,12 +687,9 @@ def get_course_detail(course_id):
 # API lấy danh sách khóa học của giảng viên
 @app.route('/api/instructor/courses', methods=['GET'])
 def get_instructor_courses():
-    print("=== LẤY DANH SÁCH KHÓA HỌC CỦA GIẢNG VIÊN ===")
-    
     try:
         # Kiểm tra xem người dùng đã đăng nhập chưa
         if 'user_id' not in session and 'instructor_id' not in session:
-            print("Người dùng chưa đăng nhập")
             return jsonify({
                 "status": "error",
                 "message": "Vui lòng đăng nhập để xem danh sách khóa học"
@@ -1233,38 +697,17 @@ def get_instructor_courses():
         
         # Lấy ID người dùng từ session
         user_id = session.get('user_id') or session.get('instructor_id')
-        print(f"User ID từ session: {user_id}")
         
         # Tìm thông tin giảng viên từ collection instructors dựa trên user_id
         instructor_collection = mongo.db.instructors
         
-        # Thử tìm giảng viên bằng user_id (dưới dạng ObjectId)
-        try:
-            instructor = instructor_collection.find_one({"user_id": ObjectId(user_id)})
-        except:
-            instructor = instructor_collection.find_one({"user_id": user_id})
+        # Tìm giảng viên theo user_id (ObjectId hoặc chuỗi) hoặc trực tiếp theo _id bằng một truy vấn $or
+        instructor = find_instructor(instructor_collection, user_id, instructor_id=to_object_id(user_id), projection=None)
         
         if not instructor:
-            # Nếu không tìm thấy, thử tìm trực tiếp bằng ID
-            try:
-                instructor = instructor_collection.find_one({"_id": ObjectId(user_id)})
-            except:
-                instructor = None
-        
-        
             instructor_id = user_id
         else:
-            # Chuyển ObjectId thành string
-            instructor_id = str(instructor['_id'])
-            instructor['_id'] = instructor_id
-            
-            # Chuyển các ObjectId khác thành string
-            if 'user_id' in instructor and isinstance(instructor['user_id'], ObjectId):
-                instructor['user_id'] = str(instructor['user_id'])
-            if 'faculty_id' in instructor and isinstance(instructor['faculty_id'], ObjectId):
-                instructor['faculty_id'] = str(instructor['faculty_id'])
-        
-        print(f"Instructor ID: {instructor_id}")
+            instructor_id = instructor['_id']
         
         # Tìm các khóa học từ collection offered_courses
         offered_courses_collection = mongo.db.offered_courses
@@ -1279,22 +722,8 @@ def get_instructor_courses():
         
         # Xử lý dữ liệu khóa học
         for course in courses:
-            # Chuyển ObjectId thành string để có thể serialize
-            if isinstance(course['_id'], ObjectId):
-                course['_id'] = str(course['_id'])
-            
-            # Chuyển các ObjectId khác thành string
-            for field in ['course_id', 'instructor_id']:
-                if field in course and isinstance(course[field], ObjectId):
-                    course[field] = str(course[field])
-            
             # Đếm số sinh viên đã đăng ký
             if 'students' in course:
-                # Chuyển ObjectId trong danh sách sinh viên thành string
-                for student in course['students']:
-                    if 'student_id' in student and isinstance(student['student_id'], ObjectId):
-                        student['student_id'] = str(student['student_id'])
-                
                 course['student_count'] = len(course['students'])
             elif 'enrolled_students' in course:
                 course['student_count'] = len(course['enrolled_students'])
@@ -1309,9 +738,7 @@ def get_instructor_courses():
             if 'max_enrollment' in course and isinstance(course['max_enrollment'], dict) and '$numberInt' in course['max_enrollment']:
                 course['max_enrollment'] = int(course['max_enrollment']['$numberInt'])
         
-        # Log dữ liệu khóa học để debug
-        for i, course in enumerate(courses):
-            print(f"Khóa học {i+1}: {course['course_name']}")
+        logger.debug("Giảng viên %s (user %s) có %d khóa học", instructor_id, user_id, len(courses))
         
         # Chuẩn bị dữ liệu giảng viên cho frontend
         instructor_data = {
@@ -1335,7 +762,7 @@ def get_instructor_courses():
         })
     
     except Exception as e:
-        print(f"Lỗi khi lấy danh sách khóa học: {e}")
+        logger.error("Lỗi khi lấy danh sách khóa học: %s", e)
         return jsonify({
             "status": "error",
             "message": f"Lỗi khi lấy danh sách khóa học: {str(e)}"
@@ -1345,11 +772,11 @@ def get_instructor_courses():
 try:
     from instructor_module import init_app as init_instructor_module
     init_instructor_module(app, mongo)
-    print("Đã đăng ký module instructor thành công")
+    logger.info("Đã đăng ký module instructor thành công")
 except ImportError as e:
-    print(f"Lỗi khi import module instructor: {e}")
+    logger.error("Lỗi khi import module instructor: %s", e)
 except Exception as e:
-    print(f"Lỗi khi đăng ký module instructor: {e}")
+    logger.error("Lỗi khi đăng ký module instructor: %s", e)
 
 # Admin routes đã được chuyển sang module admin
 
@@ -1359,9 +786,9 @@ except Exception as e:
 try:
     from admin import init_admin
     init_admin(app)
-    print("Admin module loaded successfully")
+    logger.info("Admin module loaded successfully")
 except Exception as e:
-    print(f"Error loading admin module: {e}")
+    logger.error("Error loading admin module: %s", e)
 
 if __name__ == '__main__':
     app.run(debug=True)
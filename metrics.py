@@ -0,0 +1,44 @@
+# Bộ đếm và thống kê đơn giản trong tiến trình, dùng cho /admin/metrics
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_summaries = {}
+
+
+def incr(name, value=1):
+    """Tăng bộ đếm `name` thêm `value`"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, value):
+    """Ghi nhận một giá trị đo (thời gian, số byte, ...) vào thống kê `name`"""
+    with _lock:
+        summary = _summaries.get(name)
+        if summary is None:
+            summary = _summaries[name] = {"count": 0, "sum": 0, "max": value, "last": value}
+        summary["count"] += 1
+        summary["sum"] += value
+        summary["max"] = max(summary["max"], value)
+        summary["last"] = value
+
+
+def get_counter(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot():
+    """Bản sao toàn bộ bộ đếm và thống kê hiện tại"""
+    with _lock:
+        summaries = {}
+        for name, summary in _summaries.items():
+            summaries[name] = dict(summary, avg=summary["sum"] / summary["count"] if summary["count"] else 0)
+        return {"counters": dict(_counters), "summaries": summaries}
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _summaries.clear()
@@ -0,0 +1,51 @@
+# Cấu hình Flask-Limiter: nơi lưu bộ đếm dùng chung giữa các worker và khóa theo danh tính người dùng
+#
+# RATELIMIT_STORAGE_URI:
+#     memory://                      bộ đếm riêng từng tiến trình (mặc định, dùng khi phát triển / kiểm thử)
+#     redis://localhost:6379/0       Redis hoặc máy chủ tương thích (Valkey, KeyDB, ...) dùng chung mọi worker
+#     mongodb://host:27017           dùng lại MongoDB sẵn có (database "limits"), không cần thêm dịch vụ
+# RATELIMIT_STRATEGY: sliding-window-counter (mặc định), fixed-window hoặc moving-window
+import os
+
+from flask import session
+from flask_limiter.util import get_remote_address
+from limits.strategies import STRATEGIES
+
+RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI", "memory://")
+
+# sliding-window-counter: mỗi khóa chỉ giữ hai bộ đếm (cửa sổ hiện tại và trước đó) nhưng
+# không cho dồn gấp đôi số request ở ranh giới cửa sổ như fixed-window
+RATELIMIT_STRATEGY = os.getenv("RATELIMIT_STRATEGY", "sliding-window-counter")
+if RATELIMIT_STRATEGY not in STRATEGIES:
+    raise ValueError(f"RATELIMIT_STRATEGY không hợp lệ: {RATELIMIT_STRATEGY} (chọn một trong {', '.join(STRATEGIES)})")
+
+# Khóa theo danh tính trong session, theo thứ tự ưu tiên
+SESSION_IDENTITIES = (
+    ("mssv", "mssv"),
+    ("instructor_id", "instructor"),
+    ("admin_id", "admin"),
+)
+
+
+def rate_limit_key():
+    """
+    Khóa giới hạn request: mssv / mã giảng viên / admin nếu đã đăng nhập, ngược lại là địa chỉ IP
+
+    Sinh viên dùng chung NAT của trường có chung IP, nên khi đã có session
+    mỗi người được tính riêng thay vì cả trường chung một bộ đếm.
+    """
+    for field, prefix in SESSION_IDENTITIES:
+        value = session.get(field)
+        if value:
+            return f"{prefix}:{value}"
+    return f"ip:{get_remote_address()}"
+
+
+def limiter_options():
+    """Tham số storage / strategy cho Limiter"""
+    return {
+        "storage_uri": RATELIMIT_STORAGE_URI,
+        "strategy": RATELIMIT_STRATEGY,
+        # Nếu storage dùng chung không kết nối được thì tạm đếm trong bộ nhớ thay vì trả lỗi 500
+        "in_memory_fallback_enabled": RATELIMIT_STORAGE_URI != "memory://",
+    }
@@ -0,0 +1,35 @@
+# Module scraper: tải và phân tích dữ liệu từ cổng thông tin sinh viên
+from scraper.fetch import (
+    PORTAL_COOKIE_NAME,
+    TRANSCRIPT_PAGE,
+    REGISTRATION_PAGE,
+    PROFILE_PAGE,
+    build_portal_urls,
+    fetch_portal_pages,
+    get_portal_session,
+)
+from scraper.fields import parse_float, parse_int, determine_status
+from scraper.transcript_parser import (
+    SEMESTER_RECORD,
+    COURSE_RECORD,
+    TranscriptStreamParser,
+    iter_transcript_records,
+)
+from scraper.pages import parse_registration_html, parse_profile_major
+from scraper.aggregator import SemesterAggregator, SEMESTER_COMPLETED, SEMESTER_IN_PROGRESS
+from scraper.transcript import TranscriptParser, ensure_transcript_page
+from scraper.timing import add_timing_hook, remove_timing_hook, timed
+from scraper.jobs import (
+    JOB_SYNC,
+    JOB_REGISTER,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JOB_FAILED,
+    LocalJobBackend,
+    MongoJobBackend,
+    SyncJobQueue,
+    public_job,
+)
+from scraper.delta import diff_academic_data, write_academic_delta
+from scraper.page_state import PageStateStore, NOT_MODIFIED, conditional_headers, is_unchanged, page_fingerprint
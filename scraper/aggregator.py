@@ -0,0 +1,149 @@
+from typing import Any, Dict, List, Optional
+
+from scraper.fields import parse_int, determine_status
+
+# Trạng thái học kỳ
+SEMESTER_COMPLETED = "Đã hoàn thành"
+SEMESTER_IN_PROGRESS = "Đang học"
+
+TOTAL_CREDITS_REQUIRED = 150
+
+DEFAULT_START_DATE = {"$date": "2024-09-01T00:00:00Z"}
+DEFAULT_END_DATE = {"$date": "2025-01-15T00:00:00Z"}
+
+
+class SemesterAggregator:
+    """
+    Gom các bản ghi học kỳ / môn học thành tài liệu academic_records
+
+    Nhận bản ghi theo đúng thứ tự trên trang kqhoctap, tính điểm trung bình
+    từng học kỳ và toàn khóa, gộp học kỳ đang học lấy từ trang đăng ký học
+    phần và loại bỏ học kỳ trùng tên.
+    """
+
+    def __init__(self) -> None:
+        self.academic_records: List[Dict[str, Any]] = []
+        self.total_credits_taken = 0
+        self.total_credits_accumulated = 0
+        self.total_score_sum = 0
+        self.total_credits_with_scores = 0
+
+        self._semester_info: Optional[str] = None
+        self._courses: List[Dict[str, Any]] = []
+        self._semester_credits = 0
+        self._semester_score_sum = 0
+
+    def start_semester(self, semester_name: str) -> None:
+        """Bắt đầu một học kỳ mới, chốt học kỳ trước nếu có môn học"""
+        self._close_semester()
+        self._semester_info = semester_name
+
+    def add_course(self, course: Dict[str, Any]) -> None:
+        """Thêm một môn học vào học kỳ đang đọc"""
+        credits = course["credits"]
+        total_score = course["total_score"]
+        self._courses.append(course)
+
+        self.total_credits_accumulated += credits
+
+        if total_score is not None and total_score != "Miễn":
+            self._semester_score_sum += total_score * credits
+            self.total_score_sum += total_score * credits
+            self.total_credits_with_scores += credits
+            self._semester_credits += credits
+
+    def finish(self) -> None:
+        """Chốt học kỳ cuối cùng của bảng điểm"""
+        self._close_semester()
+
+    def _close_semester(self) -> None:
+        if not (self._semester_info and self._courses):
+            return
+
+        credits = self._semester_credits
+        semester_average = round(self._semester_score_sum / credits, 2) if credits > 0 else None
+        self.academic_records.append({
+            "semester": self._semester_info,
+            "courses": self._courses,
+            "semester_average": str(semester_average),
+            "credits_taken": credits,
+            "status": SEMESTER_COMPLETED,
+            "start_date": dict(DEFAULT_START_DATE),
+            "end_date": dict(DEFAULT_END_DATE),
+        })
+        self.total_credits_taken += credits
+        self._semester_credits = 0
+        self._semester_score_sum = 0
+        self._courses = []
+
+    def merge_current_semester(self, semester_name: str, current_courses: List[Dict[str, Any]]) -> None:
+        """
+        Đưa học kỳ đang học (từ trang đăng ký học phần) lên đầu danh sách
+
+        Điểm của môn đã có trong bảng điểm cùng học kỳ được giữ lại.
+        """
+        existing_semester = None
+        if current_courses:
+            existing_semester = next((r for r in self.academic_records if r["semester"] == semester_name), None)
+
+        if existing_semester:
+            old_course_map = {c["course_code"]: c for c in existing_semester["courses"]}
+
+            for course in current_courses:
+                code = course["course_code"]
+                if code in old_course_map:
+                    old = old_course_map[code]
+                    course["scores"] = old.get("scores", course["scores"])
+                    course["total_score"] = old.get("total_score", course["total_score"])
+                    course["note"] = old.get("note", course["note"])
+                    course["complete"] = determine_status(course["total_score"])
+                else:
+                    course["complete"] = "Chưa hoàn thành"
+        else:
+            for course in current_courses:
+                course["complete"] = "Chưa hoàn thành"
+
+        self.academic_records = [r for r in self.academic_records if r["semester"] != semester_name]
+        self.academic_records.insert(0, {
+            "semester": semester_name,
+            "courses": current_courses,
+            "semester_average": "0",
+            "credits_taken": parse_int(sum(course['credits'] if course['total_score'] != "Miễn" else 0 for course in current_courses)),
+            "status": SEMESTER_IN_PROGRESS,
+            "start_date": dict(DEFAULT_START_DATE),
+            "end_date": dict(DEFAULT_END_DATE),
+        })
+
+    def unique_records(self) -> List[Dict[str, Any]]:
+        """Gộp học kỳ trùng tên: ưu tiên bản "Đang học", sau đó bản "Đã hoàn thành" xuất hiện sau"""
+        unique_records: Dict[str, Dict[str, Any]] = {}
+        for record in self.academic_records:
+            sem_key = record["semester"]
+            if sem_key not in unique_records:
+                unique_records[sem_key] = record
+            elif record["status"] == SEMESTER_IN_PROGRESS:
+                unique_records[sem_key] = record
+            elif record["status"] == SEMESTER_COMPLETED and unique_records[sem_key]["status"] != SEMESTER_IN_PROGRESS:
+                unique_records[sem_key] = record
+        return list(unique_records.values())
+
+    def academic_data(self, mssv: str) -> Dict[str, Any]:
+        """Tạo tài liệu lưu vào academic_records_collection"""
+        overall_average = (
+            round(self.total_score_sum / self.total_credits_with_scores, 2)
+            if self.total_credits_with_scores > 0 else None
+        )
+        return {
+            "mssv": mssv,
+            "academic_records": self.unique_records(),
+            "summary": {
+                "total_credits_taken": self.total_credits_taken,
+                "total_credits_accumulated": self.total_credits_accumulated,
+                "overall_average": overall_average,
+            },
+            "progress": {
+                "total_credits_required": TOTAL_CREDITS_REQUIRED,
+                "graduation_status": SEMESTER_IN_PROGRESS,
+                "warnings": [],
+            }
+        }
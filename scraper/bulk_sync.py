@@ -0,0 +1,290 @@
+# Đồng bộ lại dữ liệu học tập cho toàn bộ sinh viên từ file (mssv, cookie)
+#
+# Cách dùng:
+#     python -m scraper.bulk_sync students.csv --concurrency 8 --rate 20
+#
+# File đầu vào mỗi dòng một sinh viên: "mssv,cookie_value" (dòng trống và
+# dòng bắt đầu bằng # được bỏ qua). Tiến độ được ghi vào file checkpoint
+# sau mỗi lô ghi MongoDB, chạy lại với cùng checkpoint sẽ bỏ qua các sinh
+# viên đã đồng bộ xong.
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlparse
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from scraper.fetch import (
+    PORTAL_BASE_URL,
+    PORTAL_COOKIE_NAME,
+    TRANSCRIPT_PAGE,
+    REGISTRATION_PAGE,
+    fetch_portal_pages,
+)
+from scraper.transcript import TranscriptParser, ensure_transcript_page
+from academics.summary import build_student_summary
+
+# Lấy logger
+logger = logging.getLogger(__name__)
+
+SYNC_PAGES = (TRANSCRIPT_PAGE, REGISTRATION_PAGE)
+
+
+class HostRateLimiter:
+    """Token bucket theo từng host: tối đa `rate` request/giây, cho phép dồn `burst` request"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        # Mỗi sinh viên lấy len(SYNC_PAGES) token một lần, bucket phải chứa được ngần ấy
+        self.burst = float(burst or max(rate, len(SYNC_PAGES)))
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host, tokens=1):
+        if self.rate <= 0:
+            return
+        if tokens > self.burst:
+            # Bucket không bao giờ đầy tới mức này, chờ sẽ không bao giờ xong
+            raise ValueError(f"tokens ({tokens}) lớn hơn burst ({self.burst:g})")
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                available, updated = self._buckets.get(host, (self.burst, now))
+                available = min(self.burst, available + (now - updated) * self.rate)
+                if available >= tokens:
+                    self._buckets[host] = (available - tokens, now)
+                    return
+                self._buckets[host] = (available, now)
+                delay = (tokens - available) / self.rate
+            time.sleep(delay)
+
+
+def read_pairs(path):
+    """Đọc danh sách (mssv, cookie) từ file"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            mssv, _, cookie_value = line.replace("\t", ",").partition(",")
+            mssv, cookie_value = mssv.strip(), cookie_value.strip()
+            if mssv and cookie_value:
+                yield mssv, cookie_value
+
+
+def load_checkpoint(path):
+    """Tập mssv đã đồng bộ thành công trong các lần chạy trước"""
+    done = set()
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("status") == "ok":
+                    done.add(entry["mssv"])
+    return done
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def sync_one(mssv, cookie_value, rate_limiter, host):
+    """Tải và phân tích dữ liệu của một sinh viên, trả về (mssv, record, giây)"""
+    start = time.perf_counter()
+    rate_limiter.acquire(host, tokens=len(SYNC_PAGES))
+    pages = fetch_portal_pages({PORTAL_COOKIE_NAME: cookie_value}, mssv, SYNC_PAGES)
+    ensure_transcript_page(pages[TRANSCRIPT_PAGE].text)
+    record = TranscriptParser(mssv).parse(pages[TRANSCRIPT_PAGE].text, pages[REGISTRATION_PAGE].text)
+    return mssv, record, time.perf_counter() - start
+
+
+def bulk_write_errors(collection, operations):
+    """
+    Ghi một lô với ordered=False, trả về {chỉ số lệnh: thông báo lỗi} của các lệnh bị từ chối
+
+    Một dòng lỗi (trùng khóa, tài liệu quá lớn, ...) không làm hỏng cả lô:
+    các lệnh khác vẫn được ghi.
+    """
+    try:
+        collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        return {error["index"]: error.get("errmsg") for error in e.details.get("writeErrors", [])}
+    return {}
+
+
+class BulkResync:
+    """
+    Chạy đồng bộ hàng loạt với số luồng giới hạn, giới hạn tốc độ theo host,
+    ghi MongoDB theo lô bằng bulk_write và lưu checkpoint để chạy tiếp
+    """
+
+    def __init__(self, collection, concurrency=8, rate=20, batch_size=200,
+                 checkpoint_path=None, host=None, log=logger.info, student_collection=None):
+        self.collection = collection
+        # Nếu có, summary trong student_collection được cập nhật cùng lô ghi
+        self.student_collection = student_collection
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path
+        self.rate_limiter = HostRateLimiter(rate)
+        self.host = host or urlparse(PORTAL_BASE_URL).netloc
+        self.log = log
+
+        self.latencies = []
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.written = 0
+        self._batch = []
+        self._checkpoint = None
+
+    def run(self, pairs):
+        done = load_checkpoint(self.checkpoint_path)
+        if self.checkpoint_path:
+            self._checkpoint = open(self.checkpoint_path, "a", encoding="utf-8")
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="bulk-sync") as executor:
+                pending = {}
+                for mssv, cookie_value in pairs:
+                    if mssv in done:
+                        self.skipped += 1
+                        continue
+                    done.add(mssv)
+
+                    # Giữ số job đang chờ có giới hạn để bộ nhớ không tăng theo số sinh viên
+                    if len(pending) >= self.concurrency * 2:
+                        self._collect(pending, wait(pending, return_when=FIRST_COMPLETED).done)
+
+                    future = executor.submit(sync_one, mssv, cookie_value, self.rate_limiter, self.host)
+                    pending[future] = mssv
+
+                while pending:
+                    self._collect(pending, wait(pending, return_when=FIRST_COMPLETED).done)
+
+            self._flush()
+        finally:
+            if self._checkpoint:
+                self._checkpoint.close()
+
+        return self.report(time.perf_counter() - started)
+
+    def _collect(self, pending, finished):
+        for future in finished:
+            mssv = pending.pop(future)
+            try:
+                _, record, elapsed = future.result()
+            except Exception as e:
+                self.failed += 1
+                self._write_checkpoint([{"mssv": mssv, "status": "error", "error": str(e)}])
+                self.log("[bulk-sync] %s: lỗi %s", mssv, e)
+                continue
+
+            self.latencies.append(elapsed)
+            self._batch.append((mssv, record))
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+
+        operations = [ReplaceOne({"mssv": mssv}, record, upsert=True) for mssv, record in batch]
+        errors = bulk_write_errors(self.collection, operations)
+        written = [i for i in range(len(batch)) if i not in errors]
+
+        if self.student_collection is not None and written:
+            summary_errors = bulk_write_errors(self.student_collection, [
+                UpdateOne({"mssv": batch[i][0]}, {"$set": {"summary": build_student_summary(batch[i][1]["academic_records"])}})
+                for i in written
+            ])
+            # Chỉ số lỗi của lệnh cập nhật summary tính trên danh sách written
+            for i, message in summary_errors.items():
+                errors[written[i]] = f"không cập nhật được summary: {message}"
+
+        entries = []
+        for i, (mssv, _) in enumerate(batch):
+            if i in errors:
+                entries.append({"mssv": mssv, "status": "error", "error": errors[i]})
+                self.log("[bulk-sync] %s: lỗi ghi MongoDB %s", mssv, errors[i])
+            else:
+                entries.append({"mssv": mssv, "status": "ok"})
+        self.written += len(written)
+        self.succeeded += len(batch) - len(errors)
+        self.failed += len(errors)
+        self._write_checkpoint(entries)
+        self.log("[bulk-sync] đã ghi %d sinh viên", self.written)
+
+    def _write_checkpoint(self, entries):
+        if not self._checkpoint:
+            return
+        for entry in entries:
+            self._checkpoint.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._checkpoint.flush()
+
+    def report(self, elapsed):
+        """Báo cáo thông lượng: số sinh viên/giây và độ trễ p50/p95 mỗi sinh viên"""
+        processed = self.succeeded + self.failed
+        return {
+            "processed": processed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_seconds": round(elapsed, 3),
+            "students_per_second": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+            "p50_seconds": round(percentile(self.latencies, 0.50), 3),
+            "p95_seconds": round(percentile(self.latencies, 0.95), 3),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đồng bộ lại academic_records cho nhiều sinh viên")
+    parser.add_argument("pairs_file", help="File mỗi dòng 'mssv,cookie_value'")
+    parser.add_argument("--concurrency", type=int, default=8, help="Số sinh viên xử lý đồng thời")
+    parser.add_argument("--rate", type=float, default=20, help="Số request/giây tối đa tới mỗi host (0 = không giới hạn)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Số sinh viên mỗi lần bulk_write")
+    parser.add_argument("--checkpoint", default="bulk_sync.checkpoint.jsonl", help="File lưu tiến độ")
+    parser.add_argument("--report", help="Ghi báo cáo thông lượng ra file JSON")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    load_dotenv()
+    client = MongoClient(os.getenv("MONGO_URI"))
+    database = client.get_default_database()
+
+    resync = BulkResync(
+        database.academic_records,
+        student_collection=database.student,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+    )
+    report = resync.run(read_pairs(args.pairs_file))
+
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
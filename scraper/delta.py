@@ -0,0 +1,122 @@
+import bson
+
+import metrics
+
+# Các trường cấp cao nhất của tài liệu academic_records được so sánh
+TOP_LEVEL_FIELDS = ("summary", "progress")
+
+
+def _semester_without_courses(record):
+    return {key: value for key, value in record.items() if key != "courses"}
+
+
+def diff_academic_data(stored, fresh):
+    """
+    So sánh tài liệu academic_records đang lưu với dữ liệu vừa phân tích
+
+    Nếu danh sách học kỳ giữ nguyên thứ tự thì chỉ $set các học kỳ / môn học
+    thay đổi; nếu học kỳ được thêm, bớt hoặc đổi thứ tự thì $set cả mảng
+    academic_records.
+
+    Args:
+        stored (dict): Tài liệu trong MongoDB (None nếu chưa có)
+        fresh (dict): Kết quả của TranscriptParser.parse
+
+    Returns:
+        tuple: (update, changes) - update là None nếu không có gì thay đổi,
+               {"replace": doc} nếu cần ghi mới toàn bộ, ngược lại là {"$set": {...}}
+    """
+    changes = {
+        "semesters_added": [],
+        "semesters_removed": [],
+        "semesters_changed": [],
+        "courses_changed": [],
+        "fields_changed": [],
+        "full_rewrite": False,
+    }
+
+    if not stored:
+        changes["full_rewrite"] = True
+        changes["semesters_added"] = [r["semester"] for r in fresh.get("academic_records", [])]
+        return {"replace": fresh}, changes
+
+    updates = {}
+    for field in TOP_LEVEL_FIELDS:
+        if stored.get(field) != fresh.get(field):
+            updates[field] = fresh.get(field)
+            changes["fields_changed"].append(field)
+
+    old_records = stored.get("academic_records", [])
+    new_records = fresh.get("academic_records", [])
+    old_names = [r.get("semester") for r in old_records]
+    new_names = [r.get("semester") for r in new_records]
+
+    if old_names != new_names:
+        changes["semesters_added"] = [name for name in new_names if name not in old_names]
+        changes["semesters_removed"] = [name for name in old_names if name not in new_names]
+        old_by_name = {r.get("semester"): r for r in old_records}
+        changes["semesters_changed"] = [
+            r["semester"] for r in new_records
+            if r["semester"] in old_by_name and old_by_name[r["semester"]] != r
+        ]
+        updates["academic_records"] = new_records
+    else:
+        for i, (old, new) in enumerate(zip(old_records, new_records)):
+            if old == new:
+                continue
+            changes["semesters_changed"].append(new["semester"])
+
+            old_courses = old.get("courses", [])
+            new_courses = new.get("courses", [])
+            old_fields = _semester_without_courses(old)
+            new_fields = _semester_without_courses(new)
+            same_layout = (
+                old_fields.keys() == new_fields.keys()
+                and [c.get("course_code") for c in old_courses] == [c.get("course_code") for c in new_courses]
+            )
+            if not same_layout:
+                updates[f"academic_records.{i}"] = new
+                continue
+
+            # Điểm trung bình, số tín chỉ, ... của học kỳ
+            for key, value in new_fields.items():
+                if old_fields[key] != value:
+                    updates[f"academic_records.{i}.{key}"] = value
+
+            for j, (old_course, new_course) in enumerate(zip(old_courses, new_courses)):
+                if old_course != new_course:
+                    updates[f"academic_records.{i}.courses.{j}"] = new_course
+                    changes["courses_changed"].append({
+                        "semester": new["semester"],
+                        "course_code": new_course.get("course_code"),
+                    })
+
+    if not updates:
+        return None, changes
+    return {"$set": updates}, changes
+
+
+def write_academic_delta(collection, mssv, fresh):
+    """
+    Ghi dữ liệu mới vào academic_records, chỉ ghi phần thay đổi
+
+    Returns:
+        dict: Danh sách thay đổi và số byte đã gửi tới MongoDB
+    """
+    stored = collection.find_one({"mssv": mssv})
+    update, changes = diff_academic_data(stored, fresh)
+
+    if update is None:
+        bytes_written = 0
+        metrics.incr("sync.unchanged")
+    elif "replace" in update:
+        bytes_written = len(bson.encode(update["replace"]))
+        collection.replace_one({"mssv": mssv}, update["replace"], upsert=True)
+        metrics.incr("sync.full_writes")
+    else:
+        bytes_written = len(bson.encode(update))
+        collection.update_one({"_id": stored["_id"]}, update)
+        metrics.incr("sync.delta_writes")
+
+    metrics.observe("sync.bytes_written", bytes_written)
+    return {"changed": update is not None, "changes": changes, "bytes_written": bytes_written}
@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scraper.timing import timed, STAGE_FETCH
+
+PORTAL_BASE_URL = "https://student.uit.edu.vn/sinhvien"
+
+# Tên cookie phiên đăng nhập của cổng thông tin
+PORTAL_COOKIE_NAME = "SSESSdf6f777d3f8a1d0fb2e4e5d1ec62f6e2"
+
+# Các trang cần tải từ cổng thông tin sinh viên
+TRANSCRIPT_PAGE = "transcript"
+REGISTRATION_PAGE = "registration"
+PROFILE_PAGE = "profile"
+
+# Timeout (connect, read) riêng cho từng trang, tính bằng giây
+PAGE_TIMEOUTS = {
+    TRANSCRIPT_PAGE: (5, 20),
+    REGISTRATION_PAGE: (5, 15),
+    PROFILE_PAGE: (5, 10),
+}
+
+# Số lần thử lại khi cổng thông tin trả lỗi tạm thời
+PORTAL_RETRIES = 2
+PORTAL_BACKOFF_FACTOR = 0.3
+PORTAL_POOL_SIZE = 32
+
+_session = None
+_session_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=PORTAL_POOL_SIZE, thread_name_prefix="portal-fetch")
+
+
+def build_portal_urls(mssv):
+    """
+    Tạo URL của các trang cần tải cho một sinh viên
+
+    Args:
+        mssv (str): Mã số sinh viên
+
+    Returns:
+        dict: Tên trang -> URL
+    """
+    return {
+        TRANSCRIPT_PAGE: f"{PORTAL_BASE_URL}/kqhoctap?sid={mssv}",
+        REGISTRATION_PAGE: f"{PORTAL_BASE_URL}/dkhp/thongtindangky",
+        PROFILE_PAGE: f"{PORTAL_BASE_URL}/thongtin/hoso-online",
+    }
+
+
+def get_portal_session():
+    """
+    Trả về requests.Session dùng chung (keep-alive, connection pool, retry)
+
+    Session không lưu cookie trả về từ cổng thông tin để cookie của sinh viên
+    này không bị gửi kèm request của sinh viên khác; cookie luôn được truyền
+    riêng cho từng request.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=PORTAL_RETRIES,
+                    backoff_factor=PORTAL_BACKOFF_FACTOR,
+                    status_forcelist=(500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET"]),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=PORTAL_POOL_SIZE,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                _session = session
+    return _session
+
+
+def fetch_page(url, cookies, timeout, headers=None):
+    """Tải một trang từ cổng thông tin qua session dùng chung"""
+    return get_portal_session().get(url, cookies=cookies, timeout=timeout, headers=headers)
+
+
+def fetch_portal_pages(cookies, mssv, pages=(TRANSCRIPT_PAGE, REGISTRATION_PAGE, PROFILE_PAGE), headers=None):
+    """
+    Tải đồng thời các trang của cổng thông tin cho một sinh viên
+
+    Args:
+        cookies (dict): Cookie phiên đăng nhập cổng thông tin
+        mssv (str): Mã số sinh viên
+        pages (tuple): Danh sách tên trang cần tải
+        headers (dict): Header riêng cho từng trang (tên trang -> dict), không bắt buộc
+
+    Returns:
+        dict: Tên trang -> requests.Response
+    """
+    urls = build_portal_urls(mssv)
+    headers = headers or {}
+    with timed(STAGE_FETCH, mssv):
+        futures = {
+            page: _executor.submit(fetch_page, urls[page], cookies, PAGE_TIMEOUTS[page], headers.get(page))
+            for page in pages
+        }
+        return {page: future.result() for page, future in futures.items()}
@@ -0,0 +1,24 @@
+# Các hàm chuyển đổi giá trị ô trong bảng điểm của cổng thông tin
+
+def parse_float(value):
+    try:
+        return float(value)
+    except:
+        return None
+
+def parse_int(value):
+    try:
+        return int(value)
+    except:
+        return None
+
+def determine_status(score):
+    if isinstance(score, str):
+        if score.strip().lower() == "miễn":
+            return "Đã hoàn thành"
+        try:
+            numeric_score = parse_float(score)
+            return "Qua môn" if isinstance(numeric_score, float) and numeric_score >= 4 else "Không hoàn thành"
+        except ValueError:
+            return "Chưa hoàn thành"
+    return "Chưa hoàn thành"
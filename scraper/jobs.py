@@ -0,0 +1,272 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+import threading
+import time
+import uuid
+
+from pymongo.errors import DuplicateKeyError
+
+# Lấy logger
+logger = logging.getLogger(__name__)
+
+# Trạng thái của một job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
+# Loại job
+JOB_SYNC = "sync"
+JOB_REGISTER = "register"
+
+# Số worker xử lý job và thời gian giữ kết quả của job đã xong (giây)
+SYNC_WORKERS = int(os.getenv("SYNC_WORKERS", "4"))
+JOB_RESULT_TTL = int(os.getenv("SYNC_JOB_RESULT_TTL", "3600"))
+
+# Job chưa xong mà không có nhịp (heartbeat) sau chừng này giây coi như worker đã chết,
+# không chặn job mới của cùng sinh viên
+JOB_STALE_AFTER = int(os.getenv("SYNC_JOB_STALE_AFTER", "900"))
+
+
+class LocalJobBackend:
+    """
+    Backend chạy job trong tiến trình: lưu trạng thái trong dict và
+    thực thi bằng ThreadPoolExecutor
+
+    Chỉ dùng được khi có một tiến trình (phát triển, CLI); chạy nhiều worker
+    thì dùng MongoJobBackend. Một backend khác (Redis, RQ, ...) chỉ cần cung
+    cấp cùng các hàm claim / save / load / find_active / submit.
+    """
+
+    def __init__(self, max_workers=SYNC_WORKERS, result_ttl=JOB_RESULT_TTL):
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync-job")
+
+    def claim(self, job):
+        """
+        Lưu job mới nếu owner chưa có job cùng loại chưa xong (kiểm tra và lưu trong cùng một khóa)
+
+        Returns:
+            dict: Job chưa xong đang có, None nếu đã lưu job mới
+        """
+        with self._lock:
+            active = self._find_active(job["kind"], job["owner"])
+            if active:
+                return dict(active)
+            self._jobs[job["job_id"]] = dict(job)
+            self._expire()
+        return None
+
+    def save(self, job):
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+            self._expire()
+
+    def load(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def find_active(self, kind, owner):
+        with self._lock:
+            active = self._find_active(kind, owner)
+            return dict(active) if active else None
+
+    def _find_active(self, kind, owner):
+        for job in self._jobs.values():
+            if job["kind"] == kind and job["owner"] == owner and job["status"] not in FINISHED_STATES:
+                return job
+        return None
+
+    def submit(self, runner):
+        self._executor.submit(runner)
+
+    def _expire(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in FINISHED_STATES and now - job["_finished_ts"] > self._result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class MongoJobBackend:
+    """
+    Backend lưu trạng thái job trong collection sync_jobs, dùng chung giữa các
+    worker gunicorn; job vẫn chạy bằng ThreadPoolExecutor của worker nhận request
+
+    Mỗi (kind, owner) chỉ có một job chưa xong nhờ chỉ mục unique một phần
+    trên _active (khai báo trong indexes.py); job đã xong bị xóa bởi chỉ mục TTL
+    trên _expires_at sau JOB_RESULT_TTL giây.
+
+    Worker cập nhật _heartbeat_ts của các job nó đang giữ (chờ trong executor
+    hoặc đang chạy) mỗi stale_after / 3 giây; job chỉ bị coi là của worker đã
+    chết khi nhịp này dừng quá stale_after giây.
+    """
+
+    def __init__(self, collection, max_workers=SYNC_WORKERS, result_ttl=JOB_RESULT_TTL, stale_after=JOB_STALE_AFTER):
+        self.collection = collection
+        self._result_ttl = result_ttl
+        self._stale_after = stale_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sync-job")
+        # job_id của các job chưa xong do worker này nhận
+        self._held = set()
+        self._lock = threading.Lock()
+        self._heartbeat = None
+
+    def _document(self, job):
+        document = dict(
+            job,
+            _id=job["job_id"],
+            _active=job["status"] not in FINISHED_STATES,
+            _heartbeat_ts=time.time(),
+        )
+        if not document["_active"]:
+            document["_expires_at"] = datetime.now(timezone.utc) + timedelta(seconds=self._result_ttl)
+        return document
+
+    def _hold(self, job_id):
+        with self._lock:
+            self._held.add(job_id)
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, name="sync-job-heartbeat", daemon=True)
+                self._heartbeat.start()
+
+    def _beat(self):
+        while True:
+            time.sleep(max(self._stale_after / 3, 1))
+            with self._lock:
+                held = list(self._held)
+            if not held:
+                continue
+            try:
+                self.collection.update_many(
+                    {"_id": {"$in": held}, "_active": True},
+                    {"$set": {"_heartbeat_ts": time.time()}},
+                )
+            except Exception:
+                logger.exception("Không cập nhật được heartbeat của job")
+
+    def claim(self, job):
+        """
+        Lưu job mới nếu owner chưa có job cùng loại chưa xong (chỉ mục unique quyết định, không có cửa sổ tranh chấp)
+
+        Returns:
+            dict: Job chưa xong đang có, None nếu đã lưu job mới
+        """
+        for _ in range(2):
+            try:
+                self.collection.insert_one(self._document(job))
+                self._hold(job["job_id"])
+                return None
+            except DuplicateKeyError:
+                active = self.find_active(job["kind"], job["owner"])
+                if active is None:
+                    # Job kia vừa xong giữa insert và find, thử lại
+                    continue
+                if time.time() - (active.get("_heartbeat_ts") or 0) < self._stale_after:
+                    return active
+                # Worker chạy job kia đã chết: đánh dấu thất bại để nhận job mới
+                logger.warning(f"Job {active['kind']} {active['job_id']} quá hạn, đánh dấu thất bại")
+                self.save(dict(
+                    active,
+                    status=JOB_FAILED,
+                    error="Job bị gián đoạn",
+                    finished_at=datetime.now().isoformat(),
+                    _finished_ts=time.time(),
+                ))
+        return self.find_active(job["kind"], job["owner"])
+
+    def save(self, job):
+        try:
+            self.collection.replace_one({"_id": job["job_id"]}, self._document(job), upsert=True)
+        finally:
+            if job["status"] in FINISHED_STATES:
+                with self._lock:
+                    self._held.discard(job["job_id"])
+
+    def load(self, job_id):
+        return self.collection.find_one({"_id": job_id})
+
+    def find_active(self, kind, owner):
+        return self.collection.find_one({"kind": kind, "owner": owner, "_active": True})
+
+    def submit(self, runner):
+        self._executor.submit(runner)
+
+
+class SyncJobQueue:
+    """
+    Hàng đợi job đồng bộ dữ liệu từ cổng thông tin
+
+    Request chỉ đưa job vào hàng đợi rồi trả về job_id ngay, việc tải trang,
+    phân tích và ghi MongoDB chạy trên worker của backend.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalJobBackend()
+
+    def enqueue(self, kind, owner, fn, *args, **kwargs):
+        """
+        Đưa job vào hàng đợi; nếu owner đang có job cùng loại chưa xong thì
+        trả về job đó thay vì tạo job mới
+
+        Returns:
+            dict: Trạng thái job
+        """
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "owner": owner,
+            "status": JOB_QUEUED,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            "_finished_ts": None,
+        }
+        active = self.backend.claim(job)
+        if active:
+            return public_job(active)
+        self.backend.submit(lambda: self._run(job, fn, args, kwargs))
+        return public_job(job)
+
+    def _run(self, job, fn, args, kwargs):
+        job = dict(job, status=JOB_RUNNING, started_at=datetime.now().isoformat())
+        try:
+            self.backend.save(job)
+        except Exception:
+            # Thường là job đã bị worker khác coi là quá hạn và nhận job mới thay thế
+            logger.exception(f"Không lưu được trạng thái job {job['kind']} {job['job_id']}, bỏ qua job")
+            return
+        try:
+            job["result"] = fn(*args, **kwargs)
+            job["status"] = JOB_SUCCEEDED
+        except Exception as e:
+            logger.error(f"Job {job['kind']} {job['job_id']} thất bại: {e}")
+            job["error"] = str(e)
+            job["status"] = JOB_FAILED
+        job["finished_at"] = datetime.now().isoformat()
+        job["_finished_ts"] = time.time()
+        try:
+            self.backend.save(job)
+        except Exception:
+            logger.exception(f"Không lưu được kết quả job {job['kind']} {job['job_id']}")
+
+    def get(self, job_id):
+        """Trạng thái job, None nếu không tồn tại hoặc đã hết hạn"""
+        return self.backend.load(job_id)
+
+
+def public_job(job):
+    """Bỏ các trường nội bộ trước khi trả job cho client"""
+    return {key: value for key, value in job.items() if not key.startswith("_")}
+
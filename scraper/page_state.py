@@ -0,0 +1,68 @@
+from datetime import datetime
+import hashlib
+
+# Response 304 Not Modified khi gửi If-None-Match / If-Modified-Since
+NOT_MODIFIED = 304
+
+
+def page_fingerprint(response):
+    """
+    Dấu vân tay của một trang: hash nội dung và ETag / Last-Modified nếu có
+
+    Returns:
+        dict: {"hash", "etag", "last_modified"}
+    """
+    return {
+        "hash": hashlib.sha256(response.content).hexdigest(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def conditional_headers(known_pages, pages):
+    """Header If-None-Match / If-Modified-Since cho các trang đã biết"""
+    headers = {}
+    for page in pages:
+        state = (known_pages or {}).get(page) or {}
+        page_headers = {}
+        if state.get("etag"):
+            page_headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            page_headers["If-Modified-Since"] = state["last_modified"]
+        if page_headers:
+            headers[page] = page_headers
+    return headers
+
+
+def is_unchanged(response, state):
+    """Trang không đổi nếu cổng trả 304 hoặc hash nội dung trùng lần trước"""
+    if not state:
+        return False
+    if response.status_code == NOT_MODIFIED:
+        return True
+    return hashlib.sha256(response.content).hexdigest() == state.get("hash")
+
+
+class PageStateStore:
+    """
+    Lưu dấu vân tay các trang đã đồng bộ của từng sinh viên
+
+    Mỗi sinh viên một tài liệu: {"mssv", "pages": {tên trang: fingerprint}, "updated_at"}
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def load(self, mssv):
+        doc = self.collection.find_one({"mssv": mssv}, {"pages": 1})
+        return doc.get("pages", {}) if doc else {}
+
+    def save(self, mssv, fingerprints):
+        self.collection.update_one(
+            {"mssv": mssv},
+            {"$set": dict(
+                {f"pages.{page}": fingerprint for page, fingerprint in fingerprints.items()},
+                updated_at=datetime.now(),
+            )},
+            upsert=True,
+        )
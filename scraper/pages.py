@@ -0,0 +1,87 @@
+import logging
+import re
+
+from bs4 import BeautifulSoup
+
+from scraper.fields import parse_int
+
+# Lấy logger
+logger = logging.getLogger(__name__)
+
+
+def parse_registration_html(html_content):
+    """
+    Đọc trang dkhp/thongtindangky
+
+    Returns:
+        tuple: (tên học kỳ hiện tại, danh sách môn học đã đăng ký)
+    """
+    soup = BeautifulSoup(html_content, 'html.parser')
+    title_text = soup.find('div', class_='title_thongtindangky')
+    match = re.search(r"HỌC KỲ (\d+) NĂM (\d{4}) - (\d{4})", title_text.get_text(), re.IGNORECASE)
+
+    if match:
+        semester_number = match.group(1)
+        year_start = match.group(2)
+        year_end = match.group(3)
+        formatted = f"Học kỳ {semester_number} - Năm học {year_start}-{year_end}"
+    else:
+        formatted = "Current Semester"
+
+    semester_name = formatted
+
+    table = soup.find('table')
+    courses = []
+    if table:
+        rows = table.find_all('tr')[1:]
+        for row in rows:
+            cells = row.find_all('td')
+            if len(cells) >= 5:
+                course_code = cells[1].text.strip()
+                course_name = cells[3].text.strip()
+                credits = parse_int(cells[4].text.strip())
+                if "(TH" in course_name:
+                    for course in courses:
+                        if course_code.startswith(course["course_code"]):
+                            course["credits"] += credits
+                            break
+                    continue
+                courses.append({
+                    "course_code": course_code,
+                    "course_name": course_name,
+                    "credits": parse_int(credits),
+                    "scores": {
+                        "process": None,
+                        "midterm": None,
+                        "practice": None,
+                        "final": None,
+                    },
+                    "total_score": None,
+                    "complete": "Chưa hoàn thành",
+                    "note": ""
+                })
+    return semester_name, courses
+
+
+def parse_profile_major(html_content):
+    """
+    Lấy tên ngành học từ trang thongtin/hoso-online
+
+    Returns:
+        str: Tên ngành, chuỗi rỗng nếu không đọc được
+    """
+    major = ""
+    try:
+        profile_soup = BeautifulSoup(html_content, 'html.parser')
+        profile_table = profile_soup.find('table', class_='mytable')
+        if profile_table:
+            rows = profile_table.find_all('tr')
+            for row in rows:
+                cells = row.find_all('td')
+                if len(cells) >= 2 and "Ngành học" in cells[0].text:
+                    major = cells[1].text.strip().split(" - ")[0].strip()
+                    break
+    except Exception as e:
+        logger.warning(f"Error parsing major info: {e}")
+        major = ""
+    return major
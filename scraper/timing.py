@@ -0,0 +1,48 @@
+from contextlib import contextmanager
+import logging
+import time
+
+# Lấy logger
+logger = logging.getLogger(__name__)
+
+# Tên các giai đoạn của pipeline phân tích dữ liệu
+STAGE_FETCH = "fetch"
+STAGE_PARSE_TRANSCRIPT = "parse_transcript"
+STAGE_PARSE_REGISTRATION = "parse_registration"
+STAGE_PARSE_PROFILE = "parse_profile"
+STAGE_AGGREGATE = "aggregate"
+
+# Các hook nhận (stage, seconds, mssv) sau mỗi giai đoạn
+_timing_hooks = []
+
+
+def add_timing_hook(hook):
+    """
+    Đăng ký hàm nhận thời gian chạy của từng giai đoạn
+
+    Args:
+        hook (callable): hook(stage, seconds, mssv)
+    """
+    if hook not in _timing_hooks:
+        _timing_hooks.append(hook)
+
+
+def remove_timing_hook(hook):
+    """Hủy đăng ký hook thời gian"""
+    if hook in _timing_hooks:
+        _timing_hooks.remove(hook)
+
+
+@contextmanager
+def timed(stage, mssv=None):
+    """Đo thời gian một giai đoạn và gọi các hook đã đăng ký"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for hook in list(_timing_hooks):
+            try:
+                hook(stage, elapsed, mssv)
+            except Exception as e:
+                logger.warning(f"Lỗi trong timing hook {hook!r}: {e}")
@@ -0,0 +1,81 @@
+from typing import Any, Dict, Optional
+
+from scraper.aggregator import SemesterAggregator
+from scraper.pages import parse_registration_html, parse_profile_major
+from scraper.timing import timed, STAGE_PARSE_TRANSCRIPT, STAGE_PARSE_REGISTRATION, STAGE_PARSE_PROFILE, STAGE_AGGREGATE
+from scraper.transcript_parser import TranscriptStreamParser, SEMESTER_RECORD
+
+# Thông báo khi trang kqhoctap không phải bảng điểm (cookie sai/hết hạn)
+TRANSCRIPT_MARKER = "BẢNG ĐIỂM SINH VIÊN"
+INVALID_COOKIE_MESSAGE = "Không thể truy xuất dữ liệu. Cookie có thể sai hoặc hết hạn."
+
+
+def ensure_transcript_page(html_content: str) -> None:
+    """Báo lỗi nếu trang tải về không phải bảng điểm sinh viên"""
+    if TRANSCRIPT_MARKER not in html_content:
+        raise Exception(INVALID_COOKIE_MESSAGE)
+
+
+class TranscriptParser:
+    """
+    Pipeline dùng chung cho /register và /sync_data
+
+    Đọc bảng điểm (kqhoctap) và trang đăng ký học phần, gom thành tài liệu
+    academic_records; với sinh viên mới thì tạo thêm thông tin cá nhân.
+    Thời gian từng giai đoạn được gửi tới các hook trong scraper.timing.
+    """
+
+    def __init__(self, mssv: Optional[str]) -> None:
+        self.mssv = mssv
+        self.stream = TranscriptStreamParser()
+        self.aggregator = SemesterAggregator()
+
+    def parse(self, transcript_html: str, registration_html: str) -> Dict[str, Any]:
+        """
+        Args:
+            transcript_html (str): HTML trang kqhoctap
+            registration_html (str): HTML trang dkhp/thongtindangky
+
+        Returns:
+            dict: Tài liệu lưu vào academic_records_collection
+        """
+        with timed(STAGE_PARSE_TRANSCRIPT, self.mssv):
+            for record_type, value in self.stream.iter_records(transcript_html):
+                if record_type == SEMESTER_RECORD:
+                    self.aggregator.start_semester(value)
+                else:
+                    self.aggregator.add_course(value)
+            self.aggregator.finish()
+
+        self.mssv = self.mssv or self.stream.first_strong_text
+
+        with timed(STAGE_PARSE_REGISTRATION, self.mssv):
+            current_semester, current_courses = parse_registration_html(registration_html)
+
+        with timed(STAGE_AGGREGATE, self.mssv):
+            self.aggregator.merge_current_semester(current_semester, current_courses)
+            return self.aggregator.academic_data(self.mssv)
+
+    def student_info(self, profile_html: str) -> Dict[str, Any]:
+        """Tạo tài liệu student_collection từ bảng thông tin và trang hồ sơ"""
+        with timed(STAGE_PARSE_PROFILE, self.mssv):
+            major = parse_profile_major(profile_html)
+
+        info_cell = self.stream.info_cell
+        return {
+            "mssv": self.mssv,
+            "role": "student",
+            "personal_info": {
+                "full_name": info_cell(0, 1),
+                "gender": info_cell(0, 5),
+                "birth_date": info_cell(0, 3),
+                "class": info_cell(1, 3),
+                "faculty": info_cell(1, 5),
+                "major": major,
+                "email": {
+                    "school": f"{self.mssv}@gm.uit.edu.vn",
+                },
+                "training_system": info_cell(2, 3),
+            },
+            "chat_history": [],
+        }
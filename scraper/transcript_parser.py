@@ -0,0 +1,201 @@
+from html.parser import HTMLParser
+
+from scraper.fields import parse_float, parse_int, determine_status
+
+# Loại bản ghi được phát ra khi đọc bảng điểm
+SEMESTER_RECORD = "semester"
+COURSE_RECORD = "course"
+
+# Kích thước mỗi đoạn HTML được đưa vào parser
+CHUNK_SIZE = 16384
+
+# Các thẻ không có thẻ đóng, không được đưa vào ngăn xếp
+VOID_ELEMENTS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+])
+
+# Nội dung các thẻ này không được tính vào text của ô
+RAW_TEXT_ELEMENTS = frozenset(["script", "style"])
+
+
+def build_course_record(cells):
+    """
+    Tạo dict môn học từ text (đã strip) của các ô trong một dòng bảng điểm
+
+    Args:
+        cells (list): Text của các ô, ít nhất 10 phần tử
+
+    Returns:
+        dict: Môn học theo đúng cấu trúc lưu trong academic_records
+    """
+    credits = parse_int(cells[3])
+    total_score = cells[8]
+
+    if total_score != "Miễn":
+        total_score = parse_float(total_score)
+
+    return {
+        "course_code": cells[1],
+        "course_name": cells[2],
+        "credits": credits,
+        "scores": {
+            "process": parse_float(cells[4]),
+            "midterm": parse_float(cells[5]),
+            "practice": parse_float(cells[6]),
+            "final": parse_float(cells[7]),
+        },
+        "total_score": total_score,
+        "complete": determine_status(cells[8]),
+        "note": cells[9],
+    }
+
+
+class TranscriptStreamParser(HTMLParser):
+    """
+    Parser dạng sự kiện (SAX) cho trang kqhoctap
+
+    Đọc HTML một lần duy nhất và phát ra bản ghi học kỳ / môn học ngay khi
+    một dòng <tr> được đóng, không dựng cây DOM. Cách gom ô và text giống
+    BeautifulSoup: một <td> thuộc mọi <tr> đang mở chứa nó, text của một ô
+    gồm text của mọi thẻ con.
+
+    Sau khi đọc xong:
+        student_info_rows: text các ô của từng dòng trong bảng đầu tiên
+        first_strong_text: text của thẻ <strong> đầu tiên
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.student_info_rows = []
+        self.first_strong_text = None
+        self._stack = []
+        self._open_rows = []
+        self._open_cells = []
+        self._row_batch = []
+        self._records = []
+        self._raw_depth = 0
+        self._info_table = None
+        self._info_table_done = False
+        self._strong_parts = None
+
+    # Các hàm xử lý sự kiện của HTMLParser
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            return
+
+        payload = None
+        if tag == "tr":
+            payload = []
+            self._open_rows.append(payload)
+            self._row_batch.append(payload)
+            if self._info_table is not None:
+                self.student_info_rows.append(payload)
+        elif tag == "td":
+            payload = []
+            for row in self._open_rows:
+                row.append(payload)
+            self._open_cells.append(payload)
+        elif tag == "table":
+            if self._info_table is None and not self._info_table_done:
+                payload = self._info_table = object()
+        elif tag == "strong":
+            if self.first_strong_text is None and self._strong_parts is None:
+                payload = self._strong_parts = []
+        elif tag in RAW_TEXT_ELEMENTS:
+            self._raw_depth += 1
+
+        self._stack.append((tag, payload))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Giống BeautifulSoup: đóng thẻ gần nhất cùng tên và mọi thẻ mở sau nó
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                break
+        else:
+            return
+
+        while len(self._stack) > index:
+            self._close(*self._stack.pop())
+
+    def handle_data(self, data):
+        if self._raw_depth:
+            return
+        for cell in self._open_cells:
+            cell.append(data)
+        if self._strong_parts is not None:
+            self._strong_parts.append(data)
+
+    # Xử lý khi một thẻ được đóng
+    def _close(self, tag, payload):
+        # Thẻ được đóng theo thứ tự ngăn xếp nên luôn là phần tử cuối
+        if tag == "tr":
+            self._open_rows.pop()
+            if not self._open_rows:
+                self._flush_rows()
+        elif tag == "td":
+            self._open_cells.pop()
+        elif tag == "table":
+            if payload is not None and payload is self._info_table:
+                self._info_table = None
+                self._info_table_done = True
+        elif tag == "strong":
+            if payload is not None and payload is self._strong_parts:
+                self.first_strong_text = "".join(payload).strip()
+                self._strong_parts = None
+        elif tag in RAW_TEXT_ELEMENTS:
+            self._raw_depth -= 1
+
+    def _flush_rows(self):
+        # Dòng lồng nhau được phát theo thứ tự thẻ mở, như soup.find_all('tr')
+        for row in self._row_batch:
+            self._emit_row(row)
+        self._row_batch = []
+
+    def _emit_row(self, row):
+        if len(row) == 1:
+            text = "".join(row[0])
+            if "Học kỳ" in text:
+                self._records.append((SEMESTER_RECORD, text.strip()))
+        elif len(row) >= 10:
+            cells = ["".join(cell).strip() for cell in row]
+            self._records.append((COURSE_RECORD, build_course_record(cells)))
+
+    def _drain(self):
+        records = self._records
+        self._records = []
+        return records
+
+    def iter_records(self, html_content, chunk_size=CHUNK_SIZE):
+        """
+        Đọc HTML theo từng đoạn và phát ra bản ghi ngay khi có
+
+        Yields:
+            tuple: (SEMESTER_RECORD, tên học kỳ) hoặc (COURSE_RECORD, dict môn học)
+        """
+        for start in range(0, len(html_content), chunk_size):
+            self.feed(html_content[start:start + chunk_size])
+            yield from self._drain()
+
+        self.close()
+        # Các thẻ chưa đóng ở cuối trang vẫn được tính như BeautifulSoup
+        while self._stack:
+            self._close(*self._stack.pop())
+        if self._strong_parts is not None:
+            self.first_strong_text = "".join(self._strong_parts).strip()
+            self._strong_parts = None
+        yield from self._drain()
+
+    def info_cell(self, row_index, cell_index):
+        """Text (đã strip) của một ô trong bảng thông tin sinh viên"""
+        return "".join(self.student_info_rows[row_index][cell_index]).strip()
+
+
+def iter_transcript_records(html_content):
+    """Phát ra bản ghi học kỳ / môn học của trang kqhoctap trong một lượt đọc"""
+    return TranscriptStreamParser().iter_records(html_content)
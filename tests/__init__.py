@@ -0,0 +1 @@
+# Kiểm thử: chạy bằng `python -m pytest` ở thư mục gốc
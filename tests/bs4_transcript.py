@@ -0,0 +1,57 @@
+# Cách đọc bảng điểm cũ bằng BeautifulSoup (trước scraper.transcript_parser), giữ lại làm chuẩn so sánh
+from bs4 import BeautifulSoup
+
+from scraper.aggregator import SemesterAggregator
+from scraper.fields import parse_float, parse_int, determine_status
+from scraper.pages import parse_registration_html
+
+
+def transcript_records_bs4(html_content):
+    """Bản ghi học kỳ / môn học theo đúng vòng find_all('tr') / find_all('td') cũ"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    records = []
+    for row in soup.find_all('tr'):
+        cells = row.find_all('td')
+        if len(cells) == 1 and "Học kỳ" in cells[0].text:
+            records.append(("semester", cells[0].text.strip()))
+        elif len(cells) >= 10:
+            credits = parse_int(cells[3].text.strip())
+            total_score = cells[8].text.strip()
+            if total_score != "Miễn":
+                total_score = parse_float(total_score)
+            records.append(("course", {
+                "course_code": cells[1].text.strip(),
+                "course_name": cells[2].text.strip(),
+                "credits": credits,
+                "scores": {
+                    "process": parse_float(cells[4].text.strip()),
+                    "midterm": parse_float(cells[5].text.strip()),
+                    "practice": parse_float(cells[6].text.strip()),
+                    "final": parse_float(cells[7].text.strip()),
+                },
+                "total_score": total_score,
+                "complete": determine_status(cells[8].text.strip()),
+                "note": cells[9].text.strip(),
+            }))
+    return records
+
+
+def student_info_bs4(html_content):
+    """Text các ô của bảng thông tin (bảng đầu tiên) và của thẻ <strong> đầu tiên"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    rows = [[cell.text.strip() for cell in row.find_all('td')] for row in soup.find('table').find_all('tr')]
+    return rows, soup.find('strong').text.strip()
+
+
+def parse_transcript_bs4(mssv, transcript_html, registration_html):
+    """Tài liệu academic_records dựng từ bản ghi của BeautifulSoup, cùng SemesterAggregator với TranscriptParser"""
+    aggregator = SemesterAggregator()
+    for record_type, value in transcript_records_bs4(transcript_html):
+        if record_type == "semester":
+            aggregator.start_semester(value)
+        else:
+            aggregator.add_course(value)
+    aggregator.finish()
+    current_semester, current_courses = parse_registration_html(registration_html)
+    aggregator.merge_current_semester(current_semester, current_courses)
+    return aggregator.academic_data(mssv)
@@ -0,0 +1,52 @@
+# TranscriptParser phải cho kết quả giống hệt cách đọc bằng BeautifulSoup trước đây
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.bench_transcript_parser import synthetic_transcript
+from scraper.transcript import TranscriptParser
+from scraper.transcript_parser import TranscriptStreamParser
+from tests.bs4_transcript import parse_transcript_bs4, student_info_bs4, transcript_records_bs4
+
+FIXTURES = Path(__file__).parent / "fixtures"
+MSSV = "21520001"
+
+
+def read_fixture(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def test_matches_golden_file():
+    transcript_html = read_fixture("kqhoctap.html")
+    registration_html = read_fixture("thongtindangky.html")
+    expected = json.loads(read_fixture("academic_records.json"))
+
+    assert TranscriptParser(MSSV).parse(transcript_html, registration_html) == expected
+
+
+def test_golden_file_matches_bs4():
+    transcript_html = read_fixture("kqhoctap.html")
+    registration_html = read_fixture("thongtindangky.html")
+    expected = json.loads(read_fixture("academic_records.json"))
+
+    assert parse_transcript_bs4(MSSV, transcript_html, registration_html) == expected
+
+
+@pytest.mark.parametrize("courses", [0, 1, 10, 57, 200])
+def test_records_match_bs4(courses):
+    html = synthetic_transcript(courses, seed=courses)
+    parser = TranscriptStreamParser()
+
+    assert list(parser.iter_records(html)) == transcript_records_bs4(html)
+
+    info_rows, strong_text = student_info_bs4(html)
+    assert [["".join(cell).strip() for cell in row] for row in parser.student_info_rows] == info_rows
+    assert parser.first_strong_text == strong_text
+
+
+def test_mssv_from_first_strong_tag():
+    transcript_html = read_fixture("kqhoctap.html")
+    registration_html = read_fixture("thongtindangky.html")
+
+    assert TranscriptParser(None).parse(transcript_html, registration_html)["mssv"] == MSSV